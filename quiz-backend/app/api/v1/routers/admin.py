@@ -0,0 +1,50 @@
+import threading
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from starlette.concurrency import run_in_threadpool
+
+from ....core.config import settings
+from ....core.profiler import profiler
+from . import ws_router
+
+# Dependency перевірки адмін-токена
+
+def require_admin(x_admin_token: Annotated[str | None, Header()] = None) -> None:
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if x_admin_token != settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.post("/drain")
+async def drain_worker():
+    # Перед SIGTERM оркестратор викликає drain, щоб кімнати перейшли на інші воркери
+    await ws_router.drain.drain()
+    return {"status": "draining"}
+
+@router.get("/rooms")
+async def rooms_report():
+    # Кімнати, задачі та виявлені витоки ресурсів цього воркера
+    return ws_router.manager.lifecycle.report()
+
+@router.get("/admission")
+async def admission_report():
+    # Показники, за якими воркер відхиляє нові з'єднання
+    return ws_router.admission.report()
+
+@router.get("/slow-events")
+async def slow_events():
+    # Останні повільні події з розбивкою по фазах (PROFILER_ENABLED)
+    return {"enabled": profiler.enabled, "events": list(profiler.slow_events)}
+
+@router.post("/profile")
+async def sampling_profile(seconds: float = Query(5.0, gt=0)):
+    # Семплює стек event loop цього воркера з окремого потоку
+    seconds = min(seconds, settings.PROFILER_MAX_SECONDS)
+    loop_thread = threading.get_ident()
+    result = await run_in_threadpool(profiler.sample_stacks, loop_thread, seconds)
+    if result is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Profiling already in progress")
+    return result
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Request, status
+from fastapi.responses import StreamingResponse
 from typing import Annotated
 from ....schemas.quiz_schemas import QuizCreateIn, QuizOut, QuizUpdateIn, QuizListItem
 from ....services.quiz_service import QuizService
+from ....services.quiz_bulk import export_ndjson, import_ndjson
 from ....repositories.quiz_repository import QuizRepository
 from ....core.supabase_client import get_supabase
 
@@ -19,6 +21,20 @@ ServiceDep = Annotated[QuizService, Depends(get_service)]
 async def list_quizzes(svc: ServiceDep):
     return svc.list_quizzes()
 
+@router.get("/export")
+async def export_quizzes(svc: ServiceDep):
+    # NDJSON: один рядок — одна вікторина у форматі імпорту
+    return StreamingResponse(
+        export_ndjson(svc),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="quizzes.ndjson"'},
+    )
+
+@router.post("/import")
+async def import_quizzes(request: Request, svc: ServiceDep):
+    # тіло читається потоком, тож розмір файлу не впливає на пам'ять
+    return await import_ndjson(request.stream(), svc)
+
 @router.get("/{quiz_id}", response_model=QuizOut)
 async def get_quiz(quiz_id: str, svc: ServiceDep):
     data = svc.get_quiz(quiz_id)
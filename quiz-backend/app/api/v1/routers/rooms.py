@@ -0,0 +1,37 @@
+from fastapi import APIRouter, Header, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+
+from ....core.config import settings
+from . import ws_router
+
+router = APIRouter(prefix="/rooms", tags=["rooms"])
+
+# Скорборд і фаза кімнати для проекторів та віджетів: без /ws і без
+# участі в розсилці; усі глядачі отримують один спільний знімок
+
+@router.get("/{room_code}/scoreboard")
+async def room_scoreboard(
+    room_code: str,
+    if_none_match: str | None = Header(default=None),
+):
+    snapshot = await ws_router.manager.feed.snapshot(room_code)
+    if snapshot is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": f"public, max-age={settings.SCOREBOARD_CACHE_MAX_AGE_SEC}",
+    }
+    if if_none_match == snapshot.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(snapshot.body, media_type="application/json", headers=headers)
+
+@router.get("/{room_code}/scoreboard/stream")
+async def room_scoreboard_stream(room_code: str):
+    # Server-Sent Events: event scoreboard при кожній зміні, event end після знищення кімнати
+    if await ws_router.manager.feed.snapshot(room_code) is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Room not found")
+    return StreamingResponse(
+        ws_router.manager.feed.stream(room_code),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
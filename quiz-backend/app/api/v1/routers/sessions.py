@@ -0,0 +1,39 @@
+from datetime import datetime
+from typing import Annotated, Literal, Optional
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from ....core.supabase_client import get_supabase
+from ....repositories.quiz_session_repository import QuizSessionRepository
+from ....services.quiz_session_service import QuizSessionService
+from ....services.session_export import export_results
+from .admin import require_admin
+
+router = APIRouter(prefix="/sessions", tags=["sessions"])
+
+# Dependency фабрика сервісу
+
+def get_session_service() -> QuizSessionService:
+    return QuizSessionService(QuizSessionRepository(get_supabase()))
+
+SessionServiceDep = Annotated[QuizSessionService, Depends(get_session_service)]
+
+_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+# Експорт містить імена гравців усіх сесій — лише з адмін-токеном
+@router.get("/results/export", dependencies=[Depends(require_admin)])
+async def export_session_results(
+    svc: SessionServiceDep,
+    format: Literal["csv", "ndjson"] = "csv",
+    quizId: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    sessionId: Annotated[list[str], Query()] = [],
+):
+    # Рядок на гравця в кожній сесії; фільтри — вікторина, ended_at у [since, until), id сесій
+    return StreamingResponse(
+        export_results(svc, format, quizId, since, until, sessionId),
+        media_type=_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="session-results.{format}"'},
+    )
@@ -4,36 +4,51 @@ import uuid
 import asyncio
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Query
 from pydantic import ValidationError
-from app.core.redis_manager import get_redis
+from app.ws.admission import AdmissionController
+from app.ws.affinity import CLOSE_WRONG_WORKER, RoomAffinity
+from app.ws.coalesce import CoalescingWebSocket
+from app.ws.connection import TO_LEGACY, ConnectionContext, send_error
+from app.ws.dispatch import EventRegistry
+from app.ws.drain import DrainController
+from app.ws.heartbeat import HeartbeatScheduler
 from app.ws.room_manager import RoomManager
+from app.ws.room_store import JOIN_ENDED, JOIN_MISSING, create_room_store
+from app.ws.rate_limit import FRAME_THROTTLED, FRAME_TOO_LARGE
 from app.ws.schemas import (
-    EventPayload,
+    EventAdapter,
     HostCreateSession,
     HostStartQuestion,
     HostRevealAnswer,
     HostNextQuestion,
     HostEndSession,
+    HostPause,
+    HostResume,
+    HostSkip,
     PlayerJoin,
     PlayerAnswer,
+    ClientPong,
+    ClientTimeSync,
     ServerStateSync,
-    FinishedSessionSnapshot,
 )
-from app.services.quiz_session_service import QuizSessionService
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.profiler import profiler
 
 ws_router = APIRouter()
-manager = RoomManager()
+manager = RoomManager(create_room_store())
+events = EventRegistry(EventAdapter, actors=manager.actors)
+affinity = RoomAffinity(manager)
+drain = DrainController(manager, affinity)
+heartbeat = HeartbeatScheduler(manager)
+admission = AdmissionController(manager)
 
+# при PROFILER_ENABLED методи менеджера і сховища стають фазами профілю
+profiler.instrument(RoomManager, "manager")
+profiler.instrument(type(manager.store), "store")
 
-async def send_error(websocket: WebSocket, message: str) -> None:
-    """Допоміжна функція для надсилання помилок"""
-    await websocket.send_text(
-        json.dumps(
-            {
-                "type": "error",
-                "message": message,
-            }
-        )
-    )
+HOST = ("host",)
+PLAYER = ("player",)
+ANY_ROLE = ("host", "player")
 
 
 @ws_router.websocket("/ws")
@@ -43,6 +58,9 @@ async def ws_endpoint(
     roomCode: str = Query(...),
     name: str | None = None,
     playerId: str | None = Query(default=None),
+    deltas: bool = Query(default=False),
+    version: int | None = Query(default=None),
+    batch: bool = Query(default=False),
 ) -> None:
     print("\n" + "=" * 60)
     print("Новий WebSocket запит:")
@@ -51,170 +69,200 @@ async def ws_endpoint(
     print(f" Name: {name}")
     print("=" * 60 + "\n")
 
-    r = await get_redis()
-    await manager.register(roomCode, websocket)
+    if drain.draining:
+        print("Воркер у режимі drain, з'єднання відхилено")
+        await drain.reject(websocket)
+        return
 
-    player_id: str | None = None
+    edge = False
+    owner_url = await affinity.redirect_url(roomCode)
+    if owner_url is not None and role == "player":
+        # гравці кімнати в режимі аудиторії обслуговуються будь-яким воркером
+        edge = manager.audience.is_audience(await manager.get_state(roomCode))
+    if owner_url is not None and not edge:
+        print(f"Кімнату {roomCode} обслуговує інший воркер: {owner_url}")
+        await websocket.accept()
+        await websocket.send_text(
+            json.dumps({"type": "reconnect", "url": owner_url, "afterMs": 0})
+        )
+        await websocket.close(code=CLOSE_WRONG_WORKER)
+        return
+
+    # перевантажений воркер відхиляє нові з'єднання, а не гальмує наявні кімнати
+    shed_reason = admission.check(roomCode, role)
+    if shed_reason is not None:
+        await admission.reject(websocket, shed_reason)
+        return
+
+    if batch and settings.WS_COALESCE_WINDOW_MS > 0:
+        # кадри цьому клієнту йдуть масивами (усі розсилки й прямі відповіді)
+        websocket = CoalescingWebSocket(websocket)
+
+    ctx = ConnectionContext(websocket, roomCode, role, edge=edge, deltas=deltas)
+    await manager.register(roomCode, websocket)
+    if deltas:
+        manager.delta_clients.add(websocket)
+    heartbeat.register(ctx)
+    if not edge:
+        # облік кімнати починається лише після того, як знайдено її сесію
+        manager.lifecycle.touch(roomCode)
+
+    player_id: int | None = None
     player_name: str | None = None
-    session_key = f"session:{roomCode}"
+    player_token: str | None = None
 
     try:
         if role == "player":
             print(f"Обробка підключення PLAYER: {name}")
             
-            session_raw = await r.get(session_key)
-            session_exists = session_raw is not None
-            print(f" Перевірка сесії {session_key}: {'EXISTS' if session_exists else 'NOT FOUND'}")
-            
-            if not session_exists:
+            # сесія, гравець, стан, питання і скорборд — за один виклик сховища;
+            # playerId у запиті — токен перепідключення, а не компактний id
+            joined = await manager.join_player(roomCode, playerId, name)
+
+            if joined.status == JOIN_MISSING:
                 error_msg = "Вікторина не знайдена або ще не створена"
                 print(error_msg)
                 await send_error(websocket, error_msg)
                 await websocket.close()
                 return
 
-            session_data = json.loads(session_raw)
-            if session_data.get("phase") == "ENDED":
+            if joined.status == JOIN_ENDED:
                 error_msg = "Вікторина вже завершена"
                 print(error_msg)
                 await send_error(websocket, error_msg)
                 await websocket.close()
                 return
 
-            if playerId is not None:
-                stored_name = await r.hget(manager.k_players(roomCode), playerId)
-                if stored_name is not None:
-                    player_id = playerId
-                    player_name = stored_name
-                    print(f"Відновлено гравця за playerId={player_id[:8]}")
-                else:
-                    print("Переданий playerId не знайдено в Redis")
-
-            if player_id is None and name:
-                all_players = await r.hgetall(manager.k_players(roomCode))
-                for pid, pname in all_players.items():
-                    if pname == name:
-                        player_id = pid
-                        player_name = pname
-                        print(f"Відновлено гравця за ім'ям, player_id={player_id[:8]}")
-                        break
-
-            if player_id is None:
-                player_id = str(uuid.uuid4())
-                player_name = name or "Player"
-                print(f"Створено нового player_id: {player_id[:8]}")
-
-            await r.hset(
-                manager.k_players(roomCode), mapping={player_id: player_name}
-            )
-            await r.expire(manager.k_players(roomCode), 6 * 60 * 60)
-
-            state = await manager.get_state(r, roomCode)
-            questions = await manager.load_questions(r, roomCode)
+            player_id = joined.player_id
+            player_name = joined.name
+            player_token = joined.token
+            if joined.restored:
+                print(f"Відновлено гравця за токеном, player_id={player_id}")
+            elif not joined.added:
+                print(f"Відновлено гравця за ім'ям, player_id={player_id}")
+            else:
+                print(f"Створено нового гравця: player_id={player_id}")
+            ctx.player_id = player_id
+            ctx.player_name = player_name
+
+            state = joined.state
             qidx = state.get("questionIndex", -1)
-            question = questions[qidx] if 0 <= qidx < len(questions) else None
-            sb = await manager.scoreboard(r, roomCode)
-
-            ss = ServerStateSync(
-                roomCode=roomCode,
-                phase=state.get("phase", "LOBBY"),
-                questionIndex=qidx,
-                startedAt=state.get("startedAt"),
-                durationMs=state.get("durationMs"),
-                question=question,
-                scoreboard=sb,
-                reveal=None,
-                playerId=player_id,
-            )
-            
-            print("Надсилаємо state_sync гравцю")
-            await websocket.send_text(ss.model_dump_json())
-
-            await manager.broadcast(
-                roomCode,
-                {
-                    "type": "player_joined",
-                    "playerName": player_name,
-                    "playerId": player_id,
-                    "roomCode": roomCode,
-                },
-                exclude=websocket,
-            )
+            question = joined.question
+            sb = [
+                {"playerId": pid, "name": pname, "score": score}
+                for pid, pname, score in joined.scoreboard
+            ]
+            if not ctx.edge:
+                # кімната обслуговується цим воркером
+                manager.lifecycle.claim(roomCode)
+                manager.ensure_auto_reveal(roomCode, state)
+                manager.autoplay.ensure(roomCode, state)
+                manager.audience.adopt(roomCode, state)
+
+            # відновлений гравець з дельтами отримує лише пропущені зміни
+            if joined.restored and await send_catch_up(ctx, version):
+                print("Надіслано пропущені дельти гравцю")
+            else:
+                ss = ServerStateSync(
+                    roomCode=roomCode,
+                    phase=state.get("phase", "LOBBY"),
+                    questionIndex=qidx,
+                    startedAt=state.get("startedAt"),
+                    durationMs=state.get("durationMs"),
+                    question=question,
+                    scoreboard=sb,
+                    reveal=None,
+                    playerId=player_id,
+                    playerToken=player_token,
+                    version=state.get("version"),
+                    autoplay=state.get("autoplay"),
+                )
+
+                print("Надсилаємо state_sync гравцю")
+                await websocket.send_text(ss.model_dump_json())
+
+            # у режимі аудиторії приєднання надходять лише агрегатом
+            if not await manager.audience.on_join(roomCode, state):
+                await manager.broadcast(
+                    roomCode,
+                    {
+                        "type": "player_joined",
+                        "playerName": player_name,
+                        "playerId": player_id,
+                        "roomCode": roomCode,
+                    },
+                    exclude=websocket,
+                    to=TO_LEGACY,
+                )
             print(f"Гравець {player_name} успішно підключений")
 
         elif role == "host":
             print(f"Обробка підключення HOST для кімнати: {roomCode}")
             
-            state = await manager.get_state(r, roomCode)
-            questions = await manager.load_questions(r, roomCode)
+            state = await manager.get_state(roomCode)
+            questions = await manager.load_questions(roomCode)
             qidx = state.get("questionIndex", -1)
             question = questions[qidx] if 0 <= qidx < len(questions) else None
-            sb = await manager.scoreboard(r, roomCode)
-
-            ss = ServerStateSync(
-                roomCode=roomCode,
-                phase=state.get("phase", "LOBBY"),
-                questionIndex=qidx,
-                startedAt=state.get("startedAt"),
-                durationMs=state.get("durationMs"),
-                question=question,
-                scoreboard=sb,
-                reveal=None,
-                playerId=None,
-            )
-            
-            print(f"Надсилаємо state_sync ведучому з {len(sb)} учасниками")
-            await websocket.send_text(ss.model_dump_json())
+            sb = await manager.audience.scoreboard(roomCode, state)
+            if state and not ctx.edge:
+                # кімната вже створена; нову облікує host:create_session
+                manager.lifecycle.claim(roomCode)
+                manager.ensure_auto_reveal(roomCode, state)
+                manager.autoplay.ensure(roomCode, state)
+                manager.audience.adopt(roomCode, state)
+
+            if await send_catch_up(ctx, version):
+                print("Надіслано пропущені дельти ведучому")
+            else:
+                ss = ServerStateSync(
+                    roomCode=roomCode,
+                    phase=state.get("phase", "LOBBY"),
+                    questionIndex=qidx,
+                    startedAt=state.get("startedAt"),
+                    durationMs=state.get("durationMs"),
+                    question=question,
+                    scoreboard=sb,
+                    reveal=None,
+                    playerId=None,
+                    version=state.get("version"),
+                    autoplay=state.get("autoplay"),
+                )
+
+                print(f"Надсилаємо state_sync ведучому з {len(sb)} учасниками")
+                await websocket.send_text(ss.model_dump_json())
             print("Ведучий успішно підключений")
 
         while True:
             raw = await websocket.receive_text()
-            data = json.loads(raw)
-            event_type = data.get("type")
-            
-            print(f"\nОтримано подію: {event_type} від {role}")
 
+            # ліміти перевіряються до будь-якого розбору кадру
+            verdict = ctx.limiter.check(raw)
+            if verdict == FRAME_TOO_LARGE:
+                print(f"Кадр від {role} перевищує ліміт розміру, з'єднання закрито")
+                await websocket.close(code=1009)
+                break
+            if verdict == FRAME_THROTTLED:
+                if ctx.limiter.abusive:
+                    print(f"{role} ігнорує ліміт частоти, з'єднання закрито")
+                    await websocket.close(code=1008)
+                    break
+                if ctx.limiter.throttled_streak == 1:
+                    await send_error(websocket, "Забагато повідомлень, спробуйте пізніше")
+                continue
+
+            # будь-який кадр підтверджує, що клієнт живий
+            ctx.missed_pongs = 0
+            if not ctx.edge:
+                manager.lifecycle.touch(roomCode)
             try:
-                if event_type == "host:create_session":
-                    evt = HostCreateSession(**data)
-                    await handle_create_session(websocket, r, roomCode, evt, session_key)
-
-                elif event_type == "host:start_question":
-                    evt = HostStartQuestion(**data)
-                    await handle_start_question(websocket, r, roomCode, evt)
-
-                elif event_type == "host:next_question":
-                    evt = HostNextQuestion(**data)
-                    await handle_next_question(websocket, r, roomCode, evt)
-
-                elif event_type == "host:reveal_answer":
-                    evt = HostRevealAnswer(**data)
-                    await handle_reveal_answer(websocket, r, roomCode, evt)
-
-                elif event_type == "host:end_session":
-                    evt = HostEndSession(**data)
-                    await handle_end_session(websocket, r, roomCode, session_key)
-
-                elif event_type == "player:join":
-                    evt = PlayerJoin(**data)
-                    await handle_player_join(
-                        websocket, r, roomCode, evt, player_id, player_name
-                    )
-
-                elif event_type == "player:answer":
-                    evt = PlayerAnswer(**data)
-                    await handle_player_answer(websocket, r, roomCode, evt, player_id)
-
-                else:
-                    await send_error(websocket, f"Невідомий тип події: {event_type}")
-
+                await events.dispatch(ctx, raw)
             except ValidationError as e:
                 error_msg = f"Помилка валідації даних: {str(e)}"
                 print(error_msg)
                 await send_error(websocket, error_msg)
 
     except WebSocketDisconnect:
-        print(f"\nВідключення: {role} ({player_name or 'host'}) від {roomCode}")
+        print(f"\nВідключення: {role} ({ctx.player_name or 'host'}) від {roomCode}")
     except Exception as e:
         print(f"\nПомилка WebSocket: {str(e)}")
         import traceback
@@ -224,19 +272,45 @@ async def ws_endpoint(
         except Exception:
             pass
     finally:
-        print(f"Cleanup для {role} ({player_name or 'host'})")
+        print(f"Cleanup для {role} ({ctx.player_name or 'host'})")
+        heartbeat.unregister(ctx)
         await manager.unregister(roomCode, websocket)
-
-
-async def handle_create_session(
-    websocket: WebSocket,
-    r,
-    roomCode: str,
-    evt: HostCreateSession,
-    session_key: str,
-) -> None:
+        # простій кімнати відраховується від останнього відключення
+        if not ctx.edge and roomCode in manager.lifecycle.rooms:
+            manager.lifecycle.touch(roomCode)
+
+
+async def send_catch_up(ctx: ConnectionContext, since: int | None) -> bool:
+    """
+    Надсилає клієнту з дельтами зміни після його версії стану.
+    False — клієнт без дельт або надто відстав і потребує state_sync.
+    """
+    if not ctx.deltas or since is None:
+        return False
+    frames = await manager.store.get_deltas(ctx.room, since)
+    if frames is None:
+        metrics.inc("ws.deltas.resync")
+        return False
+    for frame in frames:
+        await ctx.websocket.send_text(frame)
+    metrics.inc("ws.deltas.catch_up")
+    return True
+
+
+@events.on("host:create_session", roles=HOST)
+async def handle_create_session(ctx: ConnectionContext, evt: HostCreateSession) -> None:
     """Створення сесії"""
+    roomCode = ctx.room
     print("Створення сесії")
+
+    if drain.draining:
+        await send_error(ctx.websocket, "Сервер перезапускається, спробуйте ще раз")
+        return
+
+    rejected = manager.lifecycle.admit_room(roomCode)
+    if rejected is not None:
+        await send_error(ctx.websocket, rejected)
+        return
     
     quiz_id = evt.quizId
     questions = [q.model_dump() for q in evt.questions]
@@ -249,11 +323,12 @@ async def handle_create_session(
         try:
             from app.services.quiz_service import QuizService
             svc = QuizService()
-            quiz_data = svc.get_quiz(quiz_id)
+            with profiler.phase("supabase.get_quiz"):
+                quiz_data = svc.get_quiz(quiz_id)
             questions = quiz_data["questions"]
             print(f"Завантажено {len(questions)} питань")
         except Exception as e:
-            await send_error(websocket, f"Помилка отримання питань: {str(e)}")
+            await send_error(ctx.websocket, f"Помилка отримання питань: {str(e)}")
             return
 
     session_id = str(uuid.uuid4())
@@ -269,12 +344,15 @@ async def handle_create_session(
         "players": [],
         "createdAt": created_at_ms,
     }
-    await r.set(session_key, json.dumps(session_data))
-    print(f"Збережено {session_key} з sessionId={session_id}")
+    await manager.store.set_session(roomCode, session_data)
+    print(f"Збережено сесію {roomCode} з sessionId={session_id}")
 
-    await manager.create_session(r, roomCode, questions, session_id, created_at_ms)
+    autoplay = evt.autoplay.model_dump() if evt.autoplay is not None else None
+    await manager.create_session(
+        roomCode, questions, session_id, created_at_ms, autoplay=autoplay
+    )
 
-    state = await manager.get_state(r, roomCode)
+    state = await manager.get_state(roomCode)
     out = ServerStateSync(
         roomCode=roomCode,
         phase=state["phase"],
@@ -285,147 +363,144 @@ async def handle_create_session(
         scoreboard=[],
         reveal=None,
         playerId=None,
+        version=state["version"],
+        autoplay=state.get("autoplay"),
     )
     
     print("Broadcast state_sync до всіх")
     await manager.broadcast(roomCode, json.loads(out.model_dump_json()))
 
 
-async def handle_start_question(
-    websocket: WebSocket, r, roomCode: str, evt: HostStartQuestion
-) -> None:
+@events.on("host:start_question", roles=HOST)
+async def handle_start_question(ctx: ConnectionContext, evt: HostStartQuestion) -> None:
     """Запуск питання (застаріла подія, краще використовувати host:next_question)"""
+    roomCode = ctx.room
     print(f"Запуск питання {evt.questionIndex} на {evt.durationMs}ms")
     
-    msg = await manager.start_question(r, roomCode, evt.questionIndex, evt.durationMs)
-    await manager.broadcast(roomCode, msg)
+    msg = await manager.start_question(roomCode, evt.questionIndex, evt.durationMs)
+    await manager.audience.broadcast(roomCode, msg, to=TO_LEGACY)
 
 
-async def handle_next_question(
-    websocket: WebSocket, r, roomCode: str, evt: HostNextQuestion
-) -> None:
+@events.on("host:next_question", roles=HOST)
+async def handle_next_question(ctx: ConnectionContext, evt: HostNextQuestion) -> None:
     """Перехід до наступного питання"""
+    roomCode = ctx.room
     print("Запуск наступного питання")
     
     duration_ms = evt.durationMs
     print(f" Тривалість: {duration_ms}ms")
 
-    state = await manager.get_state(r, roomCode)
+    state = await manager.get_state(roomCode)
     current_idx = state.get("questionIndex", -1)
     next_idx = current_idx + 1
 
-    questions = await manager.load_questions(r, roomCode)
+    questions = await manager.load_questions(roomCode)
     
     if next_idx >= len(questions):
-        await send_error(websocket, "Це було останнє питання")
+        await send_error(ctx.websocket, "Це було останнє питання")
         return
 
-    msg = await manager.start_question(r, roomCode, next_idx, duration_ms)
+    msg = await manager.start_question(roomCode, next_idx, duration_ms)
     print("Broadcast question_started")
-    await manager.broadcast(roomCode, msg)
+    await manager.audience.broadcast(roomCode, msg, to=TO_LEGACY)
 
 
-async def handle_reveal_answer(
-    websocket: WebSocket, r, roomCode: str, evt: HostRevealAnswer
-) -> None:
+@events.on("host:reveal_answer", roles=HOST)
+async def handle_reveal_answer(ctx: ConnectionContext, evt: HostRevealAnswer) -> None:
     """Розкриття правильної відповіді"""
+    roomCode = ctx.room
     print("Розкриття відповіді")
     
-    state = await manager.get_state(r, roomCode)
+    state = await manager.get_state(roomCode)
     current_idx = evt.questionIndex or state.get("questionIndex", -1)
     
     print(f" Індекс питання: {current_idx}")
 
-    msg = await manager.reveal_answer(r, roomCode, current_idx)
-    sb = await manager.scoreboard(r, roomCode)
-    msg["scoreboard"] = sb
+    manager.cancel_timers(roomCode)
+    await manager.reveal_and_announce(roomCode, current_idx, state)
 
-    print(f"Broadcast answer_revealed з scoreboard ({len(sb)} гравців)")
-    await manager.broadcast(roomCode, msg)
 
-
-async def handle_end_session(
-    websocket: WebSocket, r, roomCode: str, session_key: str
-) -> None:
+@events.on("host:end_session", roles=HOST)
+async def handle_end_session(ctx: ConnectionContext, evt: HostEndSession) -> None:
     """Завершення вікторини"""
+    roomCode = ctx.room
     print("Завершення сесії")
 
-    await manager.set_state(r, roomCode, phase="ENDED")
-    sb = await manager.scoreboard(r, roomCode)
+    await manager.end_session(roomCode)
 
-    session_raw = await r.get(session_key)
-    session_data = json.loads(session_raw) if session_raw else {}
-    
-    session_id = session_data.get("sessionId") or str(uuid.uuid4())
-    quiz_id = session_data.get("quizId")
-    created_at_ms = session_data.get("createdAt") or int(time.time() * 1000)
-    ended_at_ms = int(time.time() * 1000)
 
-    session_data.update({
-        "sessionId": session_id,
-        "quizId": quiz_id,
-        "createdAt": created_at_ms,
-        "phase": "ENDED",
-        "endedAt": ended_at_ms,
-    })
-    await r.set(session_key, json.dumps(session_data))
-
-    questions = await manager.load_questions(r, roomCode)
-    snapshot = FinishedSessionSnapshot(
-        sessionId=session_id,
-        roomCode=roomCode,
-        quizId=quiz_id,
-        createdAt=created_at_ms,
-        endedAt=ended_at_ms,
-        questions=questions,
-        scoreboard=sb,
-    )
+@events.on("host:pause", roles=HOST)
+async def handle_pause(ctx: ConnectionContext, evt: HostPause) -> None:
+    """Пауза автоплею: наступне питання не стартує до host:resume"""
+    rejected = await manager.autoplay.pause(ctx.room)
+    if rejected is not None:
+        await send_error(ctx.websocket, rejected)
 
-    archive_key = f"quiz:session:{session_id}"
-    await r.set(archive_key, snapshot.model_dump_json())
-    await r.zadd("quiz:session:index", {session_id: ended_at_ms})
-    await r.sadd(f"quiz:room_sessions:{roomCode}", session_id)
-    
-    print(f"Збережено архів сесії в {archive_key}")
 
-    try:
-        session_service = QuizSessionService()
-        session_service.save_finished_session(snapshot.model_dump())
-        print(f"Сесію {session_id} збережено в Supabase")
-    except Exception as e:
-        print(f"Помилка збереження сесії в Supabase: {e}")
-
-    await manager.cleanup_room_data(r, roomCode)
-
-    print("Broadcast session_ended")
-    await manager.broadcast(
-        roomCode,
-        {
-            "type": "session_ended",
-            "scoreboard": sb,
-            "sessionId": session_id,
-        },
+@events.on("host:resume", roles=HOST)
+async def handle_resume(ctx: ConnectionContext, evt: HostResume) -> None:
+    """Продовження автоплею (у лобі — старт першого питання)"""
+    rejected = await manager.autoplay.resume(ctx.room)
+    if rejected is not None:
+        await send_error(ctx.websocket, rejected)
+
+
+@events.on("host:skip", roles=HOST)
+async def handle_skip(ctx: ConnectionContext, evt: HostSkip) -> None:
+    """Пропуск кроку автоплею: розкрити питання зараз або одразу перейти до наступного"""
+    rejected = await manager.autoplay.skip(ctx.room)
+    if rejected is not None:
+        await send_error(ctx.websocket, rejected)
+
+
+@events.on("pong", roles=ANY_ROLE, serial=False)
+async def handle_pong(ctx: ConnectionContext, evt: ClientPong) -> None:
+    """Відповідь клієнта на ping від heartbeat"""
+    heartbeat.on_pong(ctx, evt.t)
+
+
+@events.on("client:time_sync", roles=ANY_ROLE, serial=False)
+async def handle_time_sync(ctx: ConnectionContext, evt: ClientTimeSync) -> None:
+    """
+    Обмін мітками часу для оцінки зсуву годинника клієнта (як у NTP).
+    Клієнт отримує t1/t2 і сам рахує зсув; сервер оцінює його з RTT.
+    """
+    t1 = int(time.time() * 1000)
+    rtt = evt.rtt if evt.rtt is not None else ctx.rtt_ms
+    if rtt is not None:
+        offset = evt.t0 + rtt / 2 - t1
+        ctx.clock_offset_ms = (
+            offset if ctx.clock_offset_ms is None else ctx.clock_offset_ms * 0.7 + offset * 0.3
+        )
+        metrics.observe(f"ws.clock_offset_ms.{ctx.role}", abs(offset))
+    await ctx.websocket.send_text(
+        json.dumps(
+            {
+                "type": "time_sync",
+                "t0": evt.t0,
+                "t1": t1,
+                "t2": int(time.time() * 1000),
+            }
+        )
     )
 
 
-async def handle_player_join(
-    websocket: WebSocket,
-    r,
-    roomCode: str,
-    evt: PlayerJoin,
-    player_id: str | None,
-    player_name: str | None,
-) -> None:
+@events.on("player:join", roles=PLAYER)
+async def handle_player_join(ctx: ConnectionContext, evt: PlayerJoin) -> None:
     """Явне приєднання гравця (legacy підтримка)"""
     print("Явне приєднання гравця (legacy)")
-    
+    roomCode = ctx.room
+    websocket = ctx.websocket
+
+    player_id = ctx.player_id
     if player_id is None:
-        player_id = str(uuid.uuid4())
-        player_name = evt.name
-        print(f" Створено новий player_id: {player_id[:8]}")
+        player_id = await manager.store.assign_slot(roomCode, str(uuid.uuid4()))
+        print(f" Створено новий player_id: {player_id}")
+    ctx.player_id = player_id
+    ctx.player_name = evt.name
 
-    await r.hset(manager.k_players(roomCode), mapping={player_id: evt.name})
-    await r.expire(manager.k_players(roomCode), 6 * 60 * 60)
+    await manager.add_player(roomCode, player_id, evt.name)
+    state = await manager.get_state(roomCode)
 
     await websocket.send_text(
         json.dumps(
@@ -437,36 +512,38 @@ async def handle_player_join(
         )
     )
 
-    await manager.broadcast(
-        roomCode,
-        {
-            "type": "player_joined",
-            "playerName": evt.name,
-            "playerId": player_id,
-        },
-        exclude=websocket,
-    )
+    if not await manager.audience.on_join(roomCode, state):
+        await manager.broadcast(
+            roomCode,
+            {
+                "type": "player_joined",
+                "playerName": evt.name,
+                "playerId": player_id,
+            },
+            exclude=websocket,
+            to=TO_LEGACY,
+        )
 
 
-async def handle_player_answer(
-    websocket: WebSocket,
-    r,
-    roomCode: str,
-    evt: PlayerAnswer,
-    player_id: str | None,
-) -> None:
+# відповіді перевіряються атомарно у сховищі і збираються в пачки з різних
+# з'єднань — черга кімнати лише розтягнула б вікно пачки
+@events.on("player:answer", roles=PLAYER, serial=False)
+async def handle_player_answer(ctx: ConnectionContext, evt: PlayerAnswer) -> None:
     """Обробка відповіді гравця"""
+    roomCode = ctx.room
+    websocket = ctx.websocket
+    player_id = ctx.player_id
     print("Відповідь гравця")
     
     if player_id is None:
         await send_error(websocket, "Player not registered")
         return
 
-    print(f" Player: {player_id[:8]}")
+    print(f" Player: {player_id}")
     print(f" Question: {evt.questionIndex}, Option: {evt.optionIndex}")
 
     ok = await manager.submit_answer(
-        r, roomCode, evt.questionIndex, player_id, evt.optionIndex
+        roomCode, evt.questionIndex, player_id, evt.optionIndex
     )
 
     print(f" Результат: {'OK' if ok else 'REJECTED'}")
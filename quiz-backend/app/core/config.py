@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 import os
-from typing import List, Any
+from typing import List, Any, Literal
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import Field, AnyUrl, AliasChoices, field_validator
 
@@ -20,6 +20,382 @@ class Settings(BaseSettings):
     #app_host: str = os.getenv("APP_HOST", "0.0.0.0")
     #app_port: int = int(os.getenv("APP_PORT", "8000"))
 
+    # Сховище стану кімнат: redis (спільне для воркерів) або memory (один процес)
+    ROOM_STATE_BACKEND: Literal["redis", "memory"] = Field(
+        "redis",
+        validation_alias=AliasChoices("ROOM_STATE_BACKEND", "room_state_backend"),
+        description="Room state backend: redis|memory",
+    )
+
+    # Схема Redis-ключів кімнат: 2 — хеш-теги {room} для Redis Cluster
+    REDIS_KEY_SCHEMA: Literal[1, 2] = Field(
+        1,
+        validation_alias=AliasChoices("REDIS_KEY_SCHEMA", "redis_key_schema"),
+        description="Room key layout: 1 (legacy) or 2 (every key of a room in one cluster slot)",
+    )
+    REDIS_KEY_V1_FALLBACK: bool = Field(
+        False,
+        validation_alias=AliasChoices("REDIS_KEY_V1_FALLBACK", "redis_key_v1_fallback"),
+        description="With schema 2, move a room's schema 1 keys on first access (non-sharded Redis only)",
+    )
+
+    # Життєвий цикл кімнат: TTL ключів і бюджети воркера
+    ROOM_TTL_SEC: int = Field(
+        6 * 60 * 60,
+        validation_alias=AliasChoices("ROOM_TTL_SEC", "room_ttl_sec"),
+        description="TTL of live room keys in the state store",
+    )
+    ENDED_SESSION_TTL_SEC: int = Field(
+        10 * 60,
+        validation_alias=AliasChoices("ENDED_SESSION_TTL_SEC", "ended_session_ttl_sec"),
+        description="How long session:{room} of a finished quiz is kept for late reconnects",
+    )
+    ARCHIVE_TTL_SEC: int = Field(
+        30 * 24 * 60 * 60,
+        validation_alias=AliasChoices("ARCHIVE_TTL_SEC", "archive_ttl_sec"),
+        description="TTL of quiz:session:* archives not yet confirmed in Postgres",
+    )
+    ARCHIVE_HOT_TTL_SEC: int = Field(
+        24 * 60 * 60,
+        validation_alias=AliasChoices("ARCHIVE_HOT_TTL_SEC", "archive_hot_ttl_sec"),
+        description="How long an archive stays in Redis once it is saved to Postgres",
+    )
+    ARCHIVE_COMPRESSION_LEVEL: int = Field(
+        6,
+        validation_alias=AliasChoices("ARCHIVE_COMPRESSION_LEVEL", "archive_compression_level"),
+        description="zlib level for compressed session archives",
+    )
+    ROOM_IDLE_TIMEOUT_SEC: int = Field(
+        30 * 60,
+        validation_alias=AliasChoices("ROOM_IDLE_TIMEOUT_SEC", "room_idle_timeout_sec"),
+        description="A room with no connections and no events for this long is torn down",
+    )
+    ROOM_SWEEP_INTERVAL_SEC: float = Field(
+        60.0,
+        validation_alias=AliasChoices("ROOM_SWEEP_INTERVAL_SEC", "room_sweep_interval_sec"),
+        description="How often idle rooms are looked for",
+    )
+    MAX_ROOMS_PER_WORKER: int = Field(
+        500,
+        validation_alias=AliasChoices("MAX_ROOMS_PER_WORKER", "max_rooms_per_worker"),
+        description="Live rooms a worker accepts before refusing new sessions",
+    )
+    WORKER_MEMORY_BUDGET_MB: int | None = Field(
+        None,
+        validation_alias=AliasChoices("WORKER_MEMORY_BUDGET_MB", "worker_memory_budget_mb"),
+        description="Resident memory above which a worker refuses new rooms (Linux only)",
+    )
+
+    # Ліміти вхідних WebSocket-кадрів (окремо для ведучого та гравців)
+    WS_HOST_RATE_PER_SEC: float = Field(
+        20.0,
+        validation_alias=AliasChoices("WS_HOST_RATE_PER_SEC", "ws_host_rate_per_sec"),
+        description="Sustained inbound messages per second for a host connection",
+    )
+    WS_HOST_BURST: int = Field(
+        40,
+        validation_alias=AliasChoices("WS_HOST_BURST", "ws_host_burst"),
+        description="Token bucket capacity for a host connection",
+    )
+    WS_HOST_MAX_FRAME_BYTES: int = Field(
+        512 * 1024,
+        validation_alias=AliasChoices("WS_HOST_MAX_FRAME_BYTES", "ws_host_max_frame_bytes"),
+        description="Max inbound frame size for a host (create_session carries all questions)",
+    )
+    WS_PLAYER_RATE_PER_SEC: float = Field(
+        5.0,
+        validation_alias=AliasChoices("WS_PLAYER_RATE_PER_SEC", "ws_player_rate_per_sec"),
+        description="Sustained inbound messages per second for a player connection",
+    )
+    WS_PLAYER_BURST: int = Field(
+        10,
+        validation_alias=AliasChoices("WS_PLAYER_BURST", "ws_player_burst"),
+        description="Token bucket capacity for a player connection",
+    )
+    WS_PLAYER_MAX_FRAME_BYTES: int = Field(
+        4 * 1024,
+        validation_alias=AliasChoices("WS_PLAYER_MAX_FRAME_BYTES", "ws_player_max_frame_bytes"),
+        description="Max inbound frame size for a player",
+    )
+    WS_MAX_THROTTLED_STREAK: int = Field(
+        50,
+        validation_alias=AliasChoices("WS_MAX_THROTTLED_STREAK", "ws_max_throttled_streak"),
+        description="Consecutive throttled frames before the connection is closed",
+    )
+
+    # Багатопроцесний режим: кімната прив'язана до одного воркера
+    AFFINITY_ENABLED: bool = Field(
+        False,
+        validation_alias=AliasChoices("AFFINITY_ENABLED", "affinity_enabled"),
+        description="Route every /ws connection of a room to the worker that owns it",
+    )
+    WORKER_ID: str | None = Field(
+        None,
+        validation_alias=AliasChoices("WORKER_ID", "worker_id"),
+        description="Stable worker id (defaults to hostname:pid)",
+    )
+    WORKER_PUBLIC_URL: str | None = Field(
+        None,
+        validation_alias=AliasChoices("WORKER_PUBLIC_URL", "worker_public_url"),
+        description="WebSocket URL clients use to reach this worker directly, e.g. ws://10.0.0.5:8001/ws",
+    )
+    AFFINITY_HEARTBEAT_SEC: float = Field(
+        2.0,
+        validation_alias=AliasChoices("AFFINITY_HEARTBEAT_SEC", "affinity_heartbeat_sec"),
+        description="How often a worker refreshes its registration",
+    )
+    AFFINITY_WORKER_TTL_SEC: float = Field(
+        6.0,
+        validation_alias=AliasChoices("AFFINITY_WORKER_TTL_SEC", "affinity_worker_ttl_sec"),
+        description="A worker without a heartbeat for this long leaves the ring",
+    )
+    AFFINITY_VNODES: int = Field(
+        64,
+        validation_alias=AliasChoices("AFFINITY_VNODES", "affinity_vnodes"),
+        description="Virtual nodes per worker on the hash ring",
+    )
+    RECONNECT_JITTER_MS: int = Field(
+        1000,
+        validation_alias=AliasChoices("RECONNECT_JITTER_MS", "reconnect_jitter_ms"),
+        description="Upper bound of the random delay clients wait before reconnecting",
+    )
+
+    # Локальний кеш гарячих ключів Redis з інвалідацією через pub/sub
+    NEAR_CACHE_ENABLED: bool = Field(
+        True,
+        validation_alias=AliasChoices("NEAR_CACHE_ENABLED", "near_cache_enabled"),
+        description="Serve repeated room state/session/questions reads from process memory",
+    )
+    NEAR_CACHE_TTL_SEC: float = Field(
+        5.0,
+        validation_alias=AliasChoices("NEAR_CACHE_TTL_SEC", "near_cache_ttl_sec"),
+        description="Upper bound on staleness if an invalidation message is lost",
+    )
+    NEAR_CACHE_MAX_KEYS: int = Field(
+        10000,
+        validation_alias=AliasChoices("NEAR_CACHE_MAX_KEYS", "near_cache_max_keys"),
+        description="Max cached keys per worker (least recently used are evicted)",
+    )
+
+    # Версіонований стан кімнати та журнал дельт
+    DELTA_LOG_SIZE: int = Field(
+        64,
+        validation_alias=AliasChoices("DELTA_LOG_SIZE", "delta_log_size"),
+        description="Recent state deltas kept per room; clients further behind get a full snapshot",
+    )
+
+    # Синхронізований старт питань
+    QUESTION_START_LEAD_MS: int = Field(
+        1000,
+        validation_alias=AliasChoices("QUESTION_START_LEAD_MS", "question_start_lead_ms"),
+        description="Delay between sending question_started and the start of its timer",
+    )
+
+    # Режим аудиторії для дуже великих кімнат
+    AUDIENCE_MODE_THRESHOLD: int = Field(
+        1000,
+        validation_alias=AliasChoices("AUDIENCE_MODE_THRESHOLD", "audience_mode_threshold"),
+        description="Player count at which a room switches to audience mode",
+    )
+    AUDIENCE_TOP_K: int = Field(
+        10,
+        validation_alias=AliasChoices("AUDIENCE_TOP_K", "audience_top_k"),
+        description="Scoreboard entries sent to clients in audience mode",
+    )
+    AUDIENCE_UPDATE_SEC: float = Field(
+        1.0,
+        validation_alias=AliasChoices("AUDIENCE_UPDATE_SEC", "audience_update_sec"),
+        description="How often the aggregate player count is sent in audience mode",
+    )
+
+    # Heartbeat: виявлення мертвих з'єднань
+    HEARTBEAT_ENABLED: bool = Field(
+        True,
+        validation_alias=AliasChoices("HEARTBEAT_ENABLED", "heartbeat_enabled"),
+        description="Ping every WebSocket connection and evict the ones that stop answering",
+    )
+    HEARTBEAT_INTERVAL_SEC: float = Field(
+        15.0,
+        validation_alias=AliasChoices("HEARTBEAT_INTERVAL_SEC", "heartbeat_interval_sec"),
+        description="How often each connection is pinged",
+    )
+    HEARTBEAT_MAX_MISSED: int = Field(
+        2,
+        validation_alias=AliasChoices("HEARTBEAT_MAX_MISSED", "heartbeat_max_missed"),
+        description="Unanswered pings in a row before the connection is closed",
+    )
+    HEARTBEAT_WHEEL_SLOTS: int = Field(
+        16,
+        validation_alias=AliasChoices("HEARTBEAT_WHEEL_SLOTS", "heartbeat_wheel_slots"),
+        description="Timer wheel slots; pings are spread evenly over the interval",
+    )
+    HEARTBEAT_SEND_TIMEOUT_SEC: float = Field(
+        5.0,
+        validation_alias=AliasChoices("HEARTBEAT_SEND_TIMEOUT_SEC", "heartbeat_send_timeout_sec"),
+        description="A ping that cannot be written within this time evicts the connection",
+    )
+
+    # Плавна зупинка та адмін-ендпоінти
+    DRAIN_TIMEOUT_SEC: float = Field(
+        10.0,
+        validation_alias=AliasChoices("DRAIN_TIMEOUT_SEC", "drain_timeout_sec"),
+        description="How long drain waits for pending background writes",
+    )
+    ADMIN_TOKEN: str | None = Field(
+        None,
+        validation_alias=AliasChoices("ADMIN_TOKEN", "admin_token"),
+        description="Token for /admin and /metrics (X-Admin-Token header); both are disabled when unset",
+    )
+
+    # Масовий імпорт/експорт вікторин (NDJSON)
+    QUIZ_IMPORT_BATCH_SIZE: int = Field(
+        500,
+        validation_alias=AliasChoices("QUIZ_IMPORT_BATCH_SIZE", "quiz_import_batch_size"),
+        description="Quizzes written per batched insert during import",
+    )
+    QUIZ_IMPORT_MAX_LINE_BYTES: int = Field(
+        1024 * 1024,
+        validation_alias=AliasChoices("QUIZ_IMPORT_MAX_LINE_BYTES", "quiz_import_max_line_bytes"),
+        description="Longest accepted NDJSON record",
+    )
+    QUIZ_IMPORT_MAX_ERRORS: int = Field(
+        100,
+        validation_alias=AliasChoices("QUIZ_IMPORT_MAX_ERRORS", "quiz_import_max_errors"),
+        description="Per-record errors listed in the import report (the rest are only counted)",
+    )
+    QUIZ_EXPORT_PAGE_SIZE: int = Field(
+        200,
+        validation_alias=AliasChoices("QUIZ_EXPORT_PAGE_SIZE", "quiz_export_page_size"),
+        description="Quizzes read per page during export",
+    )
+    SESSION_EXPORT_PAGE_SIZE: int = Field(
+        100,
+        validation_alias=AliasChoices("SESSION_EXPORT_PAGE_SIZE", "session_export_page_size"),
+        description="Finished sessions read per page during results export",
+    )
+
+    # Пакетний прийом відповідей
+    ANSWER_BATCH_WINDOW_MS: float = Field(
+        5.0,
+        validation_alias=AliasChoices("ANSWER_BATCH_WINDOW_MS", "answer_batch_window_ms"),
+        description="Answers received within this window are committed in one Redis call (0 disables batching)",
+    )
+    ANSWER_BATCH_MAX: int = Field(
+        500,
+        validation_alias=AliasChoices("ANSWER_BATCH_MAX", "answer_batch_max"),
+        description="A batch is flushed early once it holds this many answers",
+    )
+    ANSWER_STORE: Literal["hash", "bitfield"] = Field(
+        "hash",
+        validation_alias=AliasChoices("ANSWER_STORE", "answer_store"),
+        description="How Redis keeps per-question answers: a hash per player or 4 bits per player slot",
+    )
+
+    # Профілювання WebSocket-подій
+    PROFILER_ENABLED: bool = Field(
+        False,
+        validation_alias=AliasChoices("PROFILER_ENABLED", "profiler_enabled"),
+        description="Time WebSocket events, log slow ones and instrument RoomManager/store methods",
+    )
+    PROFILER_SAMPLE_RATE: float = Field(
+        0.01,
+        validation_alias=AliasChoices("PROFILER_SAMPLE_RATE", "profiler_sample_rate"),
+        description="Share of events that get a per-phase timing breakdown",
+    )
+    PROFILER_SLOW_EVENT_MS: float = Field(
+        100.0,
+        validation_alias=AliasChoices("PROFILER_SLOW_EVENT_MS", "profiler_slow_event_ms"),
+        description="Events slower than this are logged and kept for /admin/slow-events",
+    )
+    PROFILER_SAMPLE_INTERVAL_MS: float = Field(
+        5.0,
+        validation_alias=AliasChoices("PROFILER_SAMPLE_INTERVAL_MS", "profiler_sample_interval_ms"),
+        description="Stack sampling interval of the /admin/profile endpoint",
+    )
+    PROFILER_MAX_SECONDS: float = Field(
+        30.0,
+        validation_alias=AliasChoices("PROFILER_MAX_SECONDS", "profiler_max_seconds"),
+        description="Longest sampling profile /admin/profile may capture",
+    )
+    PROFILER_TOP_STACKS: int = Field(
+        50,
+        validation_alias=AliasChoices("PROFILER_TOP_STACKS", "profiler_top_stacks"),
+        description="Most frequent stacks returned by /admin/profile",
+    )
+
+    # Контроль допуску: нові з'єднання відхиляються при перевантаженні воркера
+    ADMISSION_ENABLED: bool = Field(
+        True,
+        validation_alias=AliasChoices("ADMISSION_ENABLED", "admission_enabled"),
+        description="Reject new WebSocket connections while the worker is overloaded",
+    )
+    ADMISSION_MAX_CONNECTIONS: int = Field(
+        10000,
+        validation_alias=AliasChoices("ADMISSION_MAX_CONNECTIONS", "admission_max_connections"),
+        description="Open WebSocket connections a worker accepts before shedding new ones",
+    )
+    ADMISSION_MAX_LOOP_LAG_MS: float = Field(
+        250.0,
+        validation_alias=AliasChoices("ADMISSION_MAX_LOOP_LAG_MS", "admission_max_loop_lag_ms"),
+        description="Smoothed event-loop lag above which new connections are shed",
+    )
+    ADMISSION_MAX_REDIS_INFLIGHT: int = Field(
+        40,
+        validation_alias=AliasChoices("ADMISSION_MAX_REDIS_INFLIGHT", "admission_max_redis_inflight"),
+        description="Borrowed Redis connections above which new connections are shed",
+    )
+    ADMISSION_PROBE_INTERVAL_MS: float = Field(
+        100.0,
+        validation_alias=AliasChoices("ADMISSION_PROBE_INTERVAL_MS", "admission_probe_interval_ms"),
+        description="How often the watchdog measures event-loop lag",
+    )
+    ADMISSION_RETRY_AFTER_MS: int = Field(
+        5000,
+        validation_alias=AliasChoices("ADMISSION_RETRY_AFTER_MS", "admission_retry_after_ms"),
+        description="Delay rejected clients are asked to wait before retrying (plus jitter)",
+    )
+
+    # Скорборд для проекторів і віджетів (HTTP/SSE без /ws)
+    SCOREBOARD_FEED_POLL_MS: int = Field(
+        500,
+        validation_alias=AliasChoices("SCOREBOARD_FEED_POLL_MS", "scoreboard_feed_poll_ms"),
+        description="How often a room with SSE viewers checks its state version",
+    )
+    SCOREBOARD_FEED_KEEPALIVE_SEC: float = Field(
+        15.0,
+        validation_alias=AliasChoices("SCOREBOARD_FEED_KEEPALIVE_SEC", "scoreboard_feed_keepalive_sec"),
+        description="Idle SSE streams get a keepalive comment this often",
+    )
+    SCOREBOARD_CACHE_MAX_AGE_SEC: int = Field(
+        1,
+        validation_alias=AliasChoices("SCOREBOARD_CACHE_MAX_AGE_SEC", "scoreboard_cache_max_age_sec"),
+        description="Cache-Control max-age of the scoreboard GET endpoint",
+    )
+
+    # Об'єднання вихідних кадрів для клієнтів з ?batch=true
+    WS_COALESCE_WINDOW_MS: float = Field(
+        2.0,
+        validation_alias=AliasChoices("WS_COALESCE_WINDOW_MS", "ws_coalesce_window_ms"),
+        description="Frames queued for a batching client within this window go out as one array frame (0 disables)",
+    )
+    WS_COALESCE_MAX_FRAMES: int = Field(
+        64,
+        validation_alias=AliasChoices("WS_COALESCE_MAX_FRAMES", "ws_coalesce_max_frames"),
+        description="A batching client's queue is flushed early once it holds this many frames",
+    )
+
+    # Актори кімнат: послідовна обробка подій і стан у пам'яті власника
+    ROOM_ACTORS_ENABLED: bool = Field(
+        False,
+        validation_alias=AliasChoices("ROOM_ACTORS_ENABLED", "room_actors_enabled"),
+        description="Process each room's events serially on its owner and keep owned rooms in memory with write-behind to Redis (needs affinity or a single worker)",
+    )
+    WRITE_BEHIND_RETRIES: int = Field(
+        3,
+        validation_alias=AliasChoices("WRITE_BEHIND_RETRIES", "write_behind_retries"),
+        description="Attempts to persist one queued room write to Redis before the room queue stalls",
+    )
+
     # Загальні налаштування
     APP_NAME: str = "QuizzyLive Backend"
     API_V1_PREFIX: str = "/api/v1"
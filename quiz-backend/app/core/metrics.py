@@ -0,0 +1,54 @@
+from collections import defaultdict
+from typing import Dict
+
+
+class _Timing:
+    """Агрегат спостережень: кількість, сума та максимум"""
+
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def as_dict(self) -> dict:
+        avg = self.total / self.count if self.count else 0.0
+        return {
+            "count": self.count,
+            "avg": round(avg, 3),
+            "max": round(self.max, 3),
+        }
+
+
+class Metrics:
+    """
+    Легкий реєстр метрик процесу (лічильники та агрегати значень).
+
+    Один екземпляр на воркер; знімок віддається через /metrics.
+    """
+
+    def __init__(self) -> None:
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.timings: Dict[str, _Timing] = defaultdict(_Timing)
+
+    def inc(self, name: str, value: int = 1) -> None:
+        self.counters[name] += value
+
+    def observe(self, name: str, value: float) -> None:
+        self.timings[name].add(value)
+
+    def snapshot(self) -> dict:
+        return {
+            "counters": dict(self.counters),
+            "timings": {name: t.as_dict() for name, t in self.timings.items()},
+        }
+
+
+metrics = Metrics()
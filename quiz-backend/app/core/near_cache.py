@@ -0,0 +1,127 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis_manager import get_redis
+
+INVALIDATION_CHANNEL = "quiz:invalidate"
+
+_MISS = object()
+
+
+class NearCache:
+    """
+    Локальний кеш гарячих ключів Redis (стан і сесія кімнати) з
+    інвалідацією через pub/sub — аналог RESP3 client tracking для
+    асинхронного клієнта, який його не підтримує.
+
+    Кожен запис у закешований ключ публікує його ім'я в quiz:invalidate;
+    усі воркери (включно з автором запису) викидають ключ з кешу.
+    Кеш працює лише поки активна підписка: після розриву він очищується,
+    а TTL обмежує застарілість на випадок втрачених повідомлень.
+    """
+
+    def __init__(self) -> None:
+        self.entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # покоління ключа змінюється з кожною його інвалідацією: значення,
+        # прочитане до неї, не потрапляє в кеш. Лічильник спільний, а
+        # покоління зберігаються лише для останніх NEAR_CACHE_MAX_KEYS
+        # ключів; решта ключів має покоління floor — не менше за покоління
+        # будь-якого витісненого ключа
+        self.generations: "OrderedDict[str, int]" = OrderedDict()
+        self.floor = 0
+        self._clock = 0
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.NEAR_CACHE_ENABLED and self.ready
+
+    def get(self, key: str) -> Any:
+        """Значення з кешу або _MISS"""
+        if not self.enabled:
+            return _MISS
+        entry = self.entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            metrics.inc("near_cache.misses")
+            return _MISS
+        self.entries.move_to_end(key)
+        metrics.inc("near_cache.hits")
+        return entry[1]
+
+    def generation(self, key: str) -> int:
+        """Покоління ключа; береться перед читанням з Redis і передається в put"""
+        return self.generations.get(key, self.floor)
+
+    def put(self, key: str, value: Any, generation: int) -> None:
+        """Кешує значення, прочитане при generation (якщо з тих пір ключ не інвалідувався)"""
+        if not self.enabled or generation != self.generation(key):
+            return
+        self.entries[key] = (time.monotonic() + settings.NEAR_CACHE_TTL_SEC, value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > settings.NEAR_CACHE_MAX_KEYS:
+            self.entries.popitem(last=False)
+            metrics.inc("near_cache.evictions")
+
+    def invalidate(self, key: str) -> None:
+        self._clock += 1
+        self.generations[key] = self._clock
+        self.generations.move_to_end(key)
+        while len(self.generations) > settings.NEAR_CACHE_MAX_KEYS:
+            _, generation = self.generations.popitem(last=False)
+            self.floor = max(self.floor, generation)
+        if self.entries.pop(key, None) is not None:
+            metrics.inc("near_cache.invalidations")
+
+    def clear(self) -> None:
+        self._clock += 1
+        self.floor = self._clock
+        self.generations.clear()
+        self.entries.clear()
+
+    # --- підписка на інвалідації ---
+
+    async def start(self) -> None:
+        if settings.NEAR_CACHE_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.ready = False
+        self.clear()
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                await self._consume()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[near_cache] Підписку втрачено, кеш вимкнено: {e}")
+                await asyncio.sleep(1.0)
+            finally:
+                self.ready = False
+                self.clear()
+
+    async def _consume(self) -> None:
+        r = await get_redis()
+        pubsub = r.pubsub()
+        await pubsub.subscribe(INVALIDATION_CHANNEL)
+        try:
+            self.ready = True
+            print("[near_cache] Підписано на інвалідації")
+            async for item in pubsub.listen():
+                if item.get("type") == "message":
+                    self.invalidate(item["data"])
+        finally:
+            await pubsub.aclose()
+
+
+near_cache = NearCache()
+MISS = _MISS
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Optional, Set
+
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import metrics
+
+
+class Outbox:
+    """
+    Фонові записи у зовнішні системи (Supabase), винесені з event loop.
+
+    Синхронна функція виконується у threadpool з кількома повторами;
+    після успішного запису викликається on_done (якщо заданий).
+    Незавершені записи можна дочекатися через flush() перед зупинкою.
+    """
+
+    def __init__(self, attempts: int = 3, backoff_sec: float = 0.5) -> None:
+        self.attempts = attempts
+        self.backoff_sec = backoff_sec
+        self.pending: Set[asyncio.Task] = set()
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        on_done: Optional[Callable[[], Awaitable[None]]] = None,
+    ) -> None:
+        task = asyncio.create_task(self._run(name, fn, on_done))
+        self.pending.add(task)
+        task.add_done_callback(self.pending.discard)
+        metrics.inc("outbox.submitted")
+
+    async def _run(
+        self,
+        name: str,
+        fn: Callable[[], Any],
+        on_done: Optional[Callable[[], Awaitable[None]]],
+    ) -> None:
+        for attempt in range(1, self.attempts + 1):
+            try:
+                await run_in_threadpool(fn)
+            except Exception as e:
+                print(f"[outbox] {name}: спроба {attempt} невдала: {e}")
+                if attempt < self.attempts:
+                    await asyncio.sleep(self.backoff_sec * attempt)
+                continue
+            metrics.inc("outbox.done")
+            print(f"[outbox] {name}: виконано")
+            if on_done is not None:
+                try:
+                    await on_done()
+                except Exception as e:
+                    print(f"[outbox] {name}: помилка після запису: {e}")
+            return
+        metrics.inc("outbox.failed")
+
+    async def flush(self, timeout: float) -> int:
+        """Чекає на незавершені записи; повертає кількість тих, що не встигли"""
+        if not self.pending:
+            return 0
+        _, not_done = await asyncio.wait(set(self.pending), timeout=timeout)
+        return len(not_done)
+
+
+outbox = Outbox()
@@ -0,0 +1,210 @@
+import functools
+import inspect
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Deque, Dict, Iterator, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class _Trace:
+    """Одна подія: загальний час і (для вибірки) час по фазах"""
+
+    __slots__ = ("name", "room", "sampled", "closed", "phases")
+
+    def __init__(self, name: str, room: Optional[str], sampled: bool) -> None:
+        self.name = name
+        self.room = room
+        self.sampled = sampled
+        self.closed = False
+        # фаза -> [кількість викликів, сумарний час у мс]
+        self.phases: Dict[str, List[float]] = {}
+
+    def add(self, phase: str, ms: float) -> None:
+        # задачі, створені під час події (таймери), успадковують контекст
+        # і можуть завершитися пізніше — їх не враховуємо
+        if self.closed:
+            return
+        entry = self.phases.get(phase)
+        if entry is None:
+            self.phases[phase] = [1, ms]
+        else:
+            entry[0] += 1
+            entry[1] += ms
+
+    def breakdown(self) -> List[dict]:
+        return [
+            {"phase": phase, "calls": int(calls), "ms": round(ms, 2)}
+            for phase, (calls, ms) in sorted(
+                self.phases.items(), key=lambda item: item[1][1], reverse=True
+            )
+        ]
+
+
+_current: ContextVar[Optional[_Trace]] = ContextVar("profiler_trace", default=None)
+
+
+class _Phase:
+    """Контекстний менеджер фази; без активної вибірки нічого не робить"""
+
+    __slots__ = ("name", "trace", "started")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.trace = _current.get()
+        if self.trace is not None:
+            self.started = time.perf_counter()
+
+    def __exit__(self, *exc) -> None:
+        if self.trace is not None:
+            self.trace.add(self.name, (time.perf_counter() - self.started) * 1000)
+
+
+class Profiler:
+    """
+    Опціональне профілювання WebSocket-подій (PROFILER_ENABLED).
+
+    Кожна подія вимірюється цілком; для частки PROFILER_SAMPLE_RATE подій
+    додатково збирається розбивка по фазах: методи RoomManager (manager.*),
+    виклики сховища (store.*), серіалізація та запити до Supabase.
+    Час фаз включний: manager.reveal_answer містить і свої store.*.
+    Події, повільніші за PROFILER_SLOW_EVENT_MS, пишуться в лог і
+    зберігаються для /admin/slow-events.
+    """
+
+    def __init__(self) -> None:
+        self.slow_events: Deque[dict] = deque(maxlen=100)
+        self._sampling = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.PROFILER_ENABLED
+
+    @contextmanager
+    def trace(self, name: str, room: Optional[str] = None) -> Iterator[Optional[_Trace]]:
+        """Вимірює подію; name можна уточнити через повернений trace"""
+        if not self.enabled:
+            yield None
+            return
+        trace = _Trace(name, room, random.random() < settings.PROFILER_SAMPLE_RATE)
+        token = _current.set(trace) if trace.sampled else None
+        started = time.perf_counter()
+        try:
+            yield trace
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            trace.closed = True
+            if token is not None:
+                _current.reset(token)
+                metrics.inc("profiler.sampled_events")
+            if elapsed_ms >= settings.PROFILER_SLOW_EVENT_MS:
+                self._report_slow(trace, elapsed_ms)
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(name)
+
+    def _report_slow(self, trace: _Trace, elapsed_ms: float) -> None:
+        metrics.inc("profiler.slow_events")
+        phases = trace.breakdown()
+        self.slow_events.append({
+            "event": trace.name,
+            "room": trace.room,
+            "ms": round(elapsed_ms, 2),
+            "at": int(time.time() * 1000),
+            "phases": phases if trace.sampled else None,
+        })
+        details = "; ".join(
+            f"{p['phase']} {p['ms']} мс ×{p['calls']}" for p in phases
+        ) if trace.sampled else "без розбивки (подія не у вибірці)"
+        print(
+            f"[profiler] Повільна подія {trace.name} (кімната {trace.room}): "
+            f"{elapsed_ms:.1f} мс — {details}"
+        )
+
+    # --- інструментування класів ---
+
+    def instrument(self, cls: type, prefix: str) -> None:
+        """
+        Обгортає async-методи класу фазами {prefix}.{метод}. Нічого не робить,
+        якщо профілювання вимкнено, тож без нього накладних витрат немає.
+        """
+        if not self.enabled:
+            return
+        for name in dir(cls):
+            # staticmethod/classmethod/property лишаються як є
+            fn = inspect.getattr_static(cls, name)
+            if name.startswith("__") or not inspect.iscoroutinefunction(fn):
+                continue
+            if getattr(fn, "__profiled__", False):
+                continue
+            setattr(cls, name, _wrap(fn, f"{prefix}.{name}"))
+
+    # --- семплювання стеку event loop ---
+
+    def sample_stacks(self, thread_id: int, seconds: float) -> Optional[dict]:
+        """
+        Семплює стек потоку thread_id кожні PROFILER_SAMPLE_INTERVAL_MS
+        протягом seconds. Виконується в окремому потоці; повертає
+        найчастіші стеки у форматі folded або None, якщо семплювання вже йде.
+        """
+        if not self._sampling.acquire(blocking=False):
+            return None
+        try:
+            interval = settings.PROFILER_SAMPLE_INTERVAL_MS / 1000
+            deadline = time.monotonic() + seconds
+            stacks: Counter = Counter()
+            samples = 0
+            while time.monotonic() < deadline:
+                frame = sys._current_frames().get(thread_id)
+                if frame is not None:
+                    stacks[_fold(frame)] += 1
+                    samples += 1
+                time.sleep(interval)
+        finally:
+            self._sampling.release()
+        metrics.inc("profiler.profiles")
+        return {
+            "seconds": seconds,
+            "samples": samples,
+            "stacks": [
+                {"stack": stack, "count": count}
+                for stack, count in stacks.most_common(settings.PROFILER_TOP_STACKS)
+            ],
+        }
+
+
+def _fold(frame) -> str:
+    parts: List[str] = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def _wrap(fn, phase: str):
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        trace = _current.get()
+        if trace is None:
+            return await fn(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return await fn(*args, **kwargs)
+        finally:
+            trace.add(phase, (time.perf_counter() - started) * 1000)
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+profiler = Profiler()
@@ -1,12 +1,34 @@
-from redis.asyncio import Redis
+from redis.asyncio import ConnectionPool, Redis
 from app.core.config import settings
 
 _redis: Redis | None = None
+_redis_raw: Redis | None = None
+
+
+class _CountingConnectionPool(ConnectionPool):
+    """Пул, що рахує позичені з'єднання — операції Redis, які зараз у польоті"""
+
+    in_use = 0
+
+    async def get_connection(self, *args, **kwargs):
+        connection = await super().get_connection(*args, **kwargs)
+        _CountingConnectionPool.in_use += 1
+        return connection
+
+    async def release(self, connection):
+        _CountingConnectionPool.in_use -= 1
+        await super().release(connection)
+
+
+def redis_inflight() -> int:
+    """Зайняті з'єднання обох клієнтів (включно з підпискою near-cache)"""
+    return _CountingConnectionPool.in_use
+
 
 async def get_redis() -> Redis:
     global _redis
     if _redis is None:
-        _redis = Redis.from_url(
+        _redis = Redis.from_pool(_CountingConnectionPool.from_url(
             settings.redis_url,
             decode_responses=True,
             health_check_interval=30,     # періодичний PING для підтримки з'єднання
@@ -14,13 +36,31 @@ async def get_redis() -> Redis:
             socket_connect_timeout=3,     # таймаут на конект
             retry_on_timeout=True,
             max_connections=50,
-        )
+        ))
         # Перевірка доступності на старті
         await _redis.ping()
     return _redis
 
+async def get_redis_raw() -> Redis:
+    """Клієнт без декодування відповідей — для бінарних значень (стиснуті архіви)"""
+    global _redis_raw
+    if _redis_raw is None:
+        _redis_raw = Redis.from_pool(_CountingConnectionPool.from_url(
+            settings.redis_url,
+            decode_responses=False,
+            health_check_interval=30,
+            socket_timeout=3,
+            socket_connect_timeout=3,
+            retry_on_timeout=True,
+            max_connections=10,
+        ))
+    return _redis_raw
+
 async def close_redis():
-    global _redis
+    global _redis, _redis_raw
     if _redis is not None:
         await _redis.close()
-        _redis = None
\ No newline at end of file
+        _redis = None
+    if _redis_raw is not None:
+        await _redis_raw.close()
+        _redis_raw = None
\ No newline at end of file
@@ -0,0 +1,37 @@
+import hashlib
+from typing import List, Sequence
+
+from redis.asyncio import Redis
+from redis.exceptions import NoScriptError
+
+
+class RedisScript:
+    """
+    Lua-скрипт, що викликається через EVALSHA.
+
+    SHA рахується локально; якщо Redis ще не знає скрипт (рестарт,
+    failover), він довантажується і виклик повторюється.
+    """
+
+    def __init__(self, name: str, source: str) -> None:
+        self.name = name
+        self.source = source
+        self.sha = hashlib.sha1(source.encode()).hexdigest()
+        _SCRIPTS.append(self)
+
+    async def __call__(self, r: Redis, keys: Sequence[str], args: Sequence[object]):
+        try:
+            return await r.evalsha(self.sha, len(keys), *keys, *args)
+        except NoScriptError:
+            await r.script_load(self.source)
+            return await r.evalsha(self.sha, len(keys), *keys, *args)
+
+
+_SCRIPTS: List[RedisScript] = []
+
+
+async def load_scripts(r: Redis) -> int:
+    """Завантажує всі зареєстровані скрипти (викликається на старті воркера)"""
+    for script in _SCRIPTS:
+        await r.script_load(script.source)
+    return len(_SCRIPTS)
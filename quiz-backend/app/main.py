@@ -1,16 +1,71 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI
+from fastapi.responses import JSONResponse
 from .core.config import settings
+from .core.metrics import metrics
+from .core.near_cache import near_cache
 from .core.cors import setup_cors
+from .core.redis_manager import get_redis, close_redis
+from .core.redis_scripts import load_scripts
+from .core.supabase_client import get_supabase
+from .api.v1.routers import admin as admin_router
 from .api.v1.routers import quizzes as quizzes_router
+from .api.v1.routers import rooms as rooms_router
+from .api.v1.routers import sessions as sessions_router
 from .api.v1.routers import ws_router 
 
-app = FastAPI(title=settings.APP_NAME)
+
+async def warm_up() -> None:
+    """Готує ресурси до першого з'єднання, а не під час нього"""
+    if settings.ROOM_STATE_BACKEND == "redis" or settings.AFFINITY_ENABLED:
+        # створює пул і перевіряє доступність Redis (PING)
+        r = await get_redis()
+        loaded = await load_scripts(r)
+        print(f"[startup] Redis готовий, завантажено Lua-скриптів: {loaded}")
+    if settings.ROOM_STATE_BACKEND == "redis":
+        await near_cache.start()
+    get_supabase()
+    await ws_router.affinity.start()
+    await ws_router.manager.lifecycle.start()
+    await ws_router.heartbeat.start()
+    await ws_router.manager.audience.start()
+    await ws_router.admission.start()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await warm_up()
+    yield
+    # кімнати переходять на інші воркери, фонові записи дочікуються
+    await ws_router.drain.drain()
+    await ws_router.heartbeat.stop()
+    await ws_router.admission.stop()
+    await ws_router.manager.feed.stop()
+    await ws_router.manager.audience.stop()
+    await near_cache.stop()
+    await ws_router.manager.lifecycle.stop()
+    await close_redis()
+
+
+app = FastAPI(title=settings.APP_NAME, lifespan=lifespan)
 setup_cors(app)
 
 app.include_router(quizzes_router.router, prefix=settings.API_V1_PREFIX)
+app.include_router(sessions_router.router, prefix=settings.API_V1_PREFIX)
+app.include_router(rooms_router.router, prefix=settings.API_V1_PREFIX)
 
 app.include_router(ws_router.ws_router)
 
+app.include_router(admin_router.router)
+
 @app.get("/healthz")
 async def healthz():
+    # під час drain балансувальник має прибрати воркер з ротації
+    if ws_router.drain.draining:
+        return JSONResponse({"status": "draining"}, status_code=503)
     return {"status": "ok"}
+
+# лічильники кімнат, відмов і час подій — лише для операторів
+@app.get("/metrics", dependencies=[Depends(admin_router.require_admin)])
+async def get_metrics():
+    return metrics.snapshot()
@@ -1,6 +1,25 @@
+import uuid
 from typing import List, Optional, Tuple
+from postgrest.types import ReturnMethod
 from supabase import Client
 
+# Максимум рядків питань в одному insert/select при масових операціях
+QUESTION_INSERT_CHUNK = 1000
+
+
+def _question_rows(quiz_id: str, questions: List[dict]) -> List[dict]:
+    return [
+        {
+            "quiz_id": quiz_id,
+            "question_text": q["questionText"],
+            "answers": q["answers"],
+            "correct_answer": q["correctAnswer"],
+            "position": idx,
+        }
+        for idx, q in enumerate(questions)
+    ]
+
+
 class QuizRepository:
     def __init__(self, client: Client) -> None:
         self.client = client
@@ -47,17 +66,7 @@ class QuizRepository:
         quiz_id = quiz_ins.data[0]["id"]
 
         # масове додавання питань
-        rows = []
-        for idx, q in enumerate(questions):
-            rows.append(
-                {
-                    "quiz_id": quiz_id,
-                    "question_text": q["questionText"],
-                    "answers": q["answers"],
-                    "correct_answer": q["correctAnswer"],
-                    "position": idx,
-                }
-            )
+        rows = _question_rows(quiz_id, questions)
         if rows:
             self.client.table("questions").insert(rows).execute()
 
@@ -71,19 +80,63 @@ class QuizRepository:
         if questions is not None:
             # Проста стратегія: видалити всі питання та вставити нові
             self.client.table("questions").delete().eq("quiz_id", quiz_id).execute()
-            rows = []
-            for idx, q in enumerate(questions):
-                rows.append(
-                    {
-                        "quiz_id": quiz_id,
-                        "question_text": q["questionText"],
-                        "answers": q["answers"],
-                        "correct_answer": q["correctAnswer"],
-                        "position": idx,
-                    }
-                )
+            rows = _question_rows(quiz_id, questions)
             if rows:
                 self.client.table("questions").insert(rows).execute()
 
     def delete_quiz(self, quiz_id: str) -> None:
-        self.client.table("quizzes").delete().eq("id", quiz_id).execute()
\ No newline at end of file
+        self.client.table("quizzes").delete().eq("id", quiz_id).execute()
+
+    def bulk_create_quizzes(self, quizzes: List[dict]) -> List[str]:
+        """
+        Створює пачку вікторин кількома insert'ами замість двох на вікторину.
+        id генеруються на клієнті, тож питання не чекають на відповідь
+        з id вікторин. Якщо питання не вставились, вікторини пачки видаляються.
+        """
+        quiz_rows = [{"id": str(uuid.uuid4()), "title": q["title"]} for q in quizzes]
+        question_rows = [
+            row
+            for quiz_row, quiz in zip(quiz_rows, quizzes)
+            for row in _question_rows(quiz_row["id"], quiz["questions"])
+        ]
+        ids = [row["id"] for row in quiz_rows]
+
+        self.client.table("quizzes").insert(quiz_rows, returning=ReturnMethod.minimal).execute()
+        try:
+            for start in range(0, len(question_rows), QUESTION_INSERT_CHUNK):
+                chunk = question_rows[start:start + QUESTION_INSERT_CHUNK]
+                self.client.table("questions").insert(chunk, returning=ReturnMethod.minimal).execute()
+        except Exception:
+            self.client.table("quizzes").delete().in_("id", ids).execute()
+            raise
+        return ids
+
+    def list_quizzes_after(self, after_id: Optional[str], limit: int) -> List[dict]:
+        """Сторінка вікторин за id (keyset-пагінація, без OFFSET)"""
+        query = self.client.table("quizzes").select("id,title").order("id").limit(limit)
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        return query.execute().data or []
+
+    def list_questions_for(self, quiz_ids: List[str]) -> List[dict]:
+        """Питання кількох вікторин; читаються частинами, бо PostgREST обмежує розмір відповіді"""
+        rows: List[dict] = []
+        if not quiz_ids:
+            return rows
+        start = 0
+        while True:
+            res = (
+                self.client.table("questions")
+                .select("id,quiz_id,question_text,answers,correct_answer,position")
+                .in_("quiz_id", quiz_ids)
+                .order("quiz_id")
+                .order("position")
+                .order("id")
+                .range(start, start + QUESTION_INSERT_CHUNK - 1)
+                .execute()
+            )
+            page = res.data or []
+            rows.extend(page)
+            if len(page) < QUESTION_INSERT_CHUNK:
+                return rows
+            start += QUESTION_INSERT_CHUNK
@@ -1,4 +1,4 @@
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from supabase import Client
 
@@ -15,3 +15,40 @@ class QuizSessionRepository:
         які напряму відповідають колонкам таблиці.
         """
         self.client.table("quiz_sessions").insert(row).execute()
+
+    def list_sessions_after(
+        self,
+        after: Optional[Tuple[str, str]],
+        limit: int,
+        quiz_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        session_ids: Optional[Sequence[str]] = None,
+    ) -> List[dict]:
+        """
+        Сторінка завершених сесій, упорядкована за (ended_at, id).
+        after — ключ останньої сесії попередньої сторінки (keyset-пагінація,
+        без OFFSET); since/until — межі ended_at у форматі ISO 8601.
+        """
+        query = (
+            self.client.table("quiz_sessions")
+            .select("id,room_code,quiz_id,created_at,ended_at,scoreboard")
+            .order("ended_at")
+            .order("id")
+            .limit(limit)
+        )
+        if quiz_id is not None:
+            query = query.eq("quiz_id", quiz_id)
+        if since is not None:
+            query = query.gte("ended_at", since)
+        if until is not None:
+            query = query.lt("ended_at", until)
+        if session_ids:
+            query = query.in_("id", list(session_ids))
+        if after is not None:
+            ended_at, session_id = after
+            query = query.or_(
+                f'ended_at.gt."{ended_at}",'
+                f'and(ended_at.eq."{ended_at}",id.gt.{session_id})'
+            )
+        return query.execute().data or []
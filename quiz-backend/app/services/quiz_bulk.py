@@ -0,0 +1,127 @@
+import json
+from typing import AsyncIterator, List, Optional
+
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..schemas.quiz_schemas import QuizCreateIn
+from .quiz_service import QuizService
+
+
+class _ImportReport:
+    """Підсумок імпорту: лічильники та перші помилки по рядках"""
+
+    def __init__(self) -> None:
+        self.lines = 0
+        self.imported = 0
+        self.failed = 0
+        self.batches = 0
+        self.errors: List[dict] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.QUIZ_IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "lines": self.lines,
+            "imported": self.imported,
+            "failed": self.failed,
+            "batches": self.batches,
+            "errors": self.errors,
+            "errorsTruncated": self.failed > len(self.errors),
+        }
+
+
+async def _ndjson_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Optional[bytes]]:
+    """
+    Ділить потік на рядки, тримаючи в пам'яті лише незавершений рядок.
+    Рядок, довший за QUIZ_IMPORT_MAX_LINE_BYTES, повертається як None.
+    """
+    buffer = b""
+    oversized = False
+    async for chunk in chunks:
+        buffer += chunk
+        while True:
+            newline = buffer.find(b"\n")
+            if newline < 0:
+                break
+            line, buffer = buffer[:newline], buffer[newline + 1:]
+            yield None if oversized else line
+            oversized = False
+        if len(buffer) > settings.QUIZ_IMPORT_MAX_LINE_BYTES:
+            # решта рядка відкидається до наступного переносу
+            buffer = b""
+            oversized = True
+    if buffer or oversized:
+        yield None if oversized else buffer
+
+
+async def import_ndjson(chunks: AsyncIterator[bytes], svc: QuizService) -> dict:
+    """
+    Потоковий імпорт вікторин з NDJSON: кожен рядок — QuizCreateIn.
+    Валідні записи вставляються пачками по QUIZ_IMPORT_BATCH_SIZE,
+    некоректні рядки потрапляють у звіт і не зупиняють імпорт.
+    """
+    report = _ImportReport()
+    batch: List[dict] = []
+    batch_lines: List[int] = []
+
+    async def flush() -> None:
+        if not batch:
+            return
+        try:
+            await run_in_threadpool(svc.bulk_create_quizzes, list(batch))
+            report.imported += len(batch)
+            metrics.inc("quizzes.imported", len(batch))
+        except Exception as e:
+            for line_no in batch_lines:
+                report.error(line_no, f"Помилка запису пачки: {e}")
+        report.batches += 1
+        print(
+            f"[import] Пачка {report.batches}: оброблено {report.lines} рядків, "
+            f"імпортовано {report.imported}, помилок {report.failed}"
+        )
+        batch.clear()
+        batch_lines.clear()
+
+    async for line in _ndjson_lines(chunks):
+        report.lines += 1
+        if line is None:
+            report.error(report.lines, "Рядок перевищує допустимий розмір")
+            continue
+        if not line.strip():
+            continue
+        try:
+            quiz = QuizCreateIn.model_validate_json(line)
+        except ValidationError as e:
+            report.error(report.lines, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            ))
+            continue
+        batch.append({"title": quiz.title, "questions": [q.model_dump() for q in quiz.questions]})
+        batch_lines.append(report.lines)
+        if len(batch) >= settings.QUIZ_IMPORT_BATCH_SIZE:
+            await flush()
+
+    await flush()
+    return report.as_dict()
+
+
+async def export_ndjson(svc: QuizService) -> AsyncIterator[bytes]:
+    """Потоковий експорт усіх вікторин у NDJSON, сторінка за сторінкою"""
+    after_id: Optional[str] = None
+    while True:
+        records, after_id = await run_in_threadpool(
+            svc.export_page, after_id, settings.QUIZ_EXPORT_PAGE_SIZE
+        )
+        if records:
+            yield "".join(
+                json.dumps(record, ensure_ascii=False) + "\n" for record in records
+            ).encode()
+            metrics.inc("quizzes.exported", len(records))
+        if after_id is None:
+            return
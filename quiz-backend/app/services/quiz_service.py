@@ -1,4 +1,5 @@
-from typing import List, Optional
+from collections import defaultdict
+from typing import List, Optional, Tuple
 from .typing import to_iso
 from ..repositories.quiz_repository import QuizRepository
 
@@ -46,4 +47,31 @@ class QuizService:
         self.repo.update_quiz(quiz_id, title, questions)
 
     def delete_quiz(self, quiz_id: str) -> None:
-        self.repo.delete_quiz(quiz_id)
\ No newline at end of file
+        self.repo.delete_quiz(quiz_id)
+
+    def bulk_create_quizzes(self, quizzes: List[dict]) -> List[str]:
+        return self.repo.bulk_create_quizzes(quizzes)
+
+    def export_page(self, after_id: Optional[str], limit: int) -> Tuple[List[dict], Optional[str]]:
+        """
+        Сторінка вікторин у форматі QuizCreateIn (плюс id) і курсор
+        наступної сторінки (None — сторінок більше немає).
+        """
+        quizzes = self.repo.list_quizzes_after(after_id, limit)
+        if not quizzes:
+            return [], None
+        by_quiz: dict[str, list[dict]] = defaultdict(list)
+        for q in self.repo.list_questions_for([quiz["id"] for quiz in quizzes]):
+            by_quiz[q["quiz_id"]].append(
+                {
+                    "questionText": q["question_text"],
+                    "answers": q["answers"],
+                    "correctAnswer": q["correct_answer"],
+                }
+            )
+        records = [
+            {"id": quiz["id"], "title": quiz["title"], "questions": by_quiz[quiz["id"]]}
+            for quiz in quizzes
+        ]
+        next_after = quizzes[-1]["id"] if len(quizzes) == limit else None
+        return records, next_after
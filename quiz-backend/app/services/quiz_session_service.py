@@ -1,5 +1,5 @@
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from ..core.supabase_client import get_supabase
 from ..repositories.quiz_session_repository import QuizSessionRepository
@@ -52,3 +52,29 @@ class QuizSessionService:
         }
 
         self.repo.insert_session(row)
+
+    def export_page(
+        self,
+        after: Optional[Tuple[str, str]],
+        limit: int,
+        quiz_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        session_ids: Optional[Sequence[str]] = None,
+    ) -> Tuple[List[dict], Optional[Tuple[str, str]]]:
+        """
+        Сторінка сесій для експорту результатів і курсор наступної
+        сторінки (None — сторінок більше немає).
+        """
+        sessions = self.repo.list_sessions_after(
+            after,
+            limit,
+            quiz_id=quiz_id,
+            since=since.isoformat() if since is not None else None,
+            until=until.isoformat() if until is not None else None,
+            session_ids=session_ids,
+        )
+        if len(sessions) < limit:
+            return sessions, None
+        last = sessions[-1]
+        return sessions, (last["ended_at"], last["id"])
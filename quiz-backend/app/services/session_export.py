@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .quiz_session_service import QuizSessionService
+
+# Один рядок експорту — результат одного гравця в одній сесії
+RESULT_FIELDS = [
+    "sessionId",
+    "roomCode",
+    "quizId",
+    "endedAt",
+    "rank",
+    "playerId",
+    "name",
+    "score",
+]
+
+
+def _result_rows(session: dict) -> Iterator[dict]:
+    for rank, entry in enumerate(session.get("scoreboard") or [], start=1):
+        yield {
+            "sessionId": session["id"],
+            "roomCode": session["room_code"],
+            "quizId": session.get("quiz_id"),
+            "endedAt": session["ended_at"],
+            "rank": rank,
+            "playerId": entry.get("playerId"),
+            "name": entry.get("name"),
+            "score": entry.get("score", 0),
+        }
+
+
+def _format_rows(rows: List[dict], fmt: str) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=RESULT_FIELDS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+async def export_results(
+    svc: QuizSessionService,
+    fmt: str,
+    quiz_id: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    session_ids: Optional[Sequence[str]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Потоковий експорт результатів сесій (CSV або NDJSON).
+    У пам'яті лише одна сторінка сесій; заголовок CSV надсилається
+    до першого запиту в базу.
+    """
+    if fmt == "csv":
+        # BOM — щоб Excel правильно відкрив кирилицю в UTF-8
+        buffer = io.StringIO()
+        csv.DictWriter(buffer, fieldnames=RESULT_FIELDS).writeheader()
+        yield ("\ufeff" + buffer.getvalue()).encode()
+
+    after: Optional[Tuple[str, str]] = None
+    while True:
+        sessions, after = await run_in_threadpool(
+            svc.export_page,
+            after,
+            settings.SESSION_EXPORT_PAGE_SIZE,
+            quiz_id,
+            since,
+            until,
+            session_ids,
+        )
+        rows = [row for session in sessions for row in _result_rows(session)]
+        if rows:
+            yield _format_rows(rows, fmt).encode()
+            metrics.inc("sessions.exported_rows", len(rows))
+        if after is None:
+            return
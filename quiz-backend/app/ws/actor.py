@@ -0,0 +1,90 @@
+import asyncio
+import contextvars
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple, TypeVar
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+Job = Callable[[], Awaitable[Any]]
+
+
+class _RoomActor:
+    """Черга робіт однієї кімнати і задача, що виконує їх по черзі"""
+
+    __slots__ = ("jobs", "task", "running")
+
+    def __init__(self) -> None:
+        self.jobs: Deque[Tuple[Job, contextvars.Context, asyncio.Future]] = deque()
+        self.task: Optional[asyncio.Task] = None
+        # задача поточної роботи (виконується в контексті свого викликача)
+        self.running: Optional[asyncio.Task] = None
+
+
+class RoomActors:
+    """
+    Актори кімнат (ROOM_ACTORS_ENABLED): усе, що змінює стан кімнати
+    на її воркері — обробники подій, приєднання гравців, кроки таймерів, —
+    виконується по черзі однією задачею кімнати.
+
+    Роботи різних кімнат ідуть паралельно, а роботи однієї кімнати не
+    перемежовуються на await, тож читання стану і запис на його основі
+    не змагаються з іншими подіями. Задача актора існує, доки в черзі
+    є роботи; виклик з самого актора виконується одразу. Кожна робота
+    виконується з contextvars свого викликача (трасування профайлера
+    належить його події, а не тій, що запустила актора).
+    """
+
+    def __init__(self) -> None:
+        self.actors: Dict[str, _RoomActor] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ROOM_ACTORS_ENABLED
+
+    async def run(self, room: str, job: Callable[[], Awaitable[T]]) -> T:
+        """Виконує job в черзі кімнати і повертає його результат"""
+        if not self.enabled:
+            return await job()
+        actor = self.actors.get(room)
+        if actor is None:
+            actor = self.actors[room] = _RoomActor()
+        elif actor.running is not None and actor.running is asyncio.current_task():
+            return await job()
+
+        future = asyncio.get_running_loop().create_future()
+        actor.jobs.append((job, contextvars.copy_context(), future))
+        metrics.observe("actors.queue_depth", len(actor.jobs))
+        if actor.task is None:
+            actor.task = asyncio.create_task(self._loop(room, actor))
+        # скасування викликача знімає роботу з черги, якщо вона ще не почалась
+        return await future
+
+    async def _loop(self, room: str, actor: _RoomActor) -> None:
+        try:
+            while actor.jobs:
+                job, ctx, future = actor.jobs.popleft()
+                if future.done():
+                    continue
+                started = time.perf_counter()
+                actor.running = asyncio.create_task(job(), context=ctx)
+                try:
+                    result = await actor.running
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+                finally:
+                    actor.running = None
+                metrics.observe("actors.job_ms", (time.perf_counter() - started) * 1000)
+        finally:
+            # скасування актора (зупинка воркера) не лишає викликачів чекати
+            for _, _, future in actor.jobs:
+                future.cancel()
+            actor.jobs.clear()
+            if self.actors.get(room) is actor:
+                del self.actors[room]
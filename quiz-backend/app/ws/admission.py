@@ -0,0 +1,115 @@
+import asyncio
+import json
+import random
+from typing import TYPE_CHECKING, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis_manager import redis_inflight
+
+if TYPE_CHECKING:
+    from app.ws.room_manager import RoomManager
+
+# Стандартний код закриття "Try Again Later"
+CLOSE_TRY_AGAIN_LATER = 1013
+
+# Причина відмови -> повідомлення для логу
+_SHED_REASONS = {
+    "connections": "забагато з'єднань",
+    "rooms": "забагато кімнат",
+    "loop_lag": "затримка event loop",
+    "redis_inflight": "черга запитів до Redis",
+}
+
+
+class AdmissionController:
+    """
+    Контроль допуску нових WebSocket-з'єднань.
+
+    Сторож вимірює затримку event loop (наскільки пізніше запланованого
+    прокидається sleep), а пул Redis рахує операції в польоті. Поки
+    будь-який показник або кількість з'єднань чи кімнат воркера вище
+    порогу, нові з'єднання закриваються з кодом 1013 і часом повтору —
+    наявні кімнати продовжують працювати без деградації.
+
+    Перепідключення хоста і з'єднання в кімнати, які воркер уже обслуговує,
+    не відсікаються: без хоста зупиняється вся кімната, а гравці наявних
+    кімнат — саме те навантаження, яке контроль допуску захищає.
+    """
+
+    def __init__(self, manager: "RoomManager") -> None:
+        self.manager = manager
+        self.lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    # --- сторож ---
+
+    async def start(self) -> None:
+        if settings.ADMISSION_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _watch(self) -> None:
+        loop = asyncio.get_running_loop()
+        interval = settings.ADMISSION_PROBE_INTERVAL_MS / 1000
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (loop.time() - started - interval) * 1000)
+            # згладжування, щоб одиничний сплеск не відсікав з'єднання
+            self.lag_ms = self.lag_ms * 0.5 + lag_ms * 0.5
+            metrics.observe("admission.loop_lag_ms", lag_ms)
+
+    # --- рішення ---
+
+    def check(self, room: str, role: str = "player") -> Optional[str]:
+        """Причина відмови новому з'єднанню в кімнату або None"""
+        if not settings.ADMISSION_ENABLED:
+            return None
+        connections = sum(len(c) for c in self.manager.connections.values())
+        # облікові записи lifecycle є лише в кімнат з сесією: підключення
+        # з невідомими кодами не наближають воркер до ліміту кімнат
+        rooms = self.manager.lifecycle.rooms
+        served = room in self.manager.connections or room in rooms
+        if not served and len(rooms) >= settings.MAX_ROOMS_PER_WORKER:
+            reason = "rooms"
+        elif role == "host" or served:
+            metrics.inc("admission.exempt")
+            return None
+        elif connections >= settings.ADMISSION_MAX_CONNECTIONS:
+            reason = "connections"
+        elif self.lag_ms > settings.ADMISSION_MAX_LOOP_LAG_MS:
+            reason = "loop_lag"
+        elif redis_inflight() > settings.ADMISSION_MAX_REDIS_INFLIGHT:
+            reason = "redis_inflight"
+        else:
+            metrics.inc("admission.accepted")
+            return None
+        metrics.inc(f"admission.rejected.{reason}")
+        return reason
+
+    async def reject(self, websocket, reason: str) -> None:
+        """Закриває з'єднання з 1013; клієнт повторює спробу через afterMs"""
+        after_ms = settings.ADMISSION_RETRY_AFTER_MS + random.randint(
+            0, settings.RECONNECT_JITTER_MS
+        )
+        print(f"[admission] З'єднання відхилено: {_SHED_REASONS[reason]}")
+        await websocket.accept()
+        await websocket.send_text(
+            json.dumps({"type": "reconnect", "url": None, "afterMs": after_ms})
+        )
+        await websocket.close(
+            code=CLOSE_TRY_AGAIN_LATER, reason=f"retry-after={-(-after_ms // 1000)}"
+        )
+
+    def report(self) -> dict:
+        return {
+            "loopLagMs": round(self.lag_ms, 3),
+            "redisInflight": redis_inflight(),
+            "connections": sum(len(c) for c in self.manager.connections.values()),
+            "rooms": len(self.manager.lifecycle.rooms),
+        }
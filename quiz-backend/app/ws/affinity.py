@@ -0,0 +1,215 @@
+import asyncio
+import bisect
+import hashlib
+import json
+import os
+import random
+import socket
+import time
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis_manager import get_redis
+from app.ws.keys import room_key
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import PendingWritesError
+
+# Код закриття для "кімната обслуговується іншим воркером"
+CLOSE_WRONG_WORKER = 4001
+
+WORKERS_KEY = "quiz:workers:alive"
+WORKER_URLS_KEY = "quiz:workers:urls"
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Консистентне хешування з віртуальними вузлами"""
+
+    def __init__(self, nodes: List[str], vnodes: int) -> None:
+        self.nodes = sorted(nodes)
+        points = sorted(
+            (_hash(f"{node}#{i}"), node) for node in self.nodes for i in range(vnodes)
+        )
+        self._keys = [p for p, _ in points]
+        self._owners = [node for _, node in points]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._keys:
+            return None
+        idx = bisect.bisect(self._keys, _hash(key)) % len(self._keys)
+        return self._owners[idx]
+
+
+class RoomAffinity:
+    """
+    Прив'язка кімнат до воркерів для багатопроцесного режиму.
+
+    Кожен воркер реєструється в Redis і періодично оновлює heartbeat.
+    Власник кімнати визначається консистентним хешем roomCode по живих
+    воркерах і фіксується в ключі owner кімнати. З'єднання, що
+    потрапило не на свого воркера, отримує кадр reconnect з адресою
+    власника. Коли склад воркерів змінюється, кімнати, що тепер
+    хешуються на інший воркер, передаються йому: стан уже в Redis,
+    тож достатньо перенаправити клієнтів і зняти локальні таймери.
+    """
+
+    def __init__(self, manager: RoomManager) -> None:
+        self.manager = manager
+        self.enabled = settings.AFFINITY_ENABLED
+        self.worker_id = settings.WORKER_ID or f"{socket.gethostname()}:{os.getpid()}"
+        self.public_url = settings.WORKER_PUBLIC_URL
+        self.live: Dict[str, str] = {}
+        self.ring = HashRing([], settings.AFFINITY_VNODES)
+        self._task: Optional[asyncio.Task] = None
+
+    def k_owner(self, room: str) -> str:
+        return room_key(room, "owner")
+
+    @property
+    def owner_ttl(self) -> int:
+        return max(1, int(settings.AFFINITY_WORKER_TTL_SEC))
+
+    # --- життєвий цикл воркера ---
+
+    async def start(self) -> None:
+        if not self.enabled or self._task is not None:
+            return
+        if not self.public_url:
+            raise RuntimeError("AFFINITY_ENABLED вимагає WORKER_PUBLIC_URL")
+        await self._heartbeat()
+        self._task = asyncio.create_task(self._loop())
+        print(f"[affinity] Воркер {self.worker_id} зареєстровано ({self.public_url})")
+
+    async def stop(self) -> None:
+        """Виходить з кільця і передає свої кімнати іншим воркерам"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        r = await get_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.zrem(WORKERS_KEY, self.worker_id)
+            pipe.hdel(WORKER_URLS_KEY, self.worker_id)
+            await pipe.execute()
+        self.live.pop(self.worker_id, None)
+        self.ring = HashRing(list(self.live), settings.AFFINITY_VNODES)
+        await self._rebalance()
+        print(f"[affinity] Воркер {self.worker_id} вийшов з кільця")
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.AFFINITY_HEARTBEAT_SEC)
+            try:
+                await self._heartbeat()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[affinity] Помилка heartbeat: {e}")
+
+    async def _heartbeat(self) -> None:
+        r = await get_redis()
+        now_ms = int(time.time() * 1000)
+        cutoff = now_ms - int(settings.AFFINITY_WORKER_TTL_SEC * 1000)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.zadd(WORKERS_KEY, {self.worker_id: now_ms})
+            pipe.hset(WORKER_URLS_KEY, self.worker_id, self.public_url)
+            pipe.zremrangebyscore(WORKERS_KEY, "-inf", cutoff)
+            pipe.zrange(WORKERS_KEY, 0, -1)
+            pipe.hgetall(WORKER_URLS_KEY)
+            # власність кімнат цього воркера продовжується (edge-кімнати не враховуються)
+            for room in self.manager.lifecycle.rooms:
+                pipe.set(self.k_owner(room), self.worker_id, ex=self.owner_ttl * 3, xx=True)
+            results = await pipe.execute()
+        alive, urls = results[3], results[4]
+        live = {wid: urls[wid] for wid in alive if wid in urls}
+
+        if set(live) != set(self.live):
+            print(f"[affinity] Склад воркерів змінився: {sorted(live)}")
+            metrics.inc("affinity.membership_changes")
+            self.live = live
+            self.ring = HashRing(list(live), settings.AFFINITY_VNODES)
+            await self._rebalance()
+        else:
+            self.live = live
+
+    # --- маршрутизація ---
+
+    async def resolve(self, room: str) -> Optional[str]:
+        """Повертає id воркера-власника кімнати (і закріплює, якщо це ми)"""
+        r = await get_redis()
+        owner = await r.get(self.k_owner(room))
+        if owner is not None and owner in self.live:
+            return owner
+
+        target = self.ring.owner(room)
+        if target == self.worker_id:
+            # власник відсутній або мертвий — закріплюємо кімнату за собою
+            await r.set(self.k_owner(room), self.worker_id, ex=self.owner_ttl * 3)
+        return target
+
+    async def redirect_url(self, room: str) -> Optional[str]:
+        """
+        URL воркера, до якого треба перепідключитися, або None,
+        якщо кімнату обслуговує цей воркер.
+        """
+        if not self.enabled:
+            return None
+        await self.start()
+        owner = await self.resolve(room)
+        if owner is None or owner == self.worker_id:
+            return None
+        url = self.live.get(owner)
+        if url is None:
+            # адреса власника невідома — обслуговуємо локально, ніж відмовляти
+            metrics.inc("affinity.unknown_owner_url")
+            return None
+        metrics.inc("affinity.redirects")
+        return url
+
+    # --- передача кімнат ---
+
+    async def _rebalance(self) -> None:
+        for room in list(self.manager.lifecycle.rooms):
+            target = self.ring.owner(room)
+            if target is not None and target != self.worker_id:
+                await self.handoff(room, target)
+
+    async def handoff(self, room: str, target: str) -> None:
+        """Передає кімнату іншому воркеру та перенаправляє її клієнтів"""
+        url = self.live.get(target)
+        if url is None:
+            return
+        print(f"[affinity] Передача кімнати {room} воркеру {target}")
+        metrics.inc("affinity.handoffs")
+
+        # новий власник завантажить кімнату з Redis: спершу дописуємо
+        # відкладені записи (ROOM_ACTORS_ENABLED), а ті, що встигли стати
+        # в чергу до release, — після нього. Поки записи не збережені,
+        # кімната лишається на цьому воркері
+        try:
+            await self.manager.store.flush(room)
+            self.manager.lifecycle.release(room)
+            await self.manager.store.flush(room)
+        except PendingWritesError as e:
+            print(f"[affinity] Кімнату {room} не передано: {e}")
+            metrics.inc("affinity.handoff_refused")
+            self.manager.lifecycle.claim(room)
+            return
+
+        r = await get_redis()
+        await r.set(self.k_owner(room), target, ex=self.owner_ttl * 3)
+
+        frame = {"type": "reconnect", "url": url}
+        for ws in list(self.manager.connections.get(room, ())):
+            try:
+                # рознесені в часі перепідключення не створюють сплеск на новому воркері
+                frame["afterMs"] = random.randint(0, settings.RECONNECT_JITTER_MS)
+                await ws.send_text(json.dumps(frame))
+                await ws.close(code=CLOSE_WRONG_WORKER)
+            except Exception as e:
+                print(f"[affinity] Помилка перенаправлення: {e}")
+            await self.manager.unregister(room, ws)
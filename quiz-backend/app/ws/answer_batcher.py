@@ -0,0 +1,91 @@
+import asyncio
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.ws.room_store import RoomStore
+
+# (player_id, option_index, now_ms, future з результатом ANSWER_*)
+_Pending = Tuple[int, int, int, asyncio.Future]
+
+
+class AnswerBatcher:
+    """
+    Пакетний прийом відповідей.
+
+    Відповіді, що надходять на воркер протягом ANSWER_BATCH_WINDOW_MS,
+    збираються по (кімната, питання) і записуються одним викликом
+    сховища (один Lua-скрипт на групу). Кожен виклик submit чекає на
+    запис своєї пачки, тож answer_ack іде клієнту вже після коміту.
+    Час відповіді фіксується в момент отримання, а не запису пачки.
+    """
+
+    def __init__(self, store: RoomStore) -> None:
+        self.store = store
+        self.pending: Dict[Tuple[str, int], List[_Pending]] = {}
+        self.size = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # задачі запису пачок: посилання не дає циклу подій зібрати їх посеред запису
+        self._flush_tasks: Set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ANSWER_BATCH_WINDOW_MS > 0
+
+    async def submit(
+        self, room: str, qidx: int, player_id: int, option_index: int, now_ms: int
+    ) -> str:
+        if not self.enabled:
+            return await self.store.submit_answer(room, qidx, player_id, option_index, now_ms)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.setdefault((room, qidx), []).append(
+            (player_id, option_index, now_ms, future)
+        )
+        self.size += 1
+        if self.size >= settings.ANSWER_BATCH_MAX:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(
+                settings.ANSWER_BATCH_WINDOW_MS / 1000, self._schedule_flush
+            )
+        return await future
+
+    def _schedule_flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self.pending:
+            task = asyncio.create_task(self.flush())
+            self._flush_tasks.add(task)
+            task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> None:
+        """Записує все накопичене; кожна група (кімната, питання) — окремий виклик"""
+        groups, self.pending, self.size = self.pending, {}, 0
+        if not groups:
+            return
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            self._commit(room, qidx, items) for (room, qidx), items in groups.items()
+        ))
+        metrics.observe("answers.batch_ms", (time.perf_counter() - started) * 1000)
+
+    async def _commit(self, room: str, qidx: int, items: List[_Pending]) -> None:
+        metrics.inc("answers.batches")
+        metrics.observe("answers.batch_size", len(items))
+        try:
+            results = await self.store.submit_answers(
+                room, qidx, [(pid, opt, now_ms) for pid, opt, now_ms, _ in items]
+            )
+        except Exception as e:
+            print(f"[answers] Помилка запису пачки {room}/{qidx}: {e}")
+            for *_, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (*_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
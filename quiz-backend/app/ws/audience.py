@@ -0,0 +1,184 @@
+import asyncio
+import json
+import uuid
+from typing import TYPE_CHECKING, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.redis_manager import get_redis
+from app.ws.connection import TO_ALL
+
+if TYPE_CHECKING:
+    from app.ws.room_manager import RoomManager
+
+FANOUT_PATTERN = "quiz:fanout:*"
+
+
+def fanout_channel(room: str) -> str:
+    return f"quiz:fanout:{room}"
+
+
+class AudienceMode:
+    """
+    Режим великої аудиторії для кімнат з тисячами гравців.
+
+    Вмикається автоматично, коли кількість гравців досягає
+    AUDIENCE_MODE_THRESHOLD (прапорець audience у стані кімнати):
+    - приєднання не розсилаються поодинці — власник кімнати раз на
+      AUDIENCE_UPDATE_SEC надсилає audience_update з кількістю гравців;
+    - замість повного скорборду клієнти отримують top-K і кількість гравців;
+    - гравці можуть підключатися до будь-якого воркера (edge). Власник
+      публікує кожну подію кімнати один раз у quiz:fanout:{room},
+      а кожен воркер розсилає її своїм локальним з'єднанням.
+    """
+
+    def __init__(self, manager: "RoomManager") -> None:
+        self.manager = manager
+        # мітка воркера, щоб не розсилати власні публікації вдруге
+        self.origin = uuid.uuid4().hex
+        # кімнати в режимі аудиторії, якими володіє цей воркер -> остання відома кількість
+        self.rooms: Dict[str, int] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._updater: Optional[asyncio.Task] = None
+
+    @property
+    def fanout_enabled(self) -> bool:
+        return settings.ROOM_STATE_BACKEND == "redis"
+
+    @staticmethod
+    def is_audience(state: dict) -> bool:
+        return bool(state.get("audience"))
+
+    # --- перемикання режиму ---
+
+    async def on_join(self, room: str, state: dict) -> bool:
+        """
+        Викликається після додавання гравця. Повертає True, якщо кімната
+        в режимі аудиторії і player_joined розсилати не потрібно.
+        """
+        if self.is_audience(state):
+            return True
+        count = await self.manager.store.count_players(room)
+        if count < settings.AUDIENCE_MODE_THRESHOLD:
+            return False
+        await self.enable(room, count)
+        return True
+
+    async def enable(self, room: str, count: int) -> None:
+        await self.manager.set_state(room, audience=True)
+        self.rooms[room] = count
+        print(f"[audience] Кімната {room}: {count} гравців, увімкнено режим аудиторії")
+        metrics.inc("audience.enabled")
+        await self.broadcast(room, {"type": "audience_mode", "players": count})
+        self._ensure_updater()
+
+    def adopt(self, room: str, state: dict) -> None:
+        """Новий власник кімнати (після передачі) продовжує надсилати оновлення"""
+        if self.is_audience(state) and room not in self.rooms:
+            self.rooms[room] = -1
+            self._ensure_updater()
+
+    def forget(self, room: str) -> None:
+        self.rooms.pop(room, None)
+
+    # --- дані для клієнтів ---
+
+    async def scoreboard(self, room: str, state: dict) -> list[dict]:
+        """Повний скорборд або top-K у режимі аудиторії"""
+        if not self.is_audience(state):
+            return await self.manager.scoreboard(room)
+        top = await self.manager.store.get_top_scores(room, settings.AUDIENCE_TOP_K)
+        return [
+            {"playerId": pid, "name": name, "score": score}
+            for pid, name, score in top
+        ]
+
+    async def reveal_extras(self, room: str, state: dict) -> dict:
+        """Поля answer_revealed, яких немає в звичайному режимі"""
+        if not self.is_audience(state):
+            return {}
+        return {"players": await self.manager.store.count_players(room)}
+
+    # --- рознесена розсилка ---
+
+    async def broadcast(self, room: str, message: dict, to: str = TO_ALL) -> None:
+        """
+        Розсилка на всю кімнату: локальним з'єднанням і, для кімнати
+        в режимі аудиторії, одна публікація для edge-воркерів.
+        """
+        await self.manager.broadcast(room, message, to=to)
+        if room in self.rooms and self.fanout_enabled:
+            r = await get_redis()
+            await r.publish(
+                fanout_channel(room),
+                json.dumps({"origin": self.origin, "message": message, "to": to}),
+            )
+            metrics.inc("audience.published")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                await self._consume()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[audience] Підписку втрачено, повтор: {e}")
+                await asyncio.sleep(1.0)
+
+    async def _consume(self) -> None:
+        r = await get_redis()
+        pubsub = r.pubsub()
+        await pubsub.psubscribe(FANOUT_PATTERN)
+        try:
+            async for item in pubsub.listen():
+                if item.get("type") != "pmessage":
+                    continue
+                room = item["channel"].split(":", 2)[2]
+                if room not in self.manager.connections:
+                    continue
+                envelope = json.loads(item["data"])
+                if envelope.get("origin") == self.origin:
+                    continue
+                await self.manager.broadcast(
+                    room, envelope["message"], to=envelope.get("to", TO_ALL)
+                )
+                metrics.inc("audience.fanout_received")
+        finally:
+            await pubsub.aclose()
+
+    # --- агреговані приєднання ---
+
+    def _ensure_updater(self) -> None:
+        if self._updater is None:
+            self._updater = asyncio.create_task(self._update_loop())
+
+    async def _update_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.AUDIENCE_UPDATE_SEC)
+            for room, last in list(self.rooms.items()):
+                if room not in self.manager.lifecycle.rooms:
+                    # кімнату знищено або передано іншому воркеру
+                    self.forget(room)
+                    continue
+                try:
+                    count = await self.manager.store.count_players(room)
+                    if count != last:
+                        self.rooms[room] = count
+                        await self.broadcast(room, {"type": "audience_update", "players": count})
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    print(f"[audience] Помилка оновлення {room}: {e}")
+
+    # --- життєвий цикл воркера ---
+
+    async def start(self) -> None:
+        if self.fanout_enabled and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        for task in (self._listener, self._updater):
+            if task is not None:
+                task.cancel()
+        self._listener = None
+        self._updater = None
@@ -0,0 +1,133 @@
+import asyncio
+from typing import TYPE_CHECKING, Optional
+
+from app.core.metrics import metrics
+from app.ws.connection import TO_LEGACY
+
+if TYPE_CHECKING:
+    from app.ws.room_manager import RoomManager
+
+
+class AutoplayDirector:
+    """
+    Автоплей: сервер сам веде вікторину за розкладом, заданим у
+    host:create_session (поле autoplay у стані кімнати).
+
+    Перше питання запускає хост (host:next_question або host:resume);
+    далі питання розкривається після durationMs, через revealPauseMs
+    стартує наступне, а після останнього сесія завершується й архівується.
+    Хост може поставити розклад на паузу (поточне питання доходить до
+    розкриття, наступне не стартує), відновити його або пропустити крок.
+
+    Кроки виконуються в таймері кімнати RoomManager.timers, тож
+    ручні переходи хоста та знищення кімнати їх скасовують.
+    """
+
+    def __init__(self, manager: "RoomManager") -> None:
+        self.manager = manager
+
+    # --- розклад ---
+
+    def on_revealed(self, room: str, qidx: int, state: dict) -> None:
+        """Після розкриття планує наступний крок, якщо автоплей не на паузі"""
+        config = state.get("autoplay")
+        if not config or config.get("paused"):
+            return
+        self.manager.schedule_timer(
+            room, self._advance_after(room, qidx, config["revealPauseMs"])
+        )
+
+    def ensure(self, room: str, state: dict) -> None:
+        """Відновлює крок розкладу після передачі кімнати з іншого воркера"""
+        config = state.get("autoplay")
+        if (
+            not config
+            or config.get("paused")
+            or state.get("phase") != "REVEAL"
+            or room in self.manager.timers
+        ):
+            return
+        print(f"[autoplay] Відновлено розклад для {room}")
+        self.on_revealed(room, state.get("questionIndex", -1), state)
+
+    async def _advance_after(self, room: str, qidx: int, delay_ms: int) -> None:
+        await asyncio.sleep(delay_ms / 1000.0)
+        await self.manager.actors.run(room, lambda: self._advance_step(room, qidx))
+
+    async def _advance_step(self, room: str, qidx: int) -> None:
+        state = await self.manager.get_state(room)
+        config = state.get("autoplay") or {}
+        if (
+            state.get("phase") != "REVEAL"
+            or state.get("questionIndex") != qidx
+            or config.get("paused")
+        ):
+            print(f"[autoplay] Пропуск кроку для {room}: стан змінився")
+            return
+        await self.advance(room, state)
+
+    async def advance(self, room: str, state: dict) -> None:
+        """Наступне питання або завершення сесії після останнього"""
+        config = state["autoplay"]
+        next_idx = state.get("questionIndex", -1) + 1
+        questions = await self.manager.load_questions(room)
+        if next_idx >= len(questions):
+            print(f"[autoplay] Кімната {room}: питання закінчились, завершення сесії")
+            metrics.inc("autoplay.finished")
+            await self.manager.end_session(room)
+            return
+        msg = await self.manager.start_question(room, next_idx, config["questionDurationMs"])
+        await self.manager.audience.broadcast(room, msg, to=TO_LEGACY)
+        metrics.inc("autoplay.questions")
+
+    # --- керування хостом ---
+
+    async def pause(self, room: str) -> Optional[str]:
+        """Повертає причину відмови або None"""
+        state = await self.manager.get_state(room)
+        config = state.get("autoplay")
+        if not config:
+            return "Автоплей не увімкнено"
+        if config.get("paused"):
+            return None
+        if state.get("phase") == "REVEAL":
+            # поточне питання (якщо активне) все одно дійде до розкриття
+            self.manager.cancel_timers(room)
+        await self._set_paused(room, config, True)
+        return None
+
+    async def resume(self, room: str) -> Optional[str]:
+        state = await self.manager.get_state(room)
+        config = state.get("autoplay")
+        if not config:
+            return "Автоплей не увімкнено"
+        if config.get("paused"):
+            await self._set_paused(room, config, False)
+            state["autoplay"] = {**config, "paused": False}
+        if state.get("phase") in ("LOBBY", "REVEAL") and room not in self.manager.timers:
+            await self.advance(room, state)
+        return None
+
+    async def skip(self, room: str) -> Optional[str]:
+        """Активне питання розкривається одразу, а під час паузи після розкриття стартує наступне"""
+        state = await self.manager.get_state(room)
+        if not state.get("autoplay"):
+            return "Автоплей не увімкнено"
+        phase = state.get("phase")
+        self.manager.cancel_timers(room)
+        metrics.inc("autoplay.skips")
+        if phase == "QUESTION_ACTIVE":
+            await self.manager.reveal_and_announce(room, state.get("questionIndex", -1), state)
+        elif phase in ("LOBBY", "REVEAL"):
+            await self.advance(room, state)
+        return None
+
+    async def _set_paused(self, room: str, config: dict, paused: bool) -> None:
+        config = {**config, "paused": paused}
+        await self.manager.set_state(room, autoplay=config)
+        print(f"[autoplay] Кімната {room}: {'пауза' if paused else 'продовжено'}")
+        await self.manager.audience.broadcast(
+            room,
+            {"type": "autoplay", "autoplay": config},
+            to=TO_LEGACY,
+        )
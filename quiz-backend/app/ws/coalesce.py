@@ -0,0 +1,76 @@
+import asyncio
+from typing import List, Optional, Set
+
+from fastapi.websockets import WebSocket
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class CoalescingWebSocket:
+    """
+    Обгортка WebSocket, що об'єднує вихідні кадри з'єднання.
+
+    Кадри, надіслані протягом WS_COALESCE_WINDOW_MS (або поки їх не
+    набереться WS_COALESCE_MAX_FRAMES), ідуть одним WebSocket-кадром —
+    JSON-масивом у порядку надсилання; одиночний кадр надсилається як є.
+    Вмикається клієнтом (?batch=true), тож решта клієнтів не бачить масивів.
+
+    send_text лише ставить кадр у чергу; помилка відправки запам'ятовується
+    і повертається наступному send_text, щоб розсилка прибрала з'єднання.
+    Решта атрибутів (accept, receive_text, ...) — від обгорнутого сокета.
+    """
+
+    def __init__(self, websocket: WebSocket) -> None:
+        self.websocket = websocket
+        self.pending: List[str] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # задачі флашу за таймером: посилання не дає циклу подій зібрати
+        # задачу, що чекає на лок чи на send_text
+        self._flush_tasks: Set[asyncio.Task] = set()
+        self._lock = asyncio.Lock()
+        self._error: Optional[Exception] = None
+
+    def __getattr__(self, name: str):
+        return getattr(self.websocket, name)
+
+    async def send_text(self, data: str) -> None:
+        if self._error is not None:
+            raise self._error
+        self.pending.append(data)
+        if len(self.pending) >= settings.WS_COALESCE_MAX_FRAMES:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                settings.WS_COALESCE_WINDOW_MS / 1000, self._schedule_flush
+            )
+
+    def _schedule_flush(self) -> None:
+        self._timer = None
+        task = asyncio.create_task(self.flush())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        # лок зберігає порядок кадрів між флашами, що перетинаються
+        async with self._lock:
+            frames, self.pending = self.pending, []
+            if not frames or self._error is not None:
+                return
+            data = frames[0] if len(frames) == 1 else "[" + ",".join(frames) + "]"
+            try:
+                await self.websocket.send_text(data)
+            except Exception as e:
+                self._error = e
+                return
+            metrics.inc("ws.coalesced_sends")
+            metrics.observe("ws.coalesced_frames", len(frames))
+
+    async def close(self, code: int = 1000, reason: Optional[str] = None) -> None:
+        if self._flush_tasks:
+            await asyncio.gather(*self._flush_tasks, return_exceptions=True)
+        await self.flush()
+        await self.websocket.close(code=code, reason=reason)
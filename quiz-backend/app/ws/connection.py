@@ -0,0 +1,51 @@
+import json
+from dataclasses import dataclass, field
+
+from fastapi.websockets import WebSocket
+
+from app.ws.rate_limit import ConnectionLimiter
+
+# Кому адресована розсилка: усім, клієнтам без дельт або лише клієнтам з дельтами
+TO_ALL = "all"
+TO_LEGACY = "legacy"
+TO_DELTA = "delta"
+
+
+@dataclass(slots=True, eq=False)
+class ConnectionContext:
+    """Стан одного WebSocket-з'єднання, який бачать обробники подій"""
+
+    websocket: WebSocket
+    room: str
+    role: str
+    # компактний id гравця в кімнаті (слот); UUID-токен лише для перепідключення
+    player_id: int | None = None
+    player_name: str | None = None
+    # edge-з'єднання кімнати в режимі аудиторії, якою володіє інший воркер
+    edge: bool = False
+    # клієнт отримує state_delta замість повних подій стану
+    deltas: bool = False
+    limiter: ConnectionLimiter = field(init=False)
+    # стан heartbeat: слот колеса, останній ping і згладжений RTT
+    heartbeat_slot: int | None = field(default=None, init=False)
+    ping_id: int | None = field(default=None, init=False)
+    ping_sent_at: float | None = field(default=None, init=False)
+    missed_pongs: int = field(default=0, init=False)
+    rtt_ms: float | None = field(default=None, init=False)
+    # годинник клієнта мінус годинник сервера (оцінка з client:time_sync)
+    clock_offset_ms: float | None = field(default=None, init=False)
+
+    def __post_init__(self) -> None:
+        self.limiter = ConnectionLimiter(self.role)
+
+
+async def send_error(websocket: WebSocket, message: str) -> None:
+    """Допоміжна функція для надсилання помилок"""
+    await websocket.send_text(
+        json.dumps(
+            {
+                "type": "error",
+                "message": message,
+            }
+        )
+    )
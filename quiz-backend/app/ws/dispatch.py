@@ -0,0 +1,110 @@
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from pydantic import TypeAdapter, ValidationError
+
+from app.core.metrics import metrics
+from app.core.profiler import profiler
+from app.ws.actor import RoomActors
+from app.ws.connection import ConnectionContext, send_error
+
+EventHandler = Callable[[ConnectionContext, Any], Awaitable[None]]
+
+
+@dataclass(frozen=True, slots=True)
+class _Registration:
+    handler: EventHandler
+    roles: Tuple[str, ...]
+    serial: bool
+
+
+class EventRegistry:
+    """
+    Реєстр обробників WebSocket-подій.
+
+    Кадр валідується одним проходом через скомпільований адаптер
+    дискримінованого union'у; ролі, яким дозволена подія, задаються
+    під час реєстрації.
+
+    З акторами кімнат обробники подій (serial=True) виконуються в черзі
+    кімнати; кадр розбирається ще до черги.
+    """
+
+    def __init__(self, adapter: TypeAdapter, actors: Optional[RoomActors] = None) -> None:
+        self.adapter = adapter
+        self.actors = actors
+        self.handlers: Dict[str, _Registration] = {}
+
+    def on(
+        self, event_type: str, *, roles: Tuple[str, ...], serial: bool = True
+    ) -> Callable[[EventHandler], EventHandler]:
+        """
+        Декоратор реєстрації обробника події. serial=False — обробник
+        не змінює стан кімнати або робить це атомарно і не чекає черги.
+        """
+
+        def decorator(handler: EventHandler) -> EventHandler:
+            if event_type in self.handlers:
+                raise ValueError(f"Обробник для {event_type} вже зареєстровано")
+            self.handlers[event_type] = _Registration(handler, roles, serial)
+            return handler
+
+        return decorator
+
+    async def dispatch(self, ctx: ConnectionContext, raw: str) -> None:
+        """
+        Валідує кадр, перевіряє роль і викликає обробник.
+
+        ValidationError для некоректних даних пробрасується викликачу.
+        """
+        with profiler.trace("ws", ctx.room) as trace:
+            await self._dispatch(ctx, raw, trace)
+
+    async def _dispatch(self, ctx: ConnectionContext, raw: str, trace) -> None:
+        started = time.perf_counter()
+        try:
+            evt = self.adapter.validate_json(raw)
+        except ValidationError as e:
+            tag_errors = [
+                err for err in e.errors()
+                if err["type"] in ("union_tag_invalid", "union_tag_not_found")
+            ]
+            if not tag_errors:
+                raise
+            tag = tag_errors[0].get("ctx", {}).get("tag")
+            metrics.inc("ws.events_unknown")
+            await send_error(ctx.websocket, f"Невідомий тип події: {tag}")
+            return
+        parsed = time.perf_counter()
+        metrics.observe("ws.event_parse_ms", (parsed - started) * 1000)
+
+        event_type = evt.type
+        if trace is not None:
+            trace.name = event_type
+            trace.add("parse", (parsed - started) * 1000)
+        print(f"\nОтримано подію: {event_type} від {ctx.role}")
+
+        registration = self.handlers.get(event_type)
+        if registration is None:
+            metrics.inc("ws.events_unknown")
+            await send_error(ctx.websocket, f"Невідомий тип події: {event_type}")
+            return
+
+        if ctx.role not in registration.roles:
+            metrics.inc(f"ws.events_forbidden.{event_type}")
+            await send_error(
+                ctx.websocket, f"Подія {event_type} недоступна для ролі {ctx.role}"
+            )
+            return
+
+        try:
+            if registration.serial and self.actors is not None and not ctx.edge:
+                await self.actors.run(ctx.room, lambda: registration.handler(ctx, evt))
+            else:
+                await registration.handler(ctx, evt)
+        finally:
+            metrics.inc(f"ws.events.{event_type}")
+            metrics.observe(
+                f"ws.event_ms.{event_type}", (time.perf_counter() - parsed) * 1000
+            )
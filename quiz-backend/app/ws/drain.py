@@ -0,0 +1,91 @@
+import asyncio
+import json
+import random
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.outbox import outbox
+from app.ws.affinity import RoomAffinity
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import PendingWritesError
+
+# Стандартний код закриття "Service Restart"
+CLOSE_SERVICE_RESTART = 1012
+
+
+class DrainController:
+    """
+    Плавне виведення воркера з роботи перед деплоєм.
+
+    Після drain() воркер не приймає нових з'єднань і кімнат, просить
+    клієнтів перепідключитися (з випадковою затримкою, щоб не створити
+    сплеск на інших воркерах), знімає таймери і дочікується фонових
+    записів. Стан кімнат лишається в Redis, тож інший воркер продовжує гру.
+    """
+
+    def __init__(self, manager: RoomManager, affinity: RoomAffinity) -> None:
+        self.manager = manager
+        self.affinity = affinity
+        self.draining = False
+        self._lock = asyncio.Lock()
+
+    def reconnect_frame(self) -> str:
+        return json.dumps(
+            {
+                "type": "reconnect",
+                "url": None,
+                "afterMs": random.randint(0, settings.RECONNECT_JITTER_MS),
+            }
+        )
+
+    async def reject(self, websocket) -> None:
+        """Відхиляє нове з'єднання під час drain"""
+        metrics.inc("drain.rejected_connections")
+        await websocket.accept()
+        await websocket.send_text(self.reconnect_frame())
+        await websocket.close(code=CLOSE_SERVICE_RESTART)
+
+    async def drain(self) -> None:
+        async with self._lock:
+            if self.draining:
+                return
+            self.draining = True
+            print("[drain] Воркер переходить у режим drain")
+
+            # з affinity кімнати одразу передаються новим власникам
+            await self.affinity.stop()
+
+            released = []
+            for room in list(self.manager.connections):
+                # відкладені записи кімнати — у Redis до того, як клієнти
+                # перейдуть на інший воркер; таймери відновить новий власник.
+                # Кімната, чиї записи не збережено, лишається з клієнтами:
+                # інший воркер показав би їм застарілий стан
+                try:
+                    await self.manager.store.flush(room)
+                    self.manager.lifecycle.release(room)
+                    await self.manager.store.flush(room)
+                except PendingWritesError as e:
+                    print(f"[drain] Кімнату {room} не звільнено: {e}")
+                    metrics.inc("drain.unflushed_rooms")
+                    continue
+                for ws in list(self.manager.connections.get(room, ())):
+                    try:
+                        await ws.send_text(self.reconnect_frame())
+                        await ws.close(code=CLOSE_SERVICE_RESTART)
+                    except Exception as e:
+                        print(f"[drain] Помилка закриття з'єднання: {e}")
+                    await self.manager.unregister(room, ws)
+                released.append(room)
+            metrics.inc("drain.rooms_released", len(released))
+
+            # кімнати без з'єднань теж дописують відкладені записи
+            try:
+                await self.manager.store.flush()
+            except PendingWritesError as e:
+                print(f"[drain] Не всі відкладені записи збережено: {e}")
+
+            left = await outbox.flush(settings.DRAIN_TIMEOUT_SEC)
+            if left:
+                print(f"[drain] {left} фонових записів не завершено до таймауту")
+            print(f"[drain] Завершено: звільнено {len(released)} кімнат")
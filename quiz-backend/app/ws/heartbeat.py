@@ -0,0 +1,144 @@
+import asyncio
+import json
+import time
+from typing import List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.ws.connection import ConnectionContext
+from app.ws.room_manager import RoomManager
+
+# Код закриття для з'єднання, що перестало відповідати на ping
+CLOSE_HEARTBEAT_TIMEOUT = 4002
+
+
+class HeartbeatScheduler:
+    """
+    Один на процес планувальник ping/pong для всіх WebSocket-з'єднань.
+
+    З'єднання розкладені по слотах колеса таймерів; кожен тік обробляє
+    один слот, тож за HEARTBEAT_INTERVAL_SEC кожне з'єднання отримує
+    рівно один ping, а навантаження рівномірно розподілене в часі.
+    З'єднання, що пропустило HEARTBEAT_MAX_MISSED pong поспіль,
+    закривається і виключається з кімнати. RTT рахується за pong.
+    З'єднання слота обробляються паралельно, а ping, який не вдалося
+    записати за HEARTBEAT_SEND_TIMEOUT_SEC, теж виключає з'єднання —
+    один клієнт із заповненим буфером не затримує решту слота.
+    """
+
+    def __init__(self, manager: RoomManager) -> None:
+        self.manager = manager
+        self.enabled = settings.HEARTBEAT_ENABLED
+        self.slots: List[Set[ConnectionContext]] = [
+            set() for _ in range(max(1, settings.HEARTBEAT_WHEEL_SLOTS))
+        ]
+        self.cursor = 0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def tick_sec(self) -> float:
+        return settings.HEARTBEAT_INTERVAL_SEC / len(self.slots)
+
+    # --- облік з'єднань ---
+
+    def register(self, ctx: ConnectionContext) -> None:
+        if not self.enabled:
+            return
+        # новий слот — найдальший від курсора: перший ping через повний оберт
+        slot = (self.cursor - 1) % len(self.slots)
+        ctx.heartbeat_slot = slot
+        self.slots[slot].add(ctx)
+        self._ensure_started()
+
+    def unregister(self, ctx: ConnectionContext) -> None:
+        if ctx.heartbeat_slot is not None:
+            self.slots[ctx.heartbeat_slot].discard(ctx)
+            ctx.heartbeat_slot = None
+
+    def on_pong(self, ctx: ConnectionContext, t: int) -> None:
+        ctx.missed_pongs = 0
+        if ctx.ping_sent_at is None or t != ctx.ping_id:
+            # застарілий або чужий pong лише підтверджує, що клієнт живий
+            return
+        rtt_ms = (time.perf_counter() - ctx.ping_sent_at) * 1000
+        ctx.ping_sent_at = None
+        # згладжене значення менш чутливе до одиничних затримок
+        ctx.rtt_ms = rtt_ms if ctx.rtt_ms is None else ctx.rtt_ms * 0.8 + rtt_ms * 0.2
+        metrics.observe(f"ws.rtt_ms.{ctx.role}", rtt_ms)
+
+    # --- колесо таймерів ---
+
+    def _ensure_started(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def start(self) -> None:
+        if self.enabled:
+            self._ensure_started()
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_sec)
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[heartbeat] Помилка тіку: {e}")
+
+    async def tick(self) -> None:
+        """Обробляє поточний слот колеса і зсуває курсор"""
+        slot = self.slots[self.cursor]
+        self.cursor = (self.cursor + 1) % len(self.slots)
+        if slot:
+            await asyncio.gather(*(self._visit(ctx) for ctx in list(slot)))
+
+    async def _visit(self, ctx: ConnectionContext) -> None:
+        if ctx.ping_sent_at is not None:
+            ctx.missed_pongs += 1
+            metrics.inc("heartbeat.missed_pongs")
+        if ctx.missed_pongs >= settings.HEARTBEAT_MAX_MISSED:
+            await self.evict(ctx)
+            return
+        await self._ping(ctx)
+
+    async def _ping(self, ctx: ConnectionContext) -> None:
+        ctx.ping_id = int(time.time() * 1000)
+        ctx.ping_sent_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(
+                ctx.websocket.send_text(json.dumps({"type": "ping", "t": ctx.ping_id})),
+                settings.HEARTBEAT_SEND_TIMEOUT_SEC,
+            )
+            metrics.inc("heartbeat.pings")
+        except asyncio.TimeoutError:
+            metrics.inc("heartbeat.send_timeouts")
+            await self.evict(ctx)
+        except Exception:
+            await self.evict(ctx)
+
+    async def evict(self, ctx: ConnectionContext) -> None:
+        """Закриває мертве з'єднання і прибирає його з кімнати"""
+        self.unregister(ctx)
+        print(
+            f"[heartbeat] {ctx.role} ({ctx.player_name or 'host'}) у {ctx.room} "
+            f"не відповідає, з'єднання закрито"
+        )
+        metrics.inc("heartbeat.evicted")
+        await self.manager.unregister(ctx.room, ctx.websocket)
+        try:
+            # закриття застряглого з'єднання теж може не записатися
+            await asyncio.wait_for(
+                ctx.websocket.close(code=CLOSE_HEARTBEAT_TIMEOUT),
+                settings.HEARTBEAT_SEND_TIMEOUT_SEC,
+            )
+        except Exception:
+            pass
+
+    def connections(self) -> int:
+        return sum(len(slot) for slot in self.slots)
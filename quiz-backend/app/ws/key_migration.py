@@ -0,0 +1,116 @@
+"""
+Перенесення живих ключів кімнат зі схеми 1 у схему 2 (хеш-теги).
+
+    python -m app.ws.key_migration [--dry-run]
+
+Кімната переноситься цілком одним Lua-скриптом: усі її ключі схеми 1
+перейменовуються разом (значення й TTL зберігаються), тож кімната ніколи
+не опиняється розділеною між схемами. Кімната, що вже має ключі схеми 2,
+не чіпається і потрапляє у звіт.
+
+Воркери з REDIS_KEY_SCHEMA=2 і REDIS_KEY_V1_FALLBACK=true переносять
+кімнату тим самим скриптом при першому зверненні до неї; цей скрипт
+доносить решту (кімнати без активності, архіви кімнат). Порядок — у README.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+from typing import Dict
+
+from redis.asyncio import Redis
+
+from app.core.redis_manager import close_redis, get_redis
+from app.core.redis_scripts import RedisScript
+from app.ws.keys import (
+    KEY_SCHEMA_V1,
+    KEY_SCHEMA_V2,
+    parse_v1_key,
+    room_key,
+    room_key_names,
+    v1_scan_patterns,
+)
+
+logger = logging.getLogger(__name__)
+
+# Результати migrate_room (крім кількості перенесених ключів)
+ROOM_ALREADY_V2 = -1
+
+# KEYS: n ключів схеми 1, потім n відповідних ключів схеми 2. ARGV: n
+MIGRATE_ROOM = RedisScript("migrate_room", """
+local n = tonumber(ARGV[1])
+for i = 1, n do
+    if redis.call('EXISTS', KEYS[n + i]) == 1 then
+        return -1
+    end
+end
+local moved = 0
+for i = 1, n do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('RENAME', KEYS[i], KEYS[n + i])
+        moved = moved + 1
+    end
+end
+return moved
+""")
+
+
+async def migrate_room(r: Redis, room: str) -> int:
+    """
+    Атомарно переносить ключі кімнати в схему 2. Повертає кількість
+    перенесених ключів або ROOM_ALREADY_V2 (нічого не перенесено).
+    """
+    raw = await r.get(room_key(room, "questions", KEY_SCHEMA_V1))
+    names = room_key_names(len(json.loads(raw)) if raw else 0)
+    return await MIGRATE_ROOM(
+        r,
+        [
+            *(room_key(room, name, KEY_SCHEMA_V1) for name in names),
+            *(room_key(room, name, KEY_SCHEMA_V2) for name in names),
+        ],
+        [len(names)],
+    )
+
+
+async def migrate_keys(dry_run: bool = False, batch: int = 500) -> Dict[str, int]:
+    r = await get_redis()
+    report = {"rooms": 0, "renamed": 0, "conflicts": 0, "skipped": 0}
+    rooms = set()
+    for pattern in v1_scan_patterns():
+        async for key in r.scan_iter(match=pattern, count=batch):
+            parsed = parse_v1_key(key)
+            # оренда власника не переноситься: вона сама спливає за TTL
+            if parsed is None or parsed[1] == "owner":
+                report["skipped"] += 1
+                continue
+            rooms.add(parsed[0])
+
+    report["rooms"] = len(rooms)
+    for room in sorted(rooms):
+        if dry_run:
+            logger.info("Кімната %s буде перенесена", room)
+            continue
+        moved = await migrate_room(r, room)
+        if moved == ROOM_ALREADY_V2:
+            logger.warning("Кімната %s вже має ключі схеми 2, ключі схеми 1 лишено", room)
+            report["conflicts"] += 1
+        else:
+            report["renamed"] += moved
+    return report
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Migrate room keys to the hash-tagged schema")
+    parser.add_argument("--dry-run", action="store_true", help="only list rooms to migrate")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="[migration] %(message)s")
+    try:
+        report = await migrate_keys(dry_run=args.dry_run)
+        logger.info("Готово: %s", report)
+    finally:
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
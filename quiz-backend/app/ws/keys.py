@@ -0,0 +1,65 @@
+from typing import Optional, Tuple
+
+from app.core.config import settings
+
+# Версії схеми Redis-ключів кімнати:
+#   1 — quiz:room:{room}:<name>, session:{room}, quiz:room_archives:{room},
+#       quiz:room_owner:{room}; ключі однієї кімнати в різних слотах кластера
+#   2 — quiz:{<room>}:<name> для всіх ключів; хеш-тег {<room>} кладе кімнату
+#       в один слот, тож Lua-скрипти і багатоключові команди працюють у Redis Cluster
+KEY_SCHEMA_V1 = 1
+KEY_SCHEMA_V2 = 2
+
+V1_ROOM_PREFIX = "quiz:room:"
+
+# Ключі схеми 1 поза спільним префіксом кімнати: ім'я -> префікс
+_V1_SPECIAL = {
+    "session": "session:",
+    "archives": "quiz:room_archives:",
+    "owner": "quiz:room_owner:",
+}
+
+
+def room_key(room: str, name: str, schema: Optional[int] = None) -> str:
+    """Ключ кімнати за іменем (state, players, answers:q0, session, ...)"""
+    schema = schema or settings.REDIS_KEY_SCHEMA
+    if schema == KEY_SCHEMA_V2:
+        return f"quiz:{{{room}}}:{name}"
+    prefix = _V1_SPECIAL.get(name)
+    if prefix is not None:
+        return f"{prefix}{room}"
+    return f"{V1_ROOM_PREFIX}{room}:{name}"
+
+
+# Імена ключів кімнати, що переносяться між схемами; quiz:room_owner — оренда
+# з коротким TTL, її переоформлює воркер-власник
+_ROOM_NAMES = (
+    "session", "state", "version", "deltas", "questions",
+    "players", "score", "tokens", "next_slot", "archives",
+)
+
+
+def room_key_names(question_count: int) -> list[str]:
+    """Імена всіх довготривалих ключів кімнати з question_count питаннями"""
+    return [
+        *_ROOM_NAMES,
+        *(f"answers:q{qidx}" for qidx in range(question_count)),
+        *(f"answerbits:q{qidx}" for qidx in range(question_count)),
+    ]
+
+
+def v1_scan_patterns() -> list[str]:
+    """Шаблони SCAN, що покривають усі ключі кімнат схеми 1"""
+    return [f"{V1_ROOM_PREFIX}*", *(f"{prefix}*" for prefix in _V1_SPECIAL.values())]
+
+
+def parse_v1_key(key: str) -> Optional[Tuple[str, str]]:
+    """(кімната, ім'я) для ключа схеми 1 або None для чужого ключа"""
+    for name, prefix in _V1_SPECIAL.items():
+        if key.startswith(prefix):
+            room = key[len(prefix):]
+            return (room, name) if room and ":" not in room else None
+    if key.startswith(V1_ROOM_PREFIX):
+        room, sep, name = key[len(V1_ROOM_PREFIX):].partition(":")
+        return (room, name) if room and sep and name else None
+    return None
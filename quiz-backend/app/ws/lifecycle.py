@@ -0,0 +1,194 @@
+import asyncio
+import os
+import time
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+if TYPE_CHECKING:
+    from app.ws.room_manager import RoomManager
+
+
+class _RoomRecord:
+    """Що належить кімнаті на цьому воркері"""
+
+    __slots__ = ("created_at", "last_activity", "question_count", "tasks")
+
+    def __init__(self) -> None:
+        self.created_at = time.monotonic()
+        self.last_activity = self.created_at
+        self.question_count = 0
+        self.tasks: Set[asyncio.Task] = set()
+
+
+def _rss_mb() -> Optional[float]:
+    """Поточна резидентна пам'ять процесу (лише Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class RoomLifecycle:
+    """
+    Облік ресурсів кімнат: ключів у сховищі та фонових задач.
+
+    Кімната знищується цілком — при завершенні вікторини або після
+    простою без з'єднань. Нові кімнати не приймаються понад бюджет
+    воркера (кількість кімнат і пам'ять).
+    """
+
+    def __init__(self, manager: "RoomManager") -> None:
+        self.manager = manager
+        self.rooms: Dict[str, _RoomRecord] = {}
+        self.leaks: Dict[str, List[str]] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+    # --- облік ---
+
+    def touch(self, room: str) -> Optional[_RoomRecord]:
+        """Оновлює активність кімнати, якщо вона вже обслуговується цим воркером"""
+        record = self.rooms.get(room)
+        if record is not None:
+            record.last_activity = time.monotonic()
+        return record
+
+    def claim(self, room: str) -> _RoomRecord:
+        """
+        Починає облік кімнати на цьому воркері — лише для кімнати з сесією,
+        щоб підключення з невідомим кодом не займали бюджет кімнат.
+        """
+        record = self.rooms.get(room)
+        if record is None:
+            record = self.rooms[room] = _RoomRecord()
+        record.last_activity = time.monotonic()
+        return record
+
+    def on_room_created(self, room: str, question_count: int) -> None:
+        self.claim(room).question_count = question_count
+
+    def track_task(self, room: str, task: asyncio.Task) -> None:
+        """Задача кімнати буде скасована разом з кімнатою"""
+        tasks = self.claim(room).tasks
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    # --- бюджети ---
+
+    def admit_room(self, room: str) -> Optional[str]:
+        """Повертає причину відмови або None, якщо нову кімнату можна створити"""
+        record = self.rooms.get(room)
+        if record is not None and record.question_count:
+            # перезапуск сесії в уже створеній кімнаті
+            return None
+        others = len(self.rooms) - (1 if record is not None else 0)
+        if others >= settings.MAX_ROOMS_PER_WORKER:
+            metrics.inc("lifecycle.rejected.max_rooms")
+            return "Сервер перевантажений: забагато активних кімнат"
+        budget = settings.WORKER_MEMORY_BUDGET_MB
+        rss = _rss_mb()
+        if budget is not None and rss is not None and rss > budget:
+            metrics.inc("lifecycle.rejected.memory")
+            return "Сервер перевантажений: вичерпано бюджет пам'яті"
+        return None
+
+    # --- знищення ---
+
+    async def teardown(self, room: str, ended: bool = False) -> None:
+        """
+        Знімає задачі кімнати і видаляє всі її ключі.
+        Для завершеної вікторини session:{room} лишається на
+        ENDED_SESSION_TTL_SEC, щоб пізні клієнти отримали "завершено".
+        """
+        record = self.rooms.pop(room, None)
+        self.manager.cancel_timers(room)
+        self.manager.audience.forget(room)
+        self.manager.feed.forget(room)
+        self.manager.store.evict(room)
+        question_count = record.question_count if record else 0
+        if record is not None:
+            for task in list(record.tasks):
+                if task is not asyncio.current_task():
+                    task.cancel()
+        if not question_count:
+            question_count = len(await self.manager.store.load_questions(room))
+
+        await self.manager.store.delete_room(
+            room,
+            question_count,
+            keep_session_sec=settings.ENDED_SESSION_TTL_SEC if ended else None,
+        )
+        metrics.inc("lifecycle.teardown.ended" if ended else "lifecycle.teardown.idle")
+
+        leaked = await self.manager.store.leaked_keys(room, question_count)
+        if leaked:
+            print(f"[lifecycle] Кімната {room}: ключі не видалено: {leaked}")
+            metrics.inc("lifecycle.leaked_keys", len(leaked))
+            self.leaks[room] = leaked
+        print(f"[lifecycle] Кімнату {room} знищено ({'завершена' if ended else 'простій'})")
+
+    def release(self, room: str) -> None:
+        """
+        Забуває кімнату на цьому воркері без видалення ключів —
+        коли її обслуговування переходить до іншого воркера.
+        """
+        record = self.rooms.pop(room, None)
+        self.manager.cancel_timers(room)
+        self.manager.audience.forget(room)
+        self.manager.store.evict(room)
+        if record is not None:
+            for task in list(record.tasks):
+                task.cancel()
+        metrics.inc("lifecycle.released")
+
+    async def sweep(self) -> int:
+        """Знищує кімнати без з'єднань, що простоюють довше за таймаут"""
+        deadline = time.monotonic() - settings.ROOM_IDLE_TIMEOUT_SEC
+        idle = [
+            room
+            for room, record in self.rooms.items()
+            if record.last_activity < deadline and room not in self.manager.connections
+        ]
+        for room in idle:
+            await self.teardown(room)
+        return len(idle)
+
+    async def start(self) -> None:
+        if self._sweeper is None:
+            self._sweeper = asyncio.create_task(self._sweep_loop())
+
+    async def stop(self) -> None:
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ROOM_SWEEP_INTERVAL_SEC)
+            try:
+                swept = await self.sweep()
+                if swept:
+                    print(f"[lifecycle] Знищено {swept} кімнат через простій")
+            except Exception as e:
+                print(f"[lifecycle] Помилка прибирання: {e}")
+
+    # --- звіт ---
+
+    def report(self) -> dict:
+        """Стан ресурсів воркера та виявлені витоки"""
+        orphan_timers = [room for room in self.manager.timers if room not in self.rooms]
+        orphan_connections = [
+            room for room in self.manager.connections if room not in self.rooms
+        ]
+        return {
+            "rooms": len(self.rooms),
+            "connections": sum(len(c) for c in self.manager.connections.values()),
+            "tasks": sum(len(r.tasks) for r in self.rooms.values()),
+            "rssMb": _rss_mb(),
+            "orphanTimers": orphan_timers,
+            "orphanConnections": orphan_connections,
+            "leakedKeys": self.leaks,
+        }
@@ -0,0 +1,76 @@
+import time
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+FRAME_OK = "ok"
+FRAME_TOO_LARGE = "too_large"
+FRAME_THROTTLED = "throttled"
+
+
+class TokenBucket:
+    """Класичний token bucket: rate токенів за секунду, не більше capacity"""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def allow(self, cost: float = 1.0) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < cost:
+            return False
+        self.tokens -= cost
+        return True
+
+
+class ConnectionLimiter:
+    """
+    Ліміти одного WebSocket-з'єднання: розмір кадру та частота повідомлень.
+
+    Перевірка виконується до json.loads/pydantic, тож зловмисний
+    клієнт не витрачає час event loop на розбір своїх кадрів.
+    """
+
+    __slots__ = ("role", "max_frame_bytes", "bucket", "throttled_streak")
+
+    def __init__(self, role: str) -> None:
+        self.role = role
+        if role == "host":
+            rate, burst = settings.WS_HOST_RATE_PER_SEC, settings.WS_HOST_BURST
+            self.max_frame_bytes = settings.WS_HOST_MAX_FRAME_BYTES
+        else:
+            rate, burst = settings.WS_PLAYER_RATE_PER_SEC, settings.WS_PLAYER_BURST
+            self.max_frame_bytes = settings.WS_PLAYER_MAX_FRAME_BYTES
+        self.bucket = TokenBucket(rate, burst)
+        # скільки кадрів поспіль відкинуто через перевищення частоти
+        self.throttled_streak = 0
+
+    def _frame_size(self, raw: str) -> int:
+        # кодуємо лише тоді, коли довжина в символах не дає однозначної відповіді
+        if len(raw) * 4 <= self.max_frame_bytes:
+            return len(raw)
+        return len(raw.encode("utf-8"))
+
+    def check(self, raw: str) -> str:
+        if len(raw) > self.max_frame_bytes or self._frame_size(raw) > self.max_frame_bytes:
+            metrics.inc(f"ws.frames_dropped.too_large.{self.role}")
+            return FRAME_TOO_LARGE
+
+        if not self.bucket.allow():
+            self.throttled_streak += 1
+            metrics.inc(f"ws.frames_throttled.{self.role}")
+            return FRAME_THROTTLED
+
+        self.throttled_streak = 0
+        return FRAME_OK
+
+    @property
+    def abusive(self) -> bool:
+        """Клієнт, що ігнорує троттлінг, відключається"""
+        return self.throttled_streak > settings.WS_MAX_THROTTLED_STREAK
@@ -1,34 +1,70 @@
 import json
 import time
+import uuid
 import asyncio
-from typing import Dict, Set, Optional
+from typing import Coroutine, Dict, Set, Optional
 
 from fastapi.websockets import WebSocket
-from redis.asyncio import Redis
 
-REDIS_PREFIX = "quiz:room:"
+from app.core.config import settings
+from app.core.outbox import outbox
+from app.core.profiler import profiler
+from app.services.quiz_session_service import QuizSessionService
+from app.ws.actor import RoomActors
+from app.ws.answer_batcher import AnswerBatcher
+from app.ws.audience import AudienceMode
+from app.ws.autoplay import AutoplayDirector
+from app.ws.connection import TO_ALL, TO_DELTA, TO_LEGACY
+from app.ws.lifecycle import RoomLifecycle
+from app.ws.room_store import (
+    ANSWER_DUPLICATE,
+    ANSWER_EARLY,
+    ANSWER_INACTIVE,
+    ANSWER_INVALID,
+    ANSWER_LATE,
+    ANSWER_OK,
+    JoinResult,
+    RedisRoomStore,
+    RoomStore,
+    delta_frame,
+)
+from app.ws.schemas import FinishedSessionSnapshot
+from app.ws.scoreboard_feed import ScoreboardFeed
+from app.ws.write_behind import WriteBehindRoomStore
+
+_REJECT_REASONS = {
+    ANSWER_INACTIVE: "питання неактивне",
+    ANSWER_LATE: "час вийшов",
+    ANSWER_EARLY: "питання ще не почалось",
+    ANSWER_DUPLICATE: "гравець вже відповідав",
+    ANSWER_INVALID: "недопустимий варіант відповіді",
+}
 
 
 class RoomManager:
-    def __init__(self) -> None:
+    def __init__(self, store: RoomStore) -> None:
         self.connections: Dict[str, Set[WebSocket]] = {}
-
-    # --- Redis ключі ---
-
-    def k_state(self, room: str) -> str:
-        return f"{REDIS_PREFIX}{room}:state"
-
-    def k_questions(self, room: str) -> str:
-        return f"{REDIS_PREFIX}{room}:questions"
-
-    def k_answers(self, room: str, qidx: int) -> str:
-        return f"{REDIS_PREFIX}{room}:answers:q{qidx}"
-
-    def k_players(self, room: str) -> str:
-        return f"{REDIS_PREFIX}{room}:players"
-
-    def k_score(self, room: str) -> str:
-        return f"{REDIS_PREFIX}{room}:score"
+        # з'єднання, що отримують state_delta замість повних подій стану
+        self.delta_clients: Set[WebSocket] = set()
+        # таймери авто-розкриття, що належать цьому воркеру
+        self.timers: Dict[str, asyncio.Task] = {}
+        self.lifecycle = RoomLifecycle(self)
+        self.audience = AudienceMode(self)
+        self.actors = RoomActors()
+        if settings.ROOM_ACTORS_ENABLED and isinstance(store, RedisRoomStore):
+            # стан кімнат цього воркера — у пам'яті, Redis оновлюється у фоні
+            store = WriteBehindRoomStore(store, self.owns_room)
+        self.store = store
+        self.answers = AnswerBatcher(store)
+        self.autoplay = AutoplayDirector(self)
+        self.feed = ScoreboardFeed(self)
+
+    def owns_room(self, room: str) -> bool:
+        """
+        Кімната обслуговується цим воркером повністю: не edge-кімната
+        режиму аудиторії, де гравців приймають інші воркери.
+        """
+        return room in self.lifecycle.rooms and room not in self.audience.rooms
 
     # --- підключення ---
 
@@ -43,6 +79,7 @@ class RoomManager:
 
     async def unregister(self, room: str, ws: WebSocket) -> None:
         """Видаляє WebSocket з'єднання з кімнати"""
+        self.delta_clients.discard(ws)
         try:
             if room in self.connections:
                 self.connections[room].discard(ws)
@@ -62,6 +99,7 @@ class RoomManager:
         room: str,
         message: dict,
         exclude: Optional[WebSocket] = None,
+        to: str = TO_ALL,
     ) -> None:
         """
         Розсилає повідомлення всім підключеним до кімнати.
@@ -70,6 +108,7 @@ class RoomManager:
             room: Код кімнати
             message: Повідомлення
             exclude: WebSocket який треба виключити з розсилки (опціонально)
+            to: TO_ALL, TO_LEGACY (без клієнтів з дельтами) або TO_DELTA
         """
         if room not in self.connections:
             print(f"Кімната {room} не існує для broadcast")
@@ -79,7 +118,8 @@ class RoomManager:
         message_type = message.get("type", "unknown")
         print(f"Broadcast до {room}: {message_type} ({len(connections)} з'єднань)")
 
-        data = json.dumps(message)
+        with profiler.phase("json.dumps"):
+            data = json.dumps(message)
         disconnected: list[WebSocket] = []
         sent_count = 0
 
@@ -88,6 +128,8 @@ class RoomManager:
             if exclude is not None and ws == exclude:
                 print("Пропускаємо excluded websocket")
                 continue
+            if to != TO_ALL and (ws in self.delta_clients) != (to == TO_DELTA):
+                continue
             try:
                 await ws.send_text(data)
                 sent_count += 1
@@ -105,16 +147,13 @@ class RoomManager:
 
     async def create_session(
         self,
-        r: Redis,
         room: str,
         questions: list[dict],
         session_id: str,
         created_at_ms: int,
+        autoplay: Optional[dict] = None,
     ) -> None:
-        """Створює нову сесію вікторини"""
-        # зберігаємо список питань один раз
-        await r.set(self.k_questions(room), json.dumps(questions))
-
+        """Створює нову сесію вікторини (autoplay — розклад AutoplayConfig)"""
         # початковий стан
         state = {
             "phase": "LOBBY",
@@ -124,40 +163,69 @@ class RoomManager:
             "sessionId": session_id,
             "createdAt": created_at_ms,
         }
-        await r.set(self.k_state(room), json.dumps(state))
-
-        # скидаємо службові структури
-        await r.delete(self.k_score(room))
-
-        # TTL на кімнату: 6 годин
-        await r.expire(self.k_questions(room), 6 * 60 * 60)
-        await r.expire(self.k_state(room), 6 * 60 * 60)
+        if autoplay is not None:
+            state["autoplay"] = {**autoplay, "paused": False}
+        # питання, стан і скинутий скорборд зберігаються разом
+        await self.store.create_room(room, questions, state)
+        self.lifecycle.on_room_created(room, len(questions))
 
         print(
             f"Створено сесію для кімнати {room} з {len(questions)} питаннями "
             f"(sessionId={session_id})"
         )
 
-    async def load_questions(self, r: Redis, room: str) -> list[dict]:
-        """Завантажує питання сесії з Redis"""
-        raw = await r.get(self.k_questions(room))
-        return json.loads(raw) if raw else []
+    async def load_questions(self, room: str) -> list[dict]:
+        """Завантажує питання сесії зі сховища"""
+        return await self.store.load_questions(room)
 
-    async def get_state(self, r: Redis, room: str) -> dict:
+    async def get_state(self, room: str) -> dict:
         """Отримує поточний стан сесії"""
-        raw = await r.get(self.k_state(room))
-        return json.loads(raw) if raw else {}
+        return await self.store.get_state(room)
 
-    async def set_state(self, r: Redis, room: str, **patch: object) -> dict:
-        """Оновлює стан сесії"""
-        cur = await self.get_state(r, room)
+    async def set_state(
+        self, room: str, delta: Optional[dict] = None, **patch: object
+    ) -> dict:
+        """
+        Оновлює стан сесії з новою версією. Клієнти з дельтами отримують
+        state_delta зі змінами (за замовчуванням — сам patch).
+        """
+        cur = await self.get_state(room)
+        cur.pop("version", None)
         cur.update(patch)
-        await r.set(self.k_state(room), json.dumps(cur))
+        changes = dict(patch) if delta is None else delta
+        cur["version"] = await self.store.set_state(room, cur, json.dumps(changes))
+        if self.delta_clients or room in self.audience.rooms:
+            await self.audience.broadcast(
+                room, delta_frame(cur["version"], changes), to=TO_DELTA
+            )
         return cur
 
+    async def add_player(self, room: str, player_id: int, name: str) -> None:
+        """Додає гравця; новий гравець — це нова версія стану"""
+        if await self.store.add_player(room, player_id, name):
+            await self.set_state(
+                room, delta={"players": [{"playerId": player_id, "name": name}]}
+            )
+
+    async def join_player(
+        self, room: str, token: Optional[str], name: Optional[str]
+    ) -> JoinResult:
+        """
+        Підключення гравця одним викликом сховища; новий гравець — це
+        нова версія стану, як і в add_player.
+        """
+        result = await self.actors.run(
+            room, lambda: self.store.join_player(room, token, name, str(uuid.uuid4()))
+        )
+        if result.added and (self.delta_clients or room in self.audience.rooms):
+            changes = {"players": [{"playerId": result.player_id, "name": result.name}]}
+            await self.audience.broadcast(
+                room, delta_frame(result.state.get("version", 0), changes), to=TO_DELTA
+            )
+        return result
+
     async def _auto_reveal_after_timeout(
         self,
-        r: Redis,
         room: str,
         qidx: int,
         duration_ms: int,
@@ -169,43 +237,82 @@ class RoomManager:
         try:
             # чекаємо тривалість питання
             await asyncio.sleep(duration_ms / 1000.0)
+            await self.actors.run(room, lambda: self._auto_reveal(room, qidx))
 
-            state = await self.get_state(r, room)
-            current_phase = state.get("phase")
-            current_qidx = state.get("questionIndex")
-
-            # якщо фаза змінилась або питання інше — нічого не робимо
-            if current_phase != "QUESTION_ACTIVE":
-                print(
-                    f"[auto_reveal] Пропуск: phase={current_phase} "
-                    f"для кімнати {room}, qidx={current_qidx}"
-                )
-                return
-
-            if current_qidx != qidx:
-                print(
-                    f"[auto_reveal] Пропуск: поточне питання {current_qidx}, "
-                    f"очікувалось {qidx} для кімнати {room}"
-                )
-                return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[auto_reveal] Помилка: {e}")
+        finally:
+            if self.timers.get(room) is asyncio.current_task():
+                del self.timers[room]
+
+    async def _auto_reveal(self, room: str, qidx: int) -> None:
+        """Крок авто-розкриття; виконується в черзі кімнати"""
+        state = await self.get_state(room)
+        current_phase = state.get("phase")
+        current_qidx = state.get("questionIndex")
+
+        # якщо фаза змінилась або питання інше — нічого не робимо
+        if current_phase != "QUESTION_ACTIVE":
+            print(
+                f"[auto_reveal] Пропуск: phase={current_phase} "
+                f"для кімнати {room}, qidx={current_qidx}"
+            )
+            return
 
+        if current_qidx != qidx:
             print(
-                f"[auto_reveal] Автоматичне розкриття відповіді для кімнати "
-                f"{room}, питання {qidx}"
+                f"[auto_reveal] Пропуск: поточне питання {current_qidx}, "
+                f"очікувалось {qidx} для кімнати {room}"
             )
+            return
+
+        print(
+            f"[auto_reveal] Автоматичне розкриття відповіді для кімнати "
+            f"{room}, питання {qidx}"
+        )
 
-            msg = await self.reveal_answer(r, room, qidx)
-            sb = await self.scoreboard(r, room)
-            msg["scoreboard"] = sb
+        await self.reveal_and_announce(room, qidx, state)
 
-            await self.broadcast(room, msg)
+    def schedule_timer(self, room: str, coro: Coroutine) -> None:
+        """
+        Запускає таймер кімнати, замінюючи попередній. Таймер, з якого
+        планується наступний (авто-розкриття -> крок автоплею), не скасовується.
+        """
+        previous = self.timers.get(room)
+        if previous is not None and previous is not asyncio.current_task():
+            previous.cancel()
+        task = asyncio.create_task(coro)
+        self.timers[room] = task
+        self.lifecycle.track_task(room, task)
+
+    def _schedule_auto_reveal(self, room: str, qidx: int, delay_ms: int) -> None:
+        """Планує авто-розкриття, замінюючи попередній таймер кімнати"""
+        self.schedule_timer(room, self._auto_reveal_after_timeout(room, qidx, delay_ms))
+
+    def ensure_auto_reveal(self, room: str, state: dict) -> None:
+        """
+        Відновлює таймер активного питання, якщо його немає на цьому воркері
+        (наприклад, після передачі кімнати з іншого воркера).
+        """
+        if room in self.timers or state.get("phase") != "QUESTION_ACTIVE":
+            return
+        started = state.get("startedAt")
+        if started is None:
+            return
+        remaining_ms = started + state.get("durationMs", 0) - int(time.time() * 1000)
+        print(f"[auto_reveal] Відновлено таймер для {room}: {remaining_ms}ms")
+        self._schedule_auto_reveal(room, state.get("questionIndex", -1), max(0, remaining_ms))
 
-        except Exception as e:
-            print(f"[auto_reveal] Помилка: {e}")
+    def cancel_timers(self, room: str) -> None:
+        """Скасовує таймери кімнати на цьому воркері"""
+        task = self.timers.pop(room, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
 
     async def start_question(
         self,
-        r: Redis,
         room: str,
         qidx: int,
         duration_ms: int,
@@ -213,134 +320,131 @@ class RoomManager:
         """
         Запускає питання, оновлює стан, очищає відповіді
         і планує авто-показ правильної відповіді після закінчення таймера.
+
+        Відлік починається через QUESTION_START_LEAD_MS: кадр встигає дійти
+        до всіх клієнтів, і кожен показує питання в момент startedAt
+        за своєю оцінкою годинника сервера.
         """
         now_ms = int(time.time() * 1000)
+        start_ms = now_ms + settings.QUESTION_START_LEAD_MS
+        questions = await self.load_questions(room)
+        question = questions[qidx] if 0 <= qidx < len(questions) else None
 
-        await self.set_state(
-            r,
-            room,
-            phase="QUESTION_ACTIVE",
-            questionIndex=qidx,
-            startedAt=now_ms,
-            durationMs=duration_ms,
-        )
+        patch = {
+            "phase": "QUESTION_ACTIVE",
+            "questionIndex": qidx,
+            "startedAt": start_ms,
+            "durationMs": duration_ms,
+        }
+        await self.set_state(room, delta={**patch, "question": question}, **patch)
 
         # очистити відповіді для цього питання
-        await r.delete(self.k_answers(room, qidx))
-
-        # подія клієнтам
-        questions = await self.load_questions(r, room)
-        question = questions[qidx] if 0 <= qidx < len(questions) else None
+        await self.store.clear_answers(room, qidx)
 
         print(f"Запущено питання {qidx} на {duration_ms}ms")
 
         # плануємо авто-розкриття відповіді
-        asyncio.create_task(
-            self._auto_reveal_after_timeout(r, room, qidx, duration_ms)
-        )
+        self._schedule_auto_reveal(room, qidx, start_ms - now_ms + duration_ms)
 
         return {
             "type": "question_started",
             "questionIndex": qidx,
-            "startedAt": now_ms,
+            "startedAt": start_ms,
             "durationMs": duration_ms,
             "question": question,
+            "serverTime": now_ms,
         }
 
     async def submit_answer(
         self,
-        r: Redis,
         room: str,
         qidx: int,
-        player_id: str,
+        player_id: int,
         option_index: int,
     ) -> bool:
         """Зберігає відповідь гравця"""
-        state = await self.get_state(r, room)
-
-        # Перевірка фази
-        if state.get("phase") != "QUESTION_ACTIVE":
-            print(
-                f"Відповідь відхилена: питання неактивне "
-                f"(phase={state.get('phase')})"
-            )
-            return False
-
-        # Перевірка часу
-        started = state.get("startedAt")
-        dur = state.get("durationMs", 0)
         now_ms = int(time.time() * 1000)
 
-        if started is None or now_ms > started + dur:
-            print("Відповідь відхилена: час вийшов")
-            return False
-
-        # зберігаємо першу відповідь гравця; повторні ігноруємо
-        key = self.k_answers(room, qidx)
-        exists = await r.hexists(key, player_id)
-        if exists:
-            print("Відповідь відхилена: гравець вже відповідав")
+        # перевірка фази, часу та повторів виконується атомарно у сховищі,
+        # разом з іншими відповідями, що надійшли в тому ж вікні
+        result = await self.answers.submit(
+            room, qidx, player_id, option_index, now_ms
+        )
+        if result != ANSWER_OK:
+            print(f"Відповідь відхилена: {_REJECT_REASONS.get(result, result)}")
             return False
 
-        await r.hset(key, mapping={player_id: str(option_index)})
-        await r.expire(key, 6 * 60 * 60)
-
-        print(f"Збережено відповідь: player={player_id[:8]}, option={option_index}")
+        print(f"Збережено відповідь: player={player_id}, option={option_index}")
 
         return True
 
-    async def reveal_answer(self, r: Redis, room: str, qidx: int) -> dict:
+    async def reveal_answer(self, room: str, qidx: int) -> dict:
         """Розкриває правильну відповідь та рахує бали"""
         # рахуємо результати для питання
-        questions = await self.load_questions(r, room)
+        questions = await self.load_questions(room)
         question = questions[qidx]
         correct_idx = int(question["correct_answer"])
 
-        answers = await r.hgetall(self.k_answers(room, qidx))
-
-        # оновлюємо скорборд
-        correct_count = 0
-        for player_id, opt in answers.items():
-            if int(opt) == correct_idx:
-                await r.zincrby(self.k_score(room), 100, player_id)
-                correct_count += 1
+        # правильні відповіді й розподіл — за один прохід у сховищі
+        correct_players, counts = await self.store.tally_answers(room, qidx, correct_idx)
+        correct_count = len(correct_players)
+        answered = sum(counts.values())
 
-        await r.expire(self.k_score(room), 6 * 60 * 60)
-        await self.set_state(r, room, phase="REVEAL")
+        # оновлюємо скорборд одним викликом сховища
+        totals = await self.store.add_scores(room, correct_players, 100)
 
         # агрегат для фронта
-        counts: dict[str, int] = {"0": 0, "1": 0, "2": 0, "3": 0}
-        for opt in answers.values():
-            key = str(opt)
-            counts[key] = counts.get(key, 0) + 1
+        distribution = {0: 0, 1: 0, 2: 0, 3: 0, **counts}
+
+        # дельта містить лише змінені рядки скорборду
+        await self.set_state(
+            room,
+            delta={
+                "phase": "REVEAL",
+                "reveal": {
+                    "questionIndex": qidx,
+                    "correctIndex": correct_idx,
+                    "distribution": distribution,
+                },
+                "scores": [
+                    {"playerId": pid, "score": score} for pid, score in totals.items()
+                ],
+            },
+            phase="REVEAL",
+        )
 
         print(
             f"Розкрито відповідь {qidx}: правильна={correct_idx}, "
-            f"правильних відповідей={correct_count}/{len(answers)}"
+            f"правильних відповідей={correct_count}/{answered}"
         )
 
         return {
             "type": "answer_revealed",
             "questionIndex": qidx,
             "correctIndex": correct_idx,
-            "distribution": {int(k): v for k, v in counts.items()},
+            "distribution": distribution,
         }
 
-    async def scoreboard(self, r: Redis, room: str) -> list[dict]:
+    async def reveal_and_announce(self, room: str, qidx: int, state: dict) -> None:
+        """
+        Розкриття з розсилкою answer_revealed (скорборд або top-K);
+        в автоплеї після нього планується наступний крок.
+        """
+        msg = await self.reveal_answer(room, qidx)
+        msg["scoreboard"] = await self.audience.scoreboard(room, state)
+        msg.update(await self.audience.reveal_extras(room, state))
+
+        print(f"Broadcast answer_revealed з scoreboard ({len(msg['scoreboard'])} гравців)")
+        await self.audience.broadcast(room, msg, to=TO_LEGACY)
+        self.autoplay.on_revealed(room, qidx, state)
+
+    async def scoreboard(self, room: str) -> list[dict]:
         """Повертає таблицю лідерів"""
         # Отримуємо всіх гравців (навіть з 0 балами)
-        all_players = await r.hgetall(self.k_players(room))
-
-        # Отримуємо гравців з балами
-        players_with_scores = await r.zrevrange(
-            self.k_score(room),
-            0,
-            -1,
-            withscores=True,
-        )
+        all_players = await self.store.get_players(room)
 
-        # Створюємо словник балів
-        scores_dict = {pid: int(score) for pid, score in players_with_scores}
+        # Отримуємо бали гравців
+        scores_dict = await self.store.get_scores(room)
 
         # Формуємо результат для всіх гравців
         result: list[dict] = []
@@ -362,9 +466,69 @@ class RoomManager:
 
         return result
 
-    async def cleanup_room_data(self, r: Redis, room: str) -> None:
-        """Очищує службові дані кімнати після завершення вікторини"""
-        await r.delete(self.k_state(room))
-        await r.delete(self.k_questions(room))
-        await r.delete(self.k_score(room))
-        await r.delete(self.k_players(room))
+    async def end_session(self, room: str) -> None:
+        """
+        Завершує вікторину: фаза ENDED, архів знімка, фоновий запис у
+        Supabase, розсилка session_ended і знищення кімнати.
+        """
+        state = await self.set_state(room, phase="ENDED")
+        sb = await self.scoreboard(room)
+
+        session_data = await self.store.get_session(room) or {}
+
+        session_id = session_data.get("sessionId") or str(uuid.uuid4())
+        quiz_id = session_data.get("quizId")
+        created_at_ms = session_data.get("createdAt") or int(time.time() * 1000)
+        ended_at_ms = int(time.time() * 1000)
+
+        session_data.update({
+            "sessionId": session_id,
+            "quizId": quiz_id,
+            "createdAt": created_at_ms,
+            "phase": "ENDED",
+            "endedAt": ended_at_ms,
+        })
+        await self.store.set_session(room, session_data)
+
+        questions = await self.load_questions(room)
+        snapshot = FinishedSessionSnapshot(
+            sessionId=session_id,
+            roomCode=room,
+            quizId=quiz_id,
+            createdAt=created_at_ms,
+            endedAt=ended_at_ms,
+            questions=questions,
+            scoreboard=sb,
+        )
+
+        await self.store.save_archive(
+            room, session_id, snapshot.model_dump_json(), ended_at_ms
+        )
+
+        print(f"Збережено архів сесії {session_id}")
+
+        # запис у Supabase не блокує event loop; drain дочекається його
+        snapshot_data = snapshot.model_dump()
+        # після підтвердження запису архів у Redis лишається лише на гарячий період
+        outbox.submit(
+            f"save_session:{session_id}",
+            lambda: QuizSessionService().save_finished_session(snapshot_data),
+            on_done=lambda: self.store.confirm_archive(room, session_id),
+        )
+
+        # розсилка до знищення кімнати: edge-воркери ще отримують публікацію
+        print("Broadcast session_ended")
+        await self.audience.broadcast(
+            room,
+            {
+                "type": "session_ended",
+                "scoreboard": await self.audience.scoreboard(room, state),
+                "sessionId": session_id,
+            },
+        )
+
+        await self.cleanup_room_data(room)
+
+    async def cleanup_room_data(self, room: str) -> None:
+        """Очищує всі дані та задачі кімнати після завершення вікторини"""
+        await self.lifecycle.teardown(room, ended=True)
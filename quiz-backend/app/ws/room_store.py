@@ -0,0 +1,1322 @@
+import heapq
+import json
+import time
+import zlib
+from abc import ABC, abstractmethod
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.near_cache import INVALIDATION_CHANNEL, MISS, near_cache
+from app.core.redis_manager import get_redis, get_redis_raw
+from app.core.redis_scripts import RedisScript
+from app.ws.key_migration import migrate_room
+from app.ws.keys import KEY_SCHEMA_V2, room_key
+
+# Архіви завершених сесій: quiz:session:{id} (стиснутий знімок) та індекси,
+# де бал запису — момент (мс), коли архів залишає Redis
+ARCHIVE_INDEX = "quiz:session:index"
+
+# Скільки перенесених кімнат пам'ятає воркер (REDIS_KEY_V1_FALLBACK);
+# після очищення кімната перевіряється ще раз одним викликом скрипта
+_MIGRATED_ROOMS_MAX = 10000
+
+# Перший байт архіву — версія формату; далі zlib-стиснутий JSON знімка
+ARCHIVE_FORMAT_ZLIB = 1
+
+# Результати submit_answer
+ANSWER_OK = "ok"
+ANSWER_INACTIVE = "inactive"
+ANSWER_LATE = "late"
+ANSWER_EARLY = "early"
+ANSWER_DUPLICATE = "duplicate"
+ANSWER_INVALID = "invalid"
+
+# Режим ANSWER_STORE=bitfield: вибір гравця — u4 на його слот у рядку
+# answerbits:q{n} (0 — немає відповіді, інакше option + 1)
+ANSWER_BITS = 4
+ANSWER_BITS_MAX_OPTION = (1 << ANSWER_BITS) - 2
+
+# Запис першої відповіді гравця в обраному режимі; спільна частина
+# SUBMIT_ANSWER і SUBMIT_ANSWERS
+_STORE_ANSWER = f"""
+local function store_answer(mode, key, player_id, option)
+    if mode == 'bitfield' then
+        local value = tonumber(option)
+        if value < 0 or value > {ANSWER_BITS_MAX_OPTION} then return 'invalid' end
+        local slot = '#' .. player_id
+        if redis.call('BITFIELD', key, 'GET', 'u{ANSWER_BITS}', slot)[1] ~= 0 then
+            return 'duplicate'
+        end
+        redis.call('BITFIELD', key, 'SET', 'u{ANSWER_BITS}', slot, value + 1)
+        return 'ok'
+    end
+    if redis.call('HSETNX', key, player_id, option) == 0 then return 'duplicate' end
+    return 'ok'
+end
+"""
+
+# Перевірка фази/часу та запис першої відповіді за один атомарний виклик
+# KEYS: state, answers; ARGV: qidx, player_id, option, now_ms, ttl, mode
+SUBMIT_ANSWER = RedisScript("submit_answer", _STORE_ANSWER + """
+local raw = redis.call('GET', KEYS[1])
+if not raw then return 'inactive' end
+local state = cjson.decode(raw)
+if state['phase'] ~= 'QUESTION_ACTIVE' or state['questionIndex'] ~= tonumber(ARGV[1]) then
+    return 'inactive'
+end
+local started = state['startedAt']
+local duration = state['durationMs']
+if type(duration) ~= 'number' then duration = 0 end
+if type(started) ~= 'number' or tonumber(ARGV[4]) > started + duration then
+    return 'late'
+end
+if tonumber(ARGV[4]) < started then
+    return 'early'
+end
+local result = store_answer(ARGV[6], KEYS[2], ARGV[2], ARGV[3])
+if result == 'ok' then redis.call('EXPIRE', KEYS[2], ARGV[5]) end
+return result
+""")
+
+# Те саме для пачки відповідей на одне питання; час перевіряється окремо
+# для кожної відповіді (момент її отримання воркером)
+# KEYS: state, answers; ARGV: qidx, ttl, mode, далі трійки player_id, option, now_ms
+SUBMIT_ANSWERS = RedisScript("submit_answers", _STORE_ANSWER + """
+local raw = redis.call('GET', KEYS[1])
+local state = raw and cjson.decode(raw)
+local active = state and state['phase'] == 'QUESTION_ACTIVE'
+    and state['questionIndex'] == tonumber(ARGV[1])
+local started = active and state['startedAt']
+local duration = active and state['durationMs']
+if type(duration) ~= 'number' then duration = 0 end
+local results = {}
+local stored = false
+for i = 4, #ARGV, 3 do
+    local now = tonumber(ARGV[i + 2])
+    local result
+    if not active then
+        result = 'inactive'
+    elseif type(started) ~= 'number' or now > started + duration then
+        result = 'late'
+    elseif now < started then
+        result = 'early'
+    else
+        result = store_answer(ARGV[3], KEYS[2], ARGV[i], ARGV[i + 1])
+        stored = stored or result == 'ok'
+    end
+    results[#results + 1] = result
+end
+if stored then redis.call('EXPIRE', KEYS[2], ARGV[2]) end
+return results
+""")
+
+# Слот гравця для токена перепідключення: наявний або наступний вільний
+# KEYS: tokens, next_slot; ARGV: token, slot ('' — виділити новий), ttl
+ASSIGN_SLOT = RedisScript("assign_slot", """
+local slot = ARGV[2]
+if slot == '' then
+    slot = redis.call('INCR', KEYS[2])
+end
+redis.call('HSET', KEYS[1], ARGV[1], slot)
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+return tonumber(slot)
+""")
+
+# Результати join_player
+JOIN_OK = "ok"
+JOIN_MISSING = "missing"
+JOIN_ENDED = "ended"
+
+# Підключення гравця за один виклик: перевірка сесії, відновлення за
+# токеном або ім'ям (інакше новий слот), запис гравця з новою версією
+# стану, а також стан, питання і скорборд для state_sync
+# KEYS: session, tokens, next_slot, players, state, version, deltas, questions, score
+# ARGV: token ('' — немає), name ('' — немає), new_token, ttl, log_size,
+#       invalidation channel, top_k
+JOIN_PLAYER = RedisScript("join_player", """
+local session = redis.call('GET', KEYS[1])
+if not session then return {'missing'} end
+if cjson.decode(session)['phase'] == 'ENDED' then return {'ended'} end
+
+local slot, name, token, restored = false, false, false, 0
+if ARGV[1] ~= '' then
+    slot = redis.call('HGET', KEYS[2], ARGV[1])
+    name = slot and redis.call('HGET', KEYS[4], slot)
+    if name then
+        token = ARGV[1]
+        restored = 1
+    else
+        slot = false
+    end
+end
+if not token and ARGV[2] ~= '' then
+    local players = redis.call('HGETALL', KEYS[4])
+    for i = 1, #players, 2 do
+        if players[i + 1] == ARGV[2] then
+            slot, name = players[i], players[i + 1]
+            break
+        end
+    end
+end
+if not token then
+    -- новий токен; гравець, відновлений за ім'ям, зберігає свій слот
+    token = ARGV[3]
+    if not slot then slot = redis.call('INCR', KEYS[3]) end
+    redis.call('HSET', KEYS[2], token, slot)
+    redis.call('EXPIRE', KEYS[2], ARGV[4])
+    redis.call('EXPIRE', KEYS[3], ARGV[4])
+end
+if not name then
+    if ARGV[2] ~= '' then name = ARGV[2] else name = 'Player' end
+end
+slot = tonumber(slot)
+
+local added = redis.call('HSET', KEYS[4], slot, name)
+redis.call('EXPIRE', KEYS[4], ARGV[4])
+local version = tonumber(redis.call('GET', KEYS[6]) or '0')
+if added == 1 then
+    local changes = cjson.encode({players = {{playerId = slot, name = name}}})
+    version = redis.call('INCR', KEYS[6])
+    redis.call('EXPIRE', KEYS[6], ARGV[4])
+    redis.call('RPUSH', KEYS[7], '{"type": "state_delta", "version": ' .. version .. ', "changes": ' .. changes .. '}')
+    redis.call('LTRIM', KEYS[7], -tonumber(ARGV[5]), -1)
+    redis.call('EXPIRE', KEYS[7], ARGV[4])
+    redis.call('PUBLISH', ARGV[6], KEYS[5])
+end
+
+local state = redis.call('GET', KEYS[5]) or ''
+local questions = redis.call('GET', KEYS[8]) or ''
+
+-- скорборд: top-K у режимі аудиторії, інакше всі гравці (бали в порядку HGETALL)
+local board = {}
+if state ~= '' and cjson.decode(state)['audience'] == true then
+    local top = redis.call('ZREVRANGE', KEYS[9], 0, tonumber(ARGV[7]) - 1, 'WITHSCORES')
+    local ids = {}
+    for i = 1, #top, 2 do ids[#ids + 1] = top[i] end
+    local names = #ids > 0 and redis.call('HMGET', KEYS[4], unpack(ids)) or {}
+    for i = 1, #ids do
+        board[#board + 1] = ids[i]
+        board[#board + 1] = names[i] or 'Player'
+        board[#board + 1] = top[2 * i]
+    end
+else
+    local scores = {}
+    local rows = redis.call('ZRANGE', KEYS[9], 0, -1, 'WITHSCORES')
+    for i = 1, #rows, 2 do scores[rows[i]] = rows[i + 1] end
+    local players = redis.call('HGETALL', KEYS[4])
+    for i = 1, #players, 2 do
+        board[#board + 1] = players[i]
+        board[#board + 1] = players[i + 1]
+        board[#board + 1] = scores[players[i]] or '0'
+    end
+end
+
+return {'ok', slot, name, token, restored, added, version, state, questions, board}
+""")
+
+# Запис стану з новою версією і дельтою в журнал за один атомарний виклик
+# KEYS: state, version, deltas; ARGV: state_json, changes_json, log_size, ttl, invalidation channel
+SET_STATE = RedisScript("set_state", """
+local v = redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('SET', KEYS[1], ARGV[1], 'KEEPTTL')
+redis.call('RPUSH', KEYS[3], '{"type": "state_delta", "version": ' .. v .. ', "changes": ' .. ARGV[2] .. '}')
+redis.call('LTRIM', KEYS[3], -tonumber(ARGV[3]), -1)
+redis.call('EXPIRE', KEYS[3], ARGV[4])
+redis.call('PUBLISH', ARGV[5], KEYS[1])
+return v
+""")
+
+
+@dataclass
+class JoinResult:
+    """Підсумок join_player: хто підключився і все потрібне для state_sync"""
+
+    status: str
+    player_id: int | None = None
+    name: str | None = None
+    token: str | None = None
+    # відновлено за токеном перепідключення (можна надіслати лише дельти)
+    restored: bool = False
+    # гравець новий у кімнаті — версія стану збільшилась
+    added: bool = False
+    state: dict = field(default_factory=dict)
+    questions: list = field(default_factory=list)
+    # (player_id, ім'я, бали) за спаданням балів
+    scoreboard: List[Tuple[int, str, int]] = field(default_factory=list)
+
+    @property
+    def question(self) -> Optional[dict]:
+        qidx = self.state.get("questionIndex", -1)
+        return self.questions[qidx] if 0 <= qidx < len(self.questions) else None
+
+
+@dataclass
+class RoomSnapshot:
+    """Уся кімната разом — щоб продовжити її в іншому сховищі"""
+
+    session: Optional[dict]
+    # стан без поля version
+    state: dict
+    version: int
+    questions: list
+    players: Dict[int, str]
+    tokens: Dict[str, int]
+    next_slot: int
+    scores: Dict[int, int]
+    # відповіді лише на поточне питання
+    answers: Dict[int, int]
+    deltas: List[str]
+
+
+def delta_frame(version: int, changes: dict) -> dict:
+    """Кадр state_delta у тому ж вигляді, що зберігається в журналі"""
+    return {"type": "state_delta", "version": version, "changes": changes}
+
+
+def deltas_since(log: List[str], since: int) -> Optional[List[str]]:
+    """
+    Кадри журналу з версією, більшою за since. None — журнал уже
+    не містить усіх потрібних версій і клієнту потрібен повний знімок.
+    """
+    frames = [(json.loads(frame)["version"], frame) for frame in log]
+    current = frames[-1][0] if frames else 0
+    newer = [(version, frame) for version, frame in frames if version > since]
+    if since > current or (newer and newer[0][0] != since + 1):
+        return None
+    return [frame for _, frame in newer]
+
+
+def encode_archive(payload: str) -> bytes:
+    """Стискає JSON знімка сесії з байтом версії формату"""
+    compressed = zlib.compress(payload.encode(), settings.ARCHIVE_COMPRESSION_LEVEL)
+    return bytes([ARCHIVE_FORMAT_ZLIB]) + compressed
+
+
+def decode_archive(blob: bytes) -> str:
+    """Зворотне до encode_archive; архіви без версії (чистий JSON) читаються як є"""
+    if blob[:1] == b"{":
+        return blob.decode()
+    if blob[0] == ARCHIVE_FORMAT_ZLIB:
+        return zlib.decompress(blob[1:]).decode()
+    raise ValueError(f"Невідома версія формату архіву: {blob[0]}")
+
+
+def iter_answer_bits(blob: bytes) -> Iterator[Tuple[int, int]]:
+    """Пари (слот, option) з рядка answerbits:q{n} в порядку слотів"""
+    # BITFIELD u4 #n — старший півбайт байта n // 2 для парних n
+    for i, byte in enumerate(blob):
+        if not byte:
+            continue
+        high, low = byte >> ANSWER_BITS, byte & 0x0F
+        if high:
+            yield 2 * i, high - 1
+        if low:
+            yield 2 * i + 1, low - 1
+
+
+def tally_answers(
+    answers: Iterable[Tuple[int, int]], correct_idx: int
+) -> Tuple[List[int], Dict[int, int]]:
+    """Один прохід по відповідях: хто відповів правильно і скільки обрали кожен варіант"""
+    correct: List[int] = []
+    distribution: Dict[int, int] = {}
+    for player_id, option in answers:
+        distribution[option] = distribution.get(option, 0) + 1
+        if option == correct_idx:
+            correct.append(player_id)
+    return correct, distribution
+
+
+def check_answer_window(state: dict, qidx: int, now_ms: int) -> str | None:
+    """Python-версія перевірок SUBMIT_ANSWER; None — відповідь приймається"""
+    if state.get("phase") != "QUESTION_ACTIVE" or state.get("questionIndex") != qidx:
+        return ANSWER_INACTIVE
+    started = state.get("startedAt")
+    if started is None or now_ms > started + (state.get("durationMs") or 0):
+        return ANSWER_LATE
+    if now_ms < started:
+        return ANSWER_EARLY
+    return None
+
+
+class PendingWritesError(RuntimeError):
+    """Відкладені записи кімнати не дійшли до сховища"""
+
+
+class RoomStore(ABC):
+    """
+    Сховище стану кімнат, з яким працює RoomManager.
+
+    Уся ігрова логіка звертається лише до цих методів, тому бекенд
+    (Redis або пам'ять процесу) можна обрати через Settings.
+    """
+
+    # --- сесія (session:{room}) ---
+
+    @abstractmethod
+    async def get_session(self, room: str) -> Optional[dict]: ...
+
+    @abstractmethod
+    async def set_session(self, room: str, data: dict) -> None: ...
+
+    # --- питання та стан ---
+
+    @abstractmethod
+    async def create_room(self, room: str, questions: list[dict], state: dict) -> None:
+        """Зберігає питання, початковий стан і скидає бали кімнати"""
+
+    @abstractmethod
+    async def load_questions(self, room: str) -> list[dict]: ...
+
+    @abstractmethod
+    async def get_state(self, room: str) -> dict: ...
+
+    @abstractmethod
+    async def set_state(self, room: str, state: dict, changes: str) -> int:
+        """
+        Записує стан, збільшує його версію і додає changes (JSON)
+        у журнал дельт. Повертає нову версію.
+        """
+
+    @abstractmethod
+    async def get_deltas(self, room: str, since: int) -> Optional[List[str]]:
+        """Кадри state_delta після версії since або None, якщо журнал їх уже не має"""
+
+    # --- гравці ---
+    #
+    # Усередині кімнати гравець — це компактний цілий id (слот, від 1):
+    # ним ключуються гравці, бали, відповіді та кадри клієнтам.
+    # UUID-токен лишається лише для перепідключення і зіставляється зі слотом.
+
+    @abstractmethod
+    async def get_player_slot(self, room: str, token: str) -> Optional[int]:
+        """Слот гравця за токеном перепідключення"""
+
+    @abstractmethod
+    async def assign_slot(self, room: str, token: str, slot: Optional[int] = None) -> int:
+        """Прив'язує токен до слота (None — виділити новий слот) і повертає слот"""
+
+    @abstractmethod
+    async def get_player_name(self, room: str, player_id: int) -> Optional[str]: ...
+
+    @abstractmethod
+    async def get_players(self, room: str) -> Dict[int, str]: ...
+
+    @abstractmethod
+    async def add_player(self, room: str, player_id: int, name: str) -> bool:
+        """Додає або оновлює гравця; True — гравець новий"""
+
+    @abstractmethod
+    async def count_players(self, room: str) -> int: ...
+
+    async def join_player(
+        self, room: str, token: Optional[str], name: Optional[str], new_token: str
+    ) -> JoinResult:
+        """
+        Підключення гравця: перевіряє сесію, відновлює гравця за токеном
+        або ім'ям (інакше видає слот для new_token) і повертає стан,
+        питання та скорборд (top-K у режимі аудиторії).
+        """
+        session = await self.get_session(room)
+        if session is None:
+            return JoinResult(JOIN_MISSING)
+        if session.get("phase") == "ENDED":
+            return JoinResult(JOIN_ENDED)
+
+        player_id: Optional[int] = None
+        player_name: Optional[str] = None
+        restored = False
+        if token is not None:
+            slot = await self.get_player_slot(room, token)
+            if slot is not None:
+                player_name = await self.get_player_name(room, slot)
+            if player_name is not None:
+                player_id, restored = slot, True
+        if not restored and name:
+            for pid, pname in (await self.get_players(room)).items():
+                if pname == name:
+                    player_id, player_name = pid, pname
+                    break
+        if not restored:
+            token = new_token
+            player_id = await self.assign_slot(room, token, player_id)
+        if player_name is None:
+            player_name = name or "Player"
+
+        added = await self.add_player(room, player_id, player_name)
+        state = await self.get_state(room)
+        if added:
+            state.pop("version", None)
+            changes = {"players": [{"playerId": player_id, "name": player_name}]}
+            state["version"] = await self.set_state(room, state, json.dumps(changes))
+
+        if state.get("audience"):
+            scoreboard = await self.get_top_scores(room, settings.AUDIENCE_TOP_K)
+        else:
+            scores = await self.get_scores(room)
+            scoreboard = sorted(
+                (
+                    (pid, pname, scores.get(pid, 0))
+                    for pid, pname in (await self.get_players(room)).items()
+                ),
+                key=lambda row: row[2],
+                reverse=True,
+            )
+        return JoinResult(
+            JOIN_OK,
+            player_id=player_id,
+            name=player_name,
+            token=token,
+            restored=restored,
+            added=added,
+            state=state,
+            questions=await self.load_questions(room),
+            scoreboard=scoreboard,
+        )
+
+    # --- відповіді ---
+
+    @abstractmethod
+    async def submit_answer(
+        self, room: str, qidx: int, player_id: int, option_index: int, now_ms: int
+    ) -> str:
+        """
+        Атомарно перевіряє, що питання qidx активне і час не вийшов,
+        та зберігає першу відповідь гравця. Повертає один з ANSWER_*.
+        """
+
+    async def submit_answers(
+        self, room: str, qidx: int, answers: List[Tuple[int, int, int]]
+    ) -> List[str]:
+        """
+        Пачка відповідей (player_id, option_index, now_ms) на одне питання.
+        Результати повертаються в тому ж порядку, що й відповіді.
+        """
+        return [
+            await self.submit_answer(room, qidx, player_id, option_index, now_ms)
+            for player_id, option_index, now_ms in answers
+        ]
+
+    @abstractmethod
+    async def get_answers(self, room: str, qidx: int) -> Dict[int, int]: ...
+
+    async def tally_answers(
+        self, room: str, qidx: int, correct_idx: int
+    ) -> Tuple[List[int], Dict[int, int]]:
+        """Гравці з правильною відповіддю та розподіл варіантів для розкриття"""
+        answers = await self.get_answers(room, qidx)
+        return tally_answers(answers.items(), correct_idx)
+
+    @abstractmethod
+    async def clear_answers(self, room: str, qidx: int) -> None: ...
+
+    # --- бали ---
+
+    @abstractmethod
+    async def add_scores(self, room: str, player_ids: List[int], points: int) -> Dict[int, int]:
+        """Додає бали гравцям; повертає їхні нові суми"""
+
+    @abstractmethod
+    async def get_scores(self, room: str) -> Dict[int, int]: ...
+
+    @abstractmethod
+    async def get_top_scores(self, room: str, k: int) -> List[Tuple[int, str, int]]:
+        """Перші k гравців за балами: (player_id, ім'я, бали)"""
+
+    # --- архів та очищення ---
+
+    @abstractmethod
+    async def save_archive(
+        self, room: str, session_id: str, payload: str, ended_at_ms: int
+    ) -> None:
+        """Зберігає стиснутий знімок сесії на ARCHIVE_TTL_SEC"""
+
+    @abstractmethod
+    async def confirm_archive(self, room: str, session_id: str) -> None:
+        """
+        Знімок записано в Postgres: архів лишається в Redis лише на
+        ARCHIVE_HOT_TTL_SEC, разом з ним скорочується і запис в індексах.
+        """
+
+    @abstractmethod
+    async def get_archive(self, session_id: str) -> Optional[str]:
+        """JSON знімка сесії (розпакований) або None"""
+
+    @abstractmethod
+    async def delete_room(
+        self, room: str, question_count: int, keep_session_sec: int | None = None
+    ) -> None:
+        """
+        Видаляє всі ключі кімнати (включно з answers:q{n}).
+        Якщо задано keep_session_sec, session:{room} лишається з цим TTL,
+        щоб пізні перепідключення бачили, що вікторина завершена.
+        """
+
+    @abstractmethod
+    async def leaked_keys(self, room: str, question_count: int) -> List[str]:
+        """Ключі кімнати, що досі існують після видалення"""
+
+    @abstractmethod
+    async def load_room(self, room: str) -> Optional[RoomSnapshot]:
+        """Знімок усієї кімнати або None, якщо кімнати немає"""
+
+    def evict(self, room: str) -> None:
+        """Кімната більше не обслуговується цим воркером"""
+
+    async def flush(self, room: Optional[str] = None) -> None:
+        """
+        Чекає, доки відкладені записи кімнати (None — усіх кімнат)
+        потраплять у сховище. PendingWritesError — записи не вдалися
+        і лишаються в черзі; кімнату не можна передавати іншому воркеру.
+        """
+
+
+class RedisRoomStore(RoomStore):
+    """Стан кімнат у Redis (спільний для кількох воркерів)"""
+
+    def __init__(self) -> None:
+        # кімнати, чиї ключі схеми 1 уже перенесено (REDIS_KEY_V1_FALLBACK)
+        self._migrated: Set[str] = set()
+
+    async def _redis(self, room: str) -> Redis:
+        """
+        Клієнт Redis для роботи з кімнатою. Під час переходу на схему 2
+        спершу (раз на кімнату) переносить її ключі схеми 1, тож живі
+        кімнати не зникають між перезапуском воркерів і міграцією.
+        """
+        r = await get_redis()
+        if (
+            settings.REDIS_KEY_V1_FALLBACK
+            and settings.REDIS_KEY_SCHEMA == KEY_SCHEMA_V2
+            and room not in self._migrated
+        ):
+            if await migrate_room(r, room) > 0:
+                self._invalidate(self.k_session(room), self.k_state(room), self.k_questions(room))
+            if len(self._migrated) >= _MIGRATED_ROOMS_MAX:
+                self._migrated.clear()
+            self._migrated.add(room)
+        return r
+
+    # --- Redis ключі ---
+
+    # імена залежать від REDIS_KEY_SCHEMA (див. app.ws.keys)
+
+    def k_session(self, room: str) -> str:
+        return room_key(room, "session")
+
+    def k_state(self, room: str) -> str:
+        return room_key(room, "state")
+
+    def k_version(self, room: str) -> str:
+        return room_key(room, "version")
+
+    def k_deltas(self, room: str) -> str:
+        return room_key(room, "deltas")
+
+    def k_questions(self, room: str) -> str:
+        return room_key(room, "questions")
+
+    def k_answers(self, room: str, qidx: int) -> str:
+        return room_key(room, f"answers:q{qidx}")
+
+    def k_answer_bits(self, room: str, qidx: int) -> str:
+        return room_key(room, f"answerbits:q{qidx}")
+
+    def k_players(self, room: str) -> str:
+        return room_key(room, "players")
+
+    def k_score(self, room: str) -> str:
+        return room_key(room, "score")
+
+    def k_tokens(self, room: str) -> str:
+        return room_key(room, "tokens")
+
+    def k_next_slot(self, room: str) -> str:
+        return room_key(room, "next_slot")
+
+    # --- локальний кеш (сесія, стан, питання) ---
+
+    async def _cached(self, key: str, fetch):
+        """Читає ключ через near-cache; у кеші зберігаються сирі значення Redis"""
+        value = near_cache.get(key)
+        if value is not MISS:
+            return value
+        generation = near_cache.generation(key)
+        value = await fetch()
+        near_cache.put(key, value, generation)
+        return value
+
+    @staticmethod
+    def _publish_invalidation(pipe, *keys: str) -> None:
+        """Скидає ключі в кеші решти воркерів (повідомлення йде після запису в pipe)"""
+        for key in keys:
+            pipe.publish(INVALIDATION_CHANNEL, key)
+
+    @staticmethod
+    def _invalidate(*keys: str) -> None:
+        """
+        Скидає ключі в кеші цього воркера. Викликається після того, як запис
+        дійшов до Redis: читання, що встигло взяти старе значення під час
+        запису, інакше потрапило б у кеш і пережило б сам запис.
+        """
+        for key in keys:
+            near_cache.invalidate(key)
+
+    # --- сесія ---
+
+    async def get_session(self, room: str) -> Optional[dict]:
+        r = await self._redis(room)
+        raw = await self._cached(self.k_session(room), lambda: r.get(self.k_session(room)))
+        return json.loads(raw) if raw else None
+
+    async def set_session(self, room: str, data: dict) -> None:
+        r = await self._redis(room)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.set(self.k_session(room), json.dumps(data), ex=settings.ROOM_TTL_SEC)
+            self._publish_invalidation(pipe, self.k_session(room))
+            await pipe.execute()
+        self._invalidate(self.k_session(room))
+
+    # --- питання та стан ---
+
+    async def create_room(self, room: str, questions: list[dict], state: dict) -> None:
+        r = await self._redis(room)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.set(self.k_questions(room), json.dumps(questions), ex=settings.ROOM_TTL_SEC)
+            pipe.set(self.k_state(room), json.dumps(state), ex=settings.ROOM_TTL_SEC)
+            pipe.set(self.k_version(room), 0, ex=settings.ROOM_TTL_SEC)
+            pipe.delete(self.k_score(room), self.k_deltas(room))
+            self._publish_invalidation(pipe, self.k_questions(room), self.k_state(room))
+            await pipe.execute()
+        self._invalidate(self.k_questions(room), self.k_state(room))
+
+    async def load_questions(self, room: str) -> list[dict]:
+        r = await self._redis(room)
+        raw = await self._cached(self.k_questions(room), lambda: r.get(self.k_questions(room)))
+        return json.loads(raw) if raw else []
+
+    async def get_state(self, room: str) -> dict:
+        r = await self._redis(room)
+        # версія закешована разом зі станом: обидва змінюються лише через SET_STATE
+        raw, version = await self._cached(
+            self.k_state(room), lambda: r.mget(self.k_state(room), self.k_version(room))
+        )
+        if not raw:
+            return {}
+        state = json.loads(raw)
+        state["version"] = int(version or 0)
+        return state
+
+    async def set_state(self, room: str, state: dict, changes: str) -> int:
+        r = await self._redis(room)
+        # KEEPTTL: оновлення стану не скидає TTL кімнати
+        version = await SET_STATE(
+            r,
+            [self.k_state(room), self.k_version(room), self.k_deltas(room)],
+            [
+                json.dumps(state),
+                changes,
+                settings.DELTA_LOG_SIZE,
+                settings.ROOM_TTL_SEC,
+                INVALIDATION_CHANNEL,
+            ],
+        )
+        self._invalidate(self.k_state(room))
+        return version
+
+    async def get_deltas(self, room: str, since: int) -> Optional[List[str]]:
+        r = await self._redis(room)
+        return deltas_since(await r.lrange(self.k_deltas(room), 0, -1), since)
+
+    # --- гравці ---
+
+    async def get_player_slot(self, room: str, token: str) -> Optional[int]:
+        r = await self._redis(room)
+        slot = await r.hget(self.k_tokens(room), token)
+        return int(slot) if slot is not None else None
+
+    async def assign_slot(self, room: str, token: str, slot: Optional[int] = None) -> int:
+        r = await self._redis(room)
+        return await ASSIGN_SLOT(
+            r,
+            [self.k_tokens(room), self.k_next_slot(room)],
+            [token, "" if slot is None else slot, settings.ROOM_TTL_SEC],
+        )
+
+    async def get_player_name(self, room: str, player_id: int) -> Optional[str]:
+        r = await self._redis(room)
+        return await r.hget(self.k_players(room), player_id)
+
+    async def get_players(self, room: str) -> Dict[int, str]:
+        r = await self._redis(room)
+        raw = await r.hgetall(self.k_players(room))
+        return {int(pid): name for pid, name in raw.items()}
+
+    async def add_player(self, room: str, player_id: int, name: str) -> bool:
+        r = await self._redis(room)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.hset(self.k_players(room), mapping={player_id: name})
+            pipe.expire(self.k_players(room), settings.ROOM_TTL_SEC)
+            added, _ = await pipe.execute()
+        return bool(added)
+
+    async def count_players(self, room: str) -> int:
+        r = await self._redis(room)
+        return await r.hlen(self.k_players(room))
+
+    async def join_player(
+        self, room: str, token: Optional[str], name: Optional[str], new_token: str
+    ) -> JoinResult:
+        r = await self._redis(room)
+        reply = await JOIN_PLAYER(
+            r,
+            [
+                self.k_session(room),
+                self.k_tokens(room),
+                self.k_next_slot(room),
+                self.k_players(room),
+                self.k_state(room),
+                self.k_version(room),
+                self.k_deltas(room),
+                self.k_questions(room),
+                self.k_score(room),
+            ],
+            [
+                token or "",
+                name or "",
+                new_token,
+                settings.ROOM_TTL_SEC,
+                settings.DELTA_LOG_SIZE,
+                INVALIDATION_CHANNEL,
+                settings.AUDIENCE_TOP_K,
+            ],
+        )
+        if reply[0] != JOIN_OK:
+            return JoinResult(reply[0])
+        _, slot, player_name, token, restored, added, version, raw_state, raw_questions, board = reply
+        if added:
+            self._invalidate(self.k_state(room))
+        state = json.loads(raw_state) if raw_state else {}
+        if state:
+            state["version"] = int(version)
+        rows = [
+            (int(board[i]), board[i + 1], int(float(board[i + 2])))
+            for i in range(0, len(board), 3)
+        ]
+        if not state.get("audience"):
+            rows.sort(key=lambda row: row[2], reverse=True)
+        return JoinResult(
+            JOIN_OK,
+            player_id=int(slot),
+            name=player_name,
+            token=token,
+            restored=bool(restored),
+            added=bool(added),
+            state=state,
+            questions=json.loads(raw_questions) if raw_questions else [],
+            scoreboard=rows,
+        )
+
+    # --- відповіді ---
+
+    @property
+    def bitfield_answers(self) -> bool:
+        return settings.ANSWER_STORE == "bitfield"
+
+    def _answers_key(self, room: str, qidx: int) -> str:
+        if self.bitfield_answers:
+            return self.k_answer_bits(room, qidx)
+        return self.k_answers(room, qidx)
+
+    async def submit_answer(
+        self, room: str, qidx: int, player_id: int, option_index: int, now_ms: int
+    ) -> str:
+        r = await self._redis(room)
+        return await SUBMIT_ANSWER(
+            r,
+            [self.k_state(room), self._answers_key(room, qidx)],
+            [
+                qidx,
+                player_id,
+                option_index,
+                now_ms,
+                settings.ROOM_TTL_SEC,
+                settings.ANSWER_STORE,
+            ],
+        )
+
+    async def submit_answers(
+        self, room: str, qidx: int, answers: List[Tuple[int, int, int]]
+    ) -> List[str]:
+        r = await self._redis(room)
+        args: List[object] = [qidx, settings.ROOM_TTL_SEC, settings.ANSWER_STORE]
+        for player_id, option_index, now_ms in answers:
+            args.extend((player_id, option_index, now_ms))
+        return await SUBMIT_ANSWERS(
+            r, [self.k_state(room), self._answers_key(room, qidx)], args
+        )
+
+    async def _answer_bits(self, room: str, qidx: int) -> bytes:
+        # бінарний рядок читається клієнтом без декодування відповідей
+        await self._redis(room)
+        r = await get_redis_raw()
+        return await r.get(self.k_answer_bits(room, qidx)) or b""
+
+    async def get_answers(self, room: str, qidx: int) -> Dict[int, int]:
+        if self.bitfield_answers:
+            return dict(iter_answer_bits(await self._answer_bits(room, qidx)))
+        r = await self._redis(room)
+        raw = await r.hgetall(self.k_answers(room, qidx))
+        return {int(pid): int(opt) for pid, opt in raw.items()}
+
+    async def tally_answers(
+        self, room: str, qidx: int, correct_idx: int
+    ) -> Tuple[List[int], Dict[int, int]]:
+        if not self.bitfield_answers:
+            return await super().tally_answers(room, qidx, correct_idx)
+        blob = await self._answer_bits(room, qidx)
+        return tally_answers(iter_answer_bits(blob), correct_idx)
+
+    async def clear_answers(self, room: str, qidx: int) -> None:
+        r = await self._redis(room)
+        await r.delete(self.k_answers(room, qidx), self.k_answer_bits(room, qidx))
+
+    # --- бали ---
+
+    async def add_scores(self, room: str, player_ids: List[int], points: int) -> Dict[int, int]:
+        r = await self._redis(room)
+        async with r.pipeline(transaction=False) as pipe:
+            for player_id in player_ids:
+                pipe.zincrby(self.k_score(room), points, player_id)
+            pipe.expire(self.k_score(room), settings.ROOM_TTL_SEC)
+            totals = await pipe.execute()
+        return {pid: int(score) for pid, score in zip(player_ids, totals)}
+
+    async def get_scores(self, room: str) -> Dict[int, int]:
+        r = await self._redis(room)
+        rows = await r.zrevrange(self.k_score(room), 0, -1, withscores=True)
+        return {int(pid): int(score) for pid, score in rows}
+
+    async def get_top_scores(self, room: str, k: int) -> List[Tuple[int, str, int]]:
+        r = await self._redis(room)
+        rows = await r.zrevrange(self.k_score(room), 0, k - 1, withscores=True)
+        if not rows:
+            return []
+        names = await r.hmget(self.k_players(room), [pid for pid, _ in rows])
+        return [
+            (int(pid), name or "Player", int(score))
+            for (pid, score), name in zip(rows, names)
+        ]
+
+    # --- архів та очищення ---
+
+    def k_archive(self, session_id: str) -> str:
+        return f"quiz:session:{session_id}"
+
+    def k_room_archives(self, room: str) -> str:
+        return room_key(room, "archives")
+
+    async def save_archive(
+        self, room: str, session_id: str, payload: str, ended_at_ms: int
+    ) -> None:
+        r = await self._redis(room)
+        ttl = settings.ARCHIVE_TTL_SEC
+        expires_ms = ended_at_ms + ttl * 1000
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.set(self.k_archive(session_id), encode_archive(payload), ex=ttl)
+            self._index_archive(pipe, room, session_id, expires_ms, ttl)
+            await pipe.execute()
+
+    async def confirm_archive(self, room: str, session_id: str) -> None:
+        r = await self._redis(room)
+        ttl = settings.ARCHIVE_HOT_TTL_SEC
+        expires_ms = int(time.time() * 1000) + ttl * 1000
+        async with r.pipeline(transaction=False) as pipe:
+            # архів, що вже зник, не відновлюється: EXPIRE і ZADD XX
+            # не створюють відсутніх записів
+            pipe.expire(self.k_archive(session_id), ttl)
+            self._index_archive(
+                pipe, room, session_id, expires_ms, settings.ARCHIVE_TTL_SEC, existing=True
+            )
+            await pipe.execute()
+
+    def _index_archive(
+        self, pipe, room: str, session_id: str, expires_ms: int, ttl: int,
+        existing: bool = False,
+    ) -> None:
+        # індекси не тримають посилань на архіви, що вже залишили Redis
+        now_ms = int(time.time() * 1000)
+        for index in (ARCHIVE_INDEX, self.k_room_archives(room)):
+            pipe.zadd(index, {session_id: expires_ms}, xx=existing)
+            pipe.zremrangebyscore(index, "-inf", now_ms)
+        pipe.expire(self.k_room_archives(room), ttl)
+
+    async def get_archive(self, session_id: str) -> Optional[str]:
+        r = await get_redis_raw()
+        blob = await r.get(self.k_archive(session_id))
+        return decode_archive(blob) if blob is not None else None
+
+    def room_keys(self, room: str, question_count: int) -> List[str]:
+        """Усі ключі, якими володіє кімната"""
+        return [
+            self.k_state(room),
+            self.k_version(room),
+            self.k_deltas(room),
+            self.k_questions(room),
+            self.k_score(room),
+            self.k_players(room),
+            self.k_tokens(room),
+            self.k_next_slot(room),
+            *(self.k_answers(room, qidx) for qidx in range(question_count)),
+            *(self.k_answer_bits(room, qidx) for qidx in range(question_count)),
+        ]
+
+    async def delete_room(
+        self, room: str, question_count: int, keep_session_sec: int | None = None
+    ) -> None:
+        r = await self._redis(room)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.delete(*self.room_keys(room, question_count))
+            if keep_session_sec is None:
+                pipe.delete(self.k_session(room))
+                self._publish_invalidation(pipe, self.k_session(room))
+            else:
+                pipe.expire(self.k_session(room), keep_session_sec)
+            self._publish_invalidation(pipe, self.k_state(room), self.k_questions(room))
+            await pipe.execute()
+        if keep_session_sec is None:
+            self._invalidate(self.k_session(room))
+        self._invalidate(self.k_state(room), self.k_questions(room))
+
+    async def leaked_keys(self, room: str, question_count: int) -> List[str]:
+        r = await self._redis(room)
+        keys = self.room_keys(room, question_count)
+        async with r.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.exists(key)
+            found = await pipe.execute()
+        return [key for key, exists in zip(keys, found) if exists]
+
+    async def load_room(self, room: str) -> Optional[RoomSnapshot]:
+        r = await self._redis(room)
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.get(self.k_session(room))
+            pipe.mget(self.k_state(room), self.k_version(room))
+            pipe.get(self.k_questions(room))
+            pipe.hgetall(self.k_players(room))
+            pipe.hgetall(self.k_tokens(room))
+            pipe.get(self.k_next_slot(room))
+            pipe.zrange(self.k_score(room), 0, -1, withscores=True)
+            pipe.lrange(self.k_deltas(room), 0, -1)
+            (
+                session,
+                (state, version),
+                questions,
+                players,
+                tokens,
+                next_slot,
+                scores,
+                deltas,
+            ) = await pipe.execute()
+        if session is None and state is None:
+            return None
+        state = json.loads(state) if state else {}
+        qidx = state.get("questionIndex", -1)
+        return RoomSnapshot(
+            session=json.loads(session) if session else None,
+            state=state,
+            version=int(version or 0),
+            questions=json.loads(questions) if questions else [],
+            players={int(pid): name for pid, name in players.items()},
+            tokens={token: int(slot) for token, slot in tokens.items()},
+            next_slot=int(next_slot or 0),
+            scores={int(pid): int(score) for pid, score in scores},
+            answers=await self.get_answers(room, qidx) if qidx >= 0 else {},
+            deltas=deltas,
+        )
+
+
+class _MemoryRoom:
+    """Компактний стан однієї кімнати в пам'яті процесу"""
+
+    __slots__ = (
+        "session",
+        "state",
+        "questions",
+        "players",
+        "tokens",
+        "next_slot",
+        "scores",
+        "answers",
+        "version",
+        "deltas",
+        "expires_at",
+    )
+
+    def __init__(self) -> None:
+        self.session: Optional[dict] = None
+        self.state: dict = {}
+        self.questions: list[dict] = []
+        self.players: Dict[int, str] = {}
+        # токен перепідключення -> слот гравця
+        self.tokens: Dict[str, int] = {}
+        self.next_slot = 0
+        self.scores: Dict[int, int] = {}
+        self.answers: Dict[int, Dict[int, int]] = {}
+        self.version = 0
+        self.deltas: Deque[str] = deque(maxlen=settings.DELTA_LOG_SIZE)
+        self.expires_at = time.monotonic() + settings.ROOM_TTL_SEC
+
+    def touch(self) -> None:
+        self.expires_at = time.monotonic() + settings.ROOM_TTL_SEC
+
+
+class MemoryRoomStore(RoomStore):
+    """
+    Стан кімнат у пам'яті процесу: без мережевих запитів,
+    для одновузлових інсталяцій та тестів.
+
+    expire=False — кімнати не застарівають за ROOM_TTL_SEC, їх час життя
+    визначає власник (копія кімнат у WriteBehindRoomStore).
+    """
+
+    def __init__(self, expire: bool = True) -> None:
+        self.expire = expire
+        self.rooms: Dict[str, _MemoryRoom] = {}
+        self.archives: Dict[str, bytes] = {}
+        # session_id -> момент (мс), коли архів залишає сховище
+        self.archive_index: Dict[str, int] = {}
+        self.room_sessions: Dict[str, set[str]] = {}
+
+    def _get(self, room: str) -> Optional[_MemoryRoom]:
+        data = self.rooms.get(room)
+        if data is not None and self.expire and data.expires_at < time.monotonic():
+            del self.rooms[room]
+            return None
+        return data
+
+    def _get_or_create(self, room: str) -> _MemoryRoom:
+        data = self._get(room)
+        if data is None:
+            data = self.rooms[room] = _MemoryRoom()
+        return data
+
+    # --- сесія ---
+
+    async def get_session(self, room: str) -> Optional[dict]:
+        data = self._get(room)
+        if data is None or data.session is None:
+            return None
+        return dict(data.session)
+
+    async def set_session(self, room: str, data: dict) -> None:
+        self._get_or_create(room).session = dict(data)
+
+    # --- питання та стан ---
+
+    async def create_room(self, room: str, questions: list[dict], state: dict) -> None:
+        data = self._get_or_create(room)
+        data.questions = list(questions)
+        data.state = dict(state)
+        data.scores = {}
+        data.version = 0
+        data.deltas.clear()
+        data.touch()
+
+    async def load_questions(self, room: str) -> list[dict]:
+        data = self._get(room)
+        return data.questions if data is not None else []
+
+    async def get_state(self, room: str) -> dict:
+        data = self._get(room)
+        if data is None or not data.state:
+            return {}
+        return {**data.state, "version": data.version}
+
+    async def set_state(self, room: str, state: dict, changes: str) -> int:
+        data = self._get_or_create(room)
+        data.state = dict(state)
+        data.version += 1
+        data.deltas.append(json.dumps(delta_frame(data.version, json.loads(changes))))
+        return data.version
+
+    async def get_deltas(self, room: str, since: int) -> Optional[List[str]]:
+        data = self._get(room)
+        if data is None:
+            return None
+        return deltas_since(list(data.deltas), since)
+
+    # --- гравці ---
+
+    async def get_player_slot(self, room: str, token: str) -> Optional[int]:
+        data = self._get(room)
+        return data.tokens.get(token) if data is not None else None
+
+    async def assign_slot(self, room: str, token: str, slot: Optional[int] = None) -> int:
+        data = self._get_or_create(room)
+        if slot is None:
+            data.next_slot += 1
+            slot = data.next_slot
+        data.tokens[token] = slot
+        return slot
+
+    async def get_player_name(self, room: str, player_id: int) -> Optional[str]:
+        data = self._get(room)
+        return data.players.get(player_id) if data is not None else None
+
+    async def get_players(self, room: str) -> Dict[int, str]:
+        data = self._get(room)
+        return dict(data.players) if data is not None else {}
+
+    async def add_player(self, room: str, player_id: int, name: str) -> bool:
+        data = self._get_or_create(room)
+        added = player_id not in data.players
+        data.players[player_id] = name
+        data.touch()
+        return added
+
+    async def count_players(self, room: str) -> int:
+        data = self._get(room)
+        return len(data.players) if data is not None else 0
+
+    # --- відповіді ---
+
+    async def submit_answer(
+        self, room: str, qidx: int, player_id: int, option_index: int, now_ms: int
+    ) -> str:
+        data = self._get(room)
+        if data is None:
+            return ANSWER_INACTIVE
+        rejected = check_answer_window(data.state, qidx, now_ms)
+        if rejected is not None:
+            return rejected
+        answers = data.answers.setdefault(qidx, {})
+        if player_id in answers:
+            return ANSWER_DUPLICATE
+        answers[player_id] = option_index
+        return ANSWER_OK
+
+    async def get_answers(self, room: str, qidx: int) -> Dict[int, int]:
+        data = self._get(room)
+        if data is None:
+            return {}
+        return dict(data.answers.get(qidx, {}))
+
+    async def clear_answers(self, room: str, qidx: int) -> None:
+        data = self._get(room)
+        if data is not None:
+            data.answers.pop(qidx, None)
+
+    # --- бали ---
+
+    async def add_scores(self, room: str, player_ids: List[int], points: int) -> Dict[int, int]:
+        scores = self._get_or_create(room).scores
+        for player_id in player_ids:
+            scores[player_id] = scores.get(player_id, 0) + points
+        return {player_id: scores[player_id] for player_id in player_ids}
+
+    async def get_scores(self, room: str) -> Dict[int, int]:
+        data = self._get(room)
+        return dict(data.scores) if data is not None else {}
+
+    async def get_top_scores(self, room: str, k: int) -> List[Tuple[int, str, int]]:
+        data = self._get(room)
+        if data is None:
+            return []
+        top = heapq.nlargest(k, data.scores.items(), key=lambda item: item[1])
+        return [(pid, data.players.get(pid, "Player"), score) for pid, score in top]
+
+    # --- архів та очищення ---
+
+    async def save_archive(
+        self, room: str, session_id: str, payload: str, ended_at_ms: int
+    ) -> None:
+        self.archives[session_id] = encode_archive(payload)
+        self._index_archive(
+            room, session_id, ended_at_ms + settings.ARCHIVE_TTL_SEC * 1000
+        )
+
+    async def confirm_archive(self, room: str, session_id: str) -> None:
+        if session_id not in self.archives:
+            return
+        expires_ms = int(time.time() * 1000) + settings.ARCHIVE_HOT_TTL_SEC * 1000
+        self._index_archive(
+            room, session_id, min(expires_ms, self.archive_index[session_id])
+        )
+
+    def _index_archive(self, room: str, session_id: str, expires_ms: int) -> None:
+        self.archive_index[session_id] = expires_ms
+        self.room_sessions.setdefault(room, set()).add(session_id)
+        now_ms = int(time.time() * 1000)
+        for old_id in [sid for sid, ts in self.archive_index.items() if ts <= now_ms]:
+            del self.archive_index[old_id]
+            self.archives.pop(old_id, None)
+            for sessions in self.room_sessions.values():
+                sessions.discard(old_id)
+
+    async def get_archive(self, session_id: str) -> Optional[str]:
+        expires_ms = self.archive_index.get(session_id)
+        if expires_ms is None or expires_ms <= int(time.time() * 1000):
+            return None
+        return decode_archive(self.archives[session_id])
+
+    async def delete_room(
+        self, room: str, question_count: int, keep_session_sec: int | None = None
+    ) -> None:
+        data = self.rooms.pop(room, None)
+        if data is None or keep_session_sec is None or data.session is None:
+            return
+        ended = self.rooms[room] = _MemoryRoom()
+        ended.session = data.session
+        ended.expires_at = time.monotonic() + keep_session_sec
+
+    async def leaked_keys(self, room: str, question_count: int) -> List[str]:
+        # у пам'яті кімната видаляється цілком
+        return []
+
+    async def load_room(self, room: str) -> Optional[RoomSnapshot]:
+        data = self._get(room)
+        if data is None:
+            return None
+        qidx = data.state.get("questionIndex", -1)
+        return RoomSnapshot(
+            session=dict(data.session) if data.session is not None else None,
+            state=dict(data.state),
+            version=data.version,
+            questions=list(data.questions),
+            players=dict(data.players),
+            tokens=dict(data.tokens),
+            next_slot=data.next_slot,
+            scores=dict(data.scores),
+            answers=dict(data.answers.get(qidx, {})),
+            deltas=list(data.deltas),
+        )
+
+    def restore_room(self, room: str, snapshot: RoomSnapshot) -> None:
+        """Замінює кімнату знімком з іншого сховища"""
+        data = self.rooms[room] = _MemoryRoom()
+        data.session = snapshot.session
+        data.state = snapshot.state
+        data.version = snapshot.version
+        data.questions = snapshot.questions
+        data.players = snapshot.players
+        data.tokens = snapshot.tokens
+        data.next_slot = snapshot.next_slot
+        data.scores = snapshot.scores
+        qidx = snapshot.state.get("questionIndex", -1)
+        if snapshot.answers:
+            data.answers[qidx] = snapshot.answers
+        data.deltas.extend(snapshot.deltas)
+
+
+def create_room_store() -> RoomStore:
+    """Створює сховище кімнат відповідно до settings.ROOM_STATE_BACKEND"""
+    if settings.ROOM_STATE_BACKEND == "memory":
+        return MemoryRoomStore()
+    return RedisRoomStore()
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Annotated, List, Literal, Optional
 
 
 class AnswerOption(BaseModel):
@@ -14,11 +14,18 @@ class Question(BaseModel):
     position: int
 
 
+class AutoplayConfig(BaseModel):
+    # розклад, який сервер виконує сам: питання -> розкриття -> пауза -> наступне
+    questionDurationMs: int = Field(30000, ge=1000)
+    revealPauseMs: int = Field(5000, ge=0)
+
+
 class HostCreateSession(BaseModel):
     type: Literal["host:create_session"] = "host:create_session"
     roomCode: str
     quizId: Optional[str] = None
     questions: List[Question]
+    autoplay: Optional[AutoplayConfig] = None
 
 
 class HostStartQuestion(BaseModel):
@@ -42,6 +49,18 @@ class HostEndSession(BaseModel):
     type: Literal["host:end_session"] = "host:end_session"
 
 
+class HostPause(BaseModel):
+    type: Literal["host:pause"] = "host:pause"
+
+
+class HostResume(BaseModel):
+    type: Literal["host:resume"] = "host:resume"
+
+
+class HostSkip(BaseModel):
+    type: Literal["host:skip"] = "host:skip"
+
+
 class PlayerJoin(BaseModel):
     type: Literal["player:join"] = "player:join"
     name: str
@@ -54,6 +73,19 @@ class PlayerAnswer(BaseModel):
     optionIndex: int
 
 
+class ClientPong(BaseModel):
+    type: Literal["pong"] = "pong"
+    t: int
+
+
+class ClientTimeSync(BaseModel):
+    type: Literal["client:time_sync"] = "client:time_sync"
+    # час відправки за годинником клієнта, мс
+    t0: int
+    # RTT попереднього обміну, виміряний клієнтом
+    rtt: Optional[float] = None
+
+
 class ServerStateSync(BaseModel):
     type: Literal["state_sync"] = "state_sync"
     roomCode: str
@@ -64,8 +96,14 @@ class ServerStateSync(BaseModel):
     question: dict | None = None
     scoreboard: list[dict] | None = None
     reveal: dict | None = None
-    # нове поле — ідентифікатор поточного гравця
-    playerId: str | None = None
+    # компактний id поточного гравця (як у скорборді та подіях кімнати)
+    playerId: int | None = None
+    # токен для перепідключення (?playerId=...), відомий лише самому гравцю
+    playerToken: str | None = None
+    # версія стану, від якої клієнт з дельтами рахує state_delta
+    version: int | None = None
+    # розклад автоплею (None — переходами керує хост)
+    autoplay: dict | None = None
 
 
 class FinishedSessionSnapshot(BaseModel):
@@ -85,7 +123,17 @@ EventPayload = (
     | HostRevealAnswer
     | HostNextQuestion
     | HostEndSession
+    | HostPause
+    | HostResume
+    | HostSkip
     | PlayerJoin
     | PlayerAnswer
+    | ClientPong
+    | ClientTimeSync
 )
 
+
+# Скомпільований валідатор: розбір JSON і вибір моделі за полем type за один прохід
+EventAdapter: TypeAdapter[EventPayload] = TypeAdapter(
+    Annotated[EventPayload, Field(discriminator="type")]
+)
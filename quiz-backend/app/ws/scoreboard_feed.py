@@ -0,0 +1,154 @@
+import asyncio
+import json
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Optional
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+if TYPE_CHECKING:
+    from app.ws.room_manager import RoomManager
+
+
+class _Snapshot:
+    """Готовий до віддачі скорборд кімнати для однієї версії стану"""
+
+    __slots__ = ("version", "etag", "body")
+
+    def __init__(self, version: int, etag: str, body: str) -> None:
+        self.version = version
+        self.etag = etag
+        self.body = body
+
+
+class _RoomFeed:
+    """Глядачі кімнати: спільний знімок і сигнал про його зміну"""
+
+    def __init__(self) -> None:
+        self.snapshot: Optional[_Snapshot] = None
+        self.changed = asyncio.Event()
+        self.viewers = 0
+        self.lock = asyncio.Lock()
+        self.poller: Optional[asyncio.Task] = None
+
+
+class ScoreboardFeed:
+    """
+    Скорборд і фаза кімнати для проекторів та вбудованих віджетів —
+    без /ws з'єднання і без участі в розсилці кімнати.
+
+    Знімок (готовий JSON) один на кімнату і перебудовується лише тоді,
+    коли змінюється версія стану; усі HTTP-запити та SSE-глядачі
+    отримують той самий рядок. Для SSE на кімнату працює одне
+    опитування версії (через near-cache воно рідко доходить до Redis),
+    яке зупиняється, коли глядачів не лишилось.
+    """
+
+    def __init__(self, manager: "RoomManager") -> None:
+        self.manager = manager
+        self.rooms: Dict[str, _RoomFeed] = {}
+
+    def _feed(self, room: str) -> _RoomFeed:
+        feed = self.rooms.get(room)
+        if feed is None:
+            feed = self.rooms[room] = _RoomFeed()
+        return feed
+
+    async def snapshot(self, room: str) -> Optional[_Snapshot]:
+        """Актуальний знімок або None, якщо кімнати немає"""
+        state = await self.manager.get_state(room)
+        feed = self.rooms.get(room)
+        if not state:
+            if feed is not None and not feed.viewers:
+                self.rooms.pop(room, None)
+            return None
+        feed = feed or self._feed(room)
+        version = state.get("version", 0)
+        if feed.snapshot is not None and feed.snapshot.version == version:
+            metrics.inc("scoreboard_feed.hits")
+            return feed.snapshot
+        # одночасні запити чекають на одну перебудову
+        async with feed.lock:
+            if feed.snapshot is None or feed.snapshot.version != version:
+                feed.snapshot = await self._build(room, state)
+                metrics.inc("scoreboard_feed.rebuilds")
+        return feed.snapshot
+
+    async def _build(self, room: str, state: dict) -> _Snapshot:
+        audience = self.manager.audience
+        body = {
+            "type": "scoreboard",
+            "roomCode": room,
+            "phase": state.get("phase", "LOBBY"),
+            "questionIndex": state.get("questionIndex", -1),
+            "version": state.get("version", 0),
+            "scoreboard": await audience.scoreboard(room, state),
+            **await audience.reveal_extras(room, state),
+        }
+        version = state.get("version", 0)
+        # версія починається з нуля в кожній сесії, тож ETag містить і sessionId
+        etag = f'"{state.get("sessionId", "")}.{version}"'
+        return _Snapshot(version, etag, json.dumps(body, ensure_ascii=False))
+
+    # --- SSE ---
+
+    async def stream(self, room: str) -> AsyncIterator[str]:
+        """Події SSE: знімок при підключенні та після кожної зміни версії"""
+        feed = self._feed(room)
+        feed.viewers += 1
+        metrics.inc("scoreboard_feed.viewers")
+        if feed.poller is None:
+            feed.poller = asyncio.create_task(self._poll(room, feed))
+        try:
+            sent: Optional[int] = None
+            while True:
+                snapshot = feed.snapshot
+                if snapshot is None and feed.poller.done():
+                    yield "event: end\ndata: {}\n\n"
+                    return
+                if snapshot is not None and snapshot.version != sent:
+                    sent = snapshot.version
+                    yield f"id: {snapshot.version}\nevent: scoreboard\ndata: {snapshot.body}\n\n"
+                changed = feed.changed
+                try:
+                    await asyncio.wait_for(
+                        changed.wait(), settings.SCOREBOARD_FEED_KEEPALIVE_SEC
+                    )
+                except asyncio.TimeoutError:
+                    # коментар SSE не дає проксі закрити неактивне з'єднання
+                    yield ": keepalive\n\n"
+        finally:
+            feed.viewers -= 1
+            if not feed.viewers and feed.poller is not None:
+                feed.poller.cancel()
+                feed.poller = None
+
+    async def _poll(self, room: str, feed: _RoomFeed) -> None:
+        interval = settings.SCOREBOARD_FEED_POLL_MS / 1000
+        while True:
+            before = feed.snapshot
+            try:
+                current = await self.snapshot(room)
+            except Exception as e:
+                print(f"[scoreboard_feed] Помилка оновлення {room}: {e}")
+                current = before
+            if current is not before:
+                # нова подія для тих, хто чекає на попередню
+                feed.changed.set()
+                feed.changed = asyncio.Event()
+            if current is None:
+                # кімнату знищено — глядачі отримують event: end
+                feed.snapshot = None
+                return
+            await asyncio.sleep(interval)
+
+    def forget(self, room: str) -> None:
+        """Кімнату знищено: знімок без глядачів більше не потрібен"""
+        feed = self.rooms.get(room)
+        if feed is not None and not feed.viewers:
+            del self.rooms[room]
+
+    async def stop(self) -> None:
+        for feed in self.rooms.values():
+            if feed.poller is not None:
+                feed.poller.cancel()
+                feed.poller = None
@@ -0,0 +1,337 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.ws.room_store import (
+    ANSWER_OK,
+    MemoryRoomStore,
+    PendingWritesError,
+    RoomSnapshot,
+    RoomStore,
+)
+
+logger = logging.getLogger(__name__)
+
+Write = Callable[[], Awaitable[Any]]
+
+
+class WriteBehindRoomStore(RoomStore):
+    """
+    Кімнати, якими володіє цей воркер, живуть у пам'яті процесу,
+    а основне сховище (Redis) оновлюється у фоні.
+
+    Кімната завантажується з Redis одним знімком при першому зверненні
+    власника. Далі читання обслуговує пам'ять, а кожен запис виконується
+    в пам'яті і в тому ж порядку ставиться в чергу запису кімнати до
+    Redis — для відновлення після падіння воркера чи передачі кімнати.
+
+    Кімнати інших воркерів і кімнати в режимі аудиторії (гравців
+    обслуговують edge-воркери) читаються та пишуться в Redis напряму;
+    перед цим дочікуються відкладені записи кімнати.
+
+    Запис, що не вдався після WRITE_BEHIND_RETRIES спроб, не губиться:
+    він лишається першим у черзі кімнати і повторюється з наступним
+    записом або flush(), а flush() до того часу кидає PendingWritesError.
+    """
+
+    def __init__(self, backing: RoomStore, owns: Callable[[str], bool]) -> None:
+        self.backing = backing
+        # True — кімнату обслуговує цей воркер і її стан можна тримати в пам'яті
+        self.owns = owns
+        # копія живе, доки кімнатою володіє воркер, а не ROOM_TTL_SEC
+        self.memory = MemoryRoomStore(expire=False)
+        self.hot: Set[str] = set()
+        # кімнати воркера в режимі аудиторії: знімок не тримається в пам'яті,
+        # і рішення запам'ятовується, щоб не завантажувати його на кожну подію
+        self.direct: Set[str] = set()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._writes: Dict[str, Deque[Write]] = {}
+        self._writers: Dict[str, asyncio.Task] = {}
+        # кімнати, чий перший запис у черзі не вдався, -> остання помилка
+        self._failed: Dict[str, Exception] = {}
+
+    # --- гаряча копія ---
+
+    async def _local(self, room: str) -> bool:
+        """True — кімната обслуговується з пам'яті"""
+        if room in self.hot:
+            if self.owns(room):
+                return True
+            self.evict(room)
+        elif self.owns(room) and room not in self.direct:
+            loading = self._loading.get(room)
+            if loading is None:
+                loading = self._loading[room] = asyncio.create_task(self._hydrate(room))
+                loading.add_done_callback(lambda _: self._loading.pop(room, None))
+            return await asyncio.shield(loading)
+        await self.flush(room)
+        return False
+
+    async def _hydrate(self, room: str) -> bool:
+        await self.flush(room)
+        snapshot = await self.backing.load_room(room)
+        if snapshot is not None and snapshot.state.get("audience"):
+            self.direct.add(room)
+            return False
+        if snapshot is not None:
+            self.memory.restore_room(room, snapshot)
+        self.hot.add(room)
+        metrics.inc("write_behind.hydrated")
+        return True
+
+    def evict(self, room: str) -> None:
+        """Забуває копію кімнати; її черга запису дописується у фоні"""
+        self.direct.discard(room)
+        if room in self.hot:
+            self.hot.discard(room)
+            self.memory.rooms.pop(room, None)
+            metrics.inc("write_behind.evicted")
+
+    # --- черга запису ---
+
+    def _persist(self, room: str, write: Write) -> None:
+        queue = self._writes.setdefault(room, deque())
+        queue.append(write)
+        metrics.observe("write_behind.pending", len(queue))
+        self._start_writer(room)
+
+    def _start_writer(self, room: str) -> asyncio.Task:
+        writer = self._writers.get(room)
+        if writer is None or writer.done():
+            writer = self._writers[room] = asyncio.create_task(
+                self._write_loop(room, self._writes[room])
+            )
+        return writer
+
+    async def _write_loop(self, room: str, queue: Deque[Write]) -> None:
+        while queue:
+            write = queue[0]
+            for attempt in range(1, settings.WRITE_BEHIND_RETRIES + 1):
+                try:
+                    await write()
+                    metrics.inc("write_behind.writes")
+                    break
+                except Exception as e:
+                    logger.warning("Кімната %s: запис не вдався (спроба %d): %s", room, attempt, e)
+                    metrics.inc("write_behind.errors")
+                    self._failed[room] = e
+                    await asyncio.sleep(0.05 * attempt)
+            else:
+                # запис лишається в черзі: пропустити його означало б розійтися з Redis
+                logger.error("Кімната %s: %d записів чекають на сховище", room, len(queue))
+                metrics.inc("write_behind.stalled")
+                return
+            self._failed.pop(room, None)
+            queue.popleft()
+        if self._writes.get(room) is queue:
+            del self._writes[room]
+            del self._writers[room]
+
+    async def flush(self, room: Optional[str] = None) -> None:
+        if room is None:
+            results = await asyncio.gather(
+                *(self.flush(room) for room in list(self._writes)), return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+            return
+        while room in self._writes:
+            # після невдачі черга повторюється з першого запису
+            writer = self._start_writer(room)
+            await asyncio.shield(writer)
+            if self._writers.get(room) is writer:
+                # черга зупинилась на записі, що не вдався
+                raise PendingWritesError(
+                    f"Кімната {room}: {len(self._writes[room])} записів не збережено: "
+                    f"{self._failed.get(room)}"
+                )
+
+    # --- сесія ---
+
+    async def get_session(self, room: str) -> Optional[dict]:
+        if await self._local(room):
+            return await self.memory.get_session(room)
+        return await self.backing.get_session(room)
+
+    async def set_session(self, room: str, data: dict) -> None:
+        if await self._local(room):
+            await self.memory.set_session(room, data)
+            data = dict(data)
+            self._persist(room, lambda: self.backing.set_session(room, data))
+            return
+        await self.backing.set_session(room, data)
+
+    # --- питання та стан ---
+
+    async def create_room(self, room: str, questions: list[dict], state: dict) -> None:
+        if await self._local(room):
+            await self.memory.create_room(room, questions, state)
+            questions, state = list(questions), dict(state)
+            self._persist(room, lambda: self.backing.create_room(room, questions, state))
+            return
+        await self.backing.create_room(room, questions, state)
+        # нова сесія може вже не бути в режимі аудиторії
+        self.direct.discard(room)
+
+    async def load_questions(self, room: str) -> list[dict]:
+        if await self._local(room):
+            return await self.memory.load_questions(room)
+        return await self.backing.load_questions(room)
+
+    async def get_state(self, room: str) -> dict:
+        if await self._local(room):
+            return await self.memory.get_state(room)
+        return await self.backing.get_state(room)
+
+    async def set_state(self, room: str, state: dict, changes: str) -> int:
+        if await self._local(room):
+            version = await self.memory.set_state(room, state, changes)
+            state = dict(state)
+            self._persist(room, lambda: self.backing.set_state(room, state, changes))
+            return version
+        return await self.backing.set_state(room, state, changes)
+
+    async def get_deltas(self, room: str, since: int) -> Optional[List[str]]:
+        if await self._local(room):
+            return await self.memory.get_deltas(room, since)
+        return await self.backing.get_deltas(room, since)
+
+    # --- гравці ---
+
+    async def get_player_slot(self, room: str, token: str) -> Optional[int]:
+        if await self._local(room):
+            return await self.memory.get_player_slot(room, token)
+        return await self.backing.get_player_slot(room, token)
+
+    async def assign_slot(self, room: str, token: str, slot: Optional[int] = None) -> int:
+        if await self._local(room):
+            assigned = await self.memory.assign_slot(room, token, slot)
+            # новий слот виділяється і в Redis, щоб лічильник слотів не відстав
+            self._persist(room, lambda: self.backing.assign_slot(room, token, slot))
+            return assigned
+        return await self.backing.assign_slot(room, token, slot)
+
+    async def get_player_name(self, room: str, player_id: int) -> Optional[str]:
+        if await self._local(room):
+            return await self.memory.get_player_name(room, player_id)
+        return await self.backing.get_player_name(room, player_id)
+
+    async def get_players(self, room: str) -> Dict[int, str]:
+        if await self._local(room):
+            return await self.memory.get_players(room)
+        return await self.backing.get_players(room)
+
+    async def add_player(self, room: str, player_id: int, name: str) -> bool:
+        if await self._local(room):
+            added = await self.memory.add_player(room, player_id, name)
+            self._persist(room, lambda: self.backing.add_player(room, player_id, name))
+            return added
+        return await self.backing.add_player(room, player_id, name)
+
+    async def count_players(self, room: str) -> int:
+        if await self._local(room):
+            return await self.memory.count_players(room)
+        return await self.backing.count_players(room)
+
+    # --- відповіді ---
+
+    async def submit_answer(
+        self, room: str, qidx: int, player_id: int, option_index: int, now_ms: int
+    ) -> str:
+        if await self._local(room):
+            result = await self.memory.submit_answer(room, qidx, player_id, option_index, now_ms)
+            if result == ANSWER_OK:
+                self._persist(
+                    room,
+                    lambda: self.backing.submit_answer(room, qidx, player_id, option_index, now_ms),
+                )
+            return result
+        return await self.backing.submit_answer(room, qidx, player_id, option_index, now_ms)
+
+    async def submit_answers(
+        self, room: str, qidx: int, answers: List[Tuple[int, int, int]]
+    ) -> List[str]:
+        if await self._local(room):
+            results = await self.memory.submit_answers(room, qidx, answers)
+            accepted = [
+                answer for answer, result in zip(answers, results) if result == ANSWER_OK
+            ]
+            if accepted:
+                self._persist(room, lambda: self.backing.submit_answers(room, qidx, accepted))
+            return results
+        return await self.backing.submit_answers(room, qidx, answers)
+
+    async def get_answers(self, room: str, qidx: int) -> Dict[int, int]:
+        if await self._local(room):
+            return await self.memory.get_answers(room, qidx)
+        return await self.backing.get_answers(room, qidx)
+
+    async def tally_answers(
+        self, room: str, qidx: int, correct_idx: int
+    ) -> Tuple[List[int], Dict[int, int]]:
+        if await self._local(room):
+            return await self.memory.tally_answers(room, qidx, correct_idx)
+        return await self.backing.tally_answers(room, qidx, correct_idx)
+
+    async def clear_answers(self, room: str, qidx: int) -> None:
+        if await self._local(room):
+            await self.memory.clear_answers(room, qidx)
+            self._persist(room, lambda: self.backing.clear_answers(room, qidx))
+            return
+        await self.backing.clear_answers(room, qidx)
+
+    # --- бали ---
+
+    async def add_scores(self, room: str, player_ids: List[int], points: int) -> Dict[int, int]:
+        if await self._local(room):
+            totals = await self.memory.add_scores(room, player_ids, points)
+            player_ids = list(player_ids)
+            self._persist(room, lambda: self.backing.add_scores(room, player_ids, points))
+            return totals
+        return await self.backing.add_scores(room, player_ids, points)
+
+    async def get_scores(self, room: str) -> Dict[int, int]:
+        if await self._local(room):
+            return await self.memory.get_scores(room)
+        return await self.backing.get_scores(room)
+
+    async def get_top_scores(self, room: str, k: int) -> List[Tuple[int, str, int]]:
+        if await self._local(room):
+            return await self.memory.get_top_scores(room, k)
+        return await self.backing.get_top_scores(room, k)
+
+    # --- архів та очищення ---
+    #
+    # Архіви не належать кімнаті і пишуться одразу; видалення кімнати
+    # виконується після її відкладених записів.
+
+    async def save_archive(
+        self, room: str, session_id: str, payload: str, ended_at_ms: int
+    ) -> None:
+        await self.backing.save_archive(room, session_id, payload, ended_at_ms)
+
+    async def confirm_archive(self, room: str, session_id: str) -> None:
+        await self.backing.confirm_archive(room, session_id)
+
+    async def get_archive(self, session_id: str) -> Optional[str]:
+        return await self.backing.get_archive(session_id)
+
+    async def delete_room(
+        self, room: str, question_count: int, keep_session_sec: int | None = None
+    ) -> None:
+        self.evict(room)
+        await self.flush(room)
+        await self.backing.delete_room(room, question_count, keep_session_sec)
+
+    async def leaked_keys(self, room: str, question_count: int) -> List[str]:
+        await self.flush(room)
+        return await self.backing.leaked_keys(room, question_count)
+
+    async def load_room(self, room: str) -> Optional[RoomSnapshot]:
+        if await self._local(room):
+            return await self.memory.load_room(room)
+        return await self.backing.load_room(room)
@@ -0,0 +1,57 @@
+import json
+import os
+
+import pytest
+
+# Тести не ходять у Supabase/Redis: достатньо фіктивних налаштувань
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test-service-role-key")
+os.environ.setdefault("ROOM_STATE_BACKEND", "memory")
+# відповіді в сценаріях надсилаються одразу після старту питання
+os.environ.setdefault("QUESTION_START_LEAD_MS", "0")
+
+
+class FakeWebSocket:
+    """WebSocket без мережі: запам'ятовує надіслані кадри та код закриття"""
+
+    def __init__(self) -> None:
+        self.sent: list = []
+        self.closed_with: int | None = None
+        self.close_reason: str | None = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, data: str) -> None:
+        self.sent.append(json.loads(data))
+
+    async def close(self, code: int = 1000, reason: str | None = None) -> None:
+        self.closed_with = code
+        self.close_reason = reason
+
+
+class FakeRedis:
+    """Рядкові ключі Redis у словнику (GET/SET з ex та xx)"""
+
+    def __init__(self) -> None:
+        self.data: dict[str, str] = {}
+
+    async def get(self, key: str):
+        return self.data.get(key)
+
+    async def set(self, key: str, value: str, ex=None, xx=False):
+        if xx and key not in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+
+@pytest.fixture
+def make_ws():
+    """Фабрика фіктивних WebSocket-з'єднань"""
+    return FakeWebSocket
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
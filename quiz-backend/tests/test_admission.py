@@ -0,0 +1,85 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.routers import ws_router
+from app.core.config import settings
+from app.main import app
+from app.ws.admission import CLOSE_TRY_AGAIN_LATER, AdmissionController
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore
+
+
+def test_overloaded_worker_sheds_new_connections(monkeypatch, make_ws):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_CONNECTIONS", 2)
+    monkeypatch.setattr(settings, "ADMISSION_RETRY_AFTER_MS", 3000)
+    monkeypatch.setattr(settings, "RECONNECT_JITTER_MS", 0)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        admission = AdmissionController(manager)
+        assert admission.check("ROOM1") is None
+
+        # затримка event loop понад поріг
+        admission.lag_ms = settings.ADMISSION_MAX_LOOP_LAG_MS + 1
+        assert admission.check("ROOM1") == "loop_lag"
+        admission.lag_ms = 0.0
+
+        for _ in range(2):
+            await manager.register("ROOM1", make_ws())
+        assert admission.check("ROOM2") == "connections"
+
+        ws = make_ws()
+        await admission.reject(ws, "connections")
+        assert ws.sent == [{"type": "reconnect", "url": None, "afterMs": 3000}]
+        assert (ws.closed_with, ws.close_reason) == (CLOSE_TRY_AGAIN_LATER, "retry-after=3")
+
+    asyncio.run(scenario())
+
+
+def test_unknown_room_connects_do_not_trip_room_cap(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_ROOMS_PER_WORKER", 2)
+    client = TestClient(app)
+    for i in range(10):
+        with client.websocket_connect(f"/ws?role=player&roomCode=NOPE{i}&name=x") as ws:
+            # кімнати немає — звичайна помилка, а не відмова допуску
+            assert ws.receive_json()["type"] == "error"
+    assert ws_router.admission.check("REAL1") is None
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        admission = AdmissionController(manager)
+        for room in ("ROOM1", "ROOM2"):
+            manager.lifecycle.on_room_created(room, 1)
+        assert admission.check("ROOM3") == "rooms"
+        assert admission.check("ROOM1") is None
+
+    asyncio.run(scenario())
+
+
+def test_host_and_served_rooms_pass_while_overloaded(monkeypatch, make_ws):
+    monkeypatch.setattr(settings, "ADMISSION_MAX_CONNECTIONS", 1)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        admission = AdmissionController(manager)
+        await manager.register("ROOM1", make_ws())
+        admission.lag_ms = settings.ADMISSION_MAX_LOOP_LAG_MS + 1
+
+        # хост і гравці кімнати, яку воркер уже обслуговує, перепідключаються
+        assert admission.check("ROOM1", "host") is None
+        assert admission.check("ROOM1", "player") is None
+        assert admission.check("ROOM2", "host") is None
+        # нове з'єднання гравця в іншу кімнату відсікається
+        assert admission.check("ROOM2", "player") == "connections"
+
+    asyncio.run(scenario())
+
+
+def test_host_reconnect_is_admitted_by_overloaded_endpoint(monkeypatch):
+    monkeypatch.setattr(ws_router.admission, "lag_ms", settings.ADMISSION_MAX_LOOP_LAG_MS + 1)
+    client = TestClient(app)
+    with client.websocket_connect("/ws?role=host&roomCode=HOSTED") as ws:
+        assert ws.receive_json()["type"] == "state_sync"
+    with client.websocket_connect("/ws?role=player&roomCode=ELSEWHERE&name=x") as ws:
+        assert ws.receive_json()["type"] == "reconnect"
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.routers import ws_router
+from app.core.config import settings
+from app.main import app
+from app.ws import affinity as affinity_module
+from app.ws.affinity import CLOSE_WRONG_WORKER, HashRing, RoomAffinity
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore
+
+ROOMS = [f"ROOM{i}" for i in range(2000)]
+
+
+def test_hash_ring_is_stable_and_moves_few_rooms():
+    ring = HashRing(["w1", "w2", "w3"], vnodes=64)
+    # порядок воркерів не впливає на власника
+    assert all(
+        HashRing(["w3", "w1", "w2"], vnodes=64).owner(room) == ring.owner(room)
+        for room in ROOMS
+    )
+
+    grown = HashRing(["w1", "w2", "w3", "w4"], vnodes=64)
+    moved = [room for room in ROOMS if grown.owner(room) != ring.owner(room)]
+    # кімнати переходять лише до нового воркера, приблизно чверть
+    assert all(grown.owner(room) == "w4" for room in moved)
+    assert 0.1 < len(moved) / len(ROOMS) < 0.4
+
+    shrunk = HashRing(["w1", "w3"], vnodes=64)
+    moved = [room for room in ROOMS if shrunk.owner(room) != ring.owner(room)]
+    # переходять лише кімнати воркера, що вийшов
+    assert moved and all(ring.owner(room) == "w2" for room in moved)
+
+
+def test_non_owner_redirects_to_owner_url(monkeypatch, fake_redis):
+    async def get_redis():
+        return fake_redis
+
+    monkeypatch.setattr(affinity_module, "get_redis", get_redis)
+    monkeypatch.setattr(settings, "WORKER_ID", "w1")
+
+    async def noop():
+        pass
+
+    async def scenario():
+        affinity = RoomAffinity(RoomManager(MemoryRoomStore()))
+        affinity.enabled = True
+        # heartbeat у тесті не запускається: склад воркерів задано нижче
+        monkeypatch.setattr(affinity, "start", noop)
+        affinity.live = {"w1": "ws://w1/ws", "w2": "ws://w2/ws"}
+        affinity.ring = HashRing(list(affinity.live), settings.AFFINITY_VNODES)
+
+        mine = next(room for room in ROOMS if affinity.ring.owner(room) == "w1")
+        other = next(room for room in ROOMS if affinity.ring.owner(room) == "w2")
+        assert await affinity.redirect_url(mine) is None
+        assert fake_redis.data[affinity.k_owner(mine)] == "w1"
+        assert await affinity.redirect_url(other) == "ws://w2/ws"
+
+        # закріплений власник важить більше за кільце
+        fake_redis.data[affinity.k_owner(mine)] = "w2"
+        assert await affinity.redirect_url(mine) == "ws://w2/ws"
+
+    asyncio.run(scenario())
+
+
+def test_connection_on_wrong_worker_gets_reconnect_frame(monkeypatch):
+    async def redirect_url(room):
+        return "ws://owner:8001/ws"
+
+    monkeypatch.setattr(ws_router.affinity, "redirect_url", redirect_url)
+    client = TestClient(app)
+    with client.websocket_connect("/ws?role=host&roomCode=ROOM1") as ws:
+        assert ws.receive_json() == {
+            "type": "reconnect",
+            "url": "ws://owner:8001/ws",
+            "afterMs": 0,
+        }
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == CLOSE_WRONG_WORKER
+    assert "ROOM1" not in ws_router.manager.connections
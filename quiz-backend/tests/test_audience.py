@@ -0,0 +1,41 @@
+import asyncio
+
+from app.core.config import settings
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore
+
+QUESTIONS = [
+    {"id": 1, "question_text": "2+2?", "answers": ["1", "2", "3", "4"], "correct_answer": 3, "position": 0},
+]
+
+
+def test_audience_mode_switches_on_and_sends_top_k(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIENCE_MODE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "AUDIENCE_TOP_K", 2)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        await manager.create_session("ROOM1", QUESTIONS, "s1", 0)
+
+        joined = []
+        for pid, name in ((1, "Alice"), (2, "Bob"), (3, "Carol")):
+            await manager.store.add_player("ROOM1", pid, name)
+            state = await manager.get_state("ROOM1")
+            joined.append(await manager.audience.on_join("ROOM1", state))
+        assert joined == [False, False, True]
+
+        state = await manager.get_state("ROOM1")
+        assert manager.audience.is_audience(state)
+
+        await manager.store.add_scores("ROOM1", [2], 200)
+        await manager.store.add_scores("ROOM1", [3], 100)
+        top = await manager.audience.scoreboard("ROOM1", state)
+        extras = await manager.audience.reveal_extras("ROOM1", state)
+
+        await manager.cleanup_room_data("ROOM1")
+        return top, extras, manager
+
+    top, extras, manager = asyncio.run(scenario())
+    assert [(p["name"], p["score"]) for p in top] == [("Bob", 200), ("Carol", 100)]
+    assert extras == {"players": 3}
+    assert manager.audience.rooms == {}
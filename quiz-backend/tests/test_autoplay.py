@@ -0,0 +1,54 @@
+import asyncio
+
+from app.core.outbox import outbox
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore
+
+QUESTIONS = [
+    {"id": i, "question_text": f"Q{i}", "answers": ["a", "b"], "correct_answer": 0, "position": i}
+    for i in range(2)
+]
+AUTOPLAY = {"questionDurationMs": 30, "revealPauseMs": 20}
+
+
+def test_autoplay_runs_schedule_with_pause_and_resume(monkeypatch):
+    submitted = []
+    monkeypatch.setattr(outbox, "submit", lambda name, fn, on_done=None: submitted.append(name))
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        await manager.create_session("ROOM1", QUESTIONS, "s1", 0, autoplay=AUTOPLAY)
+        phases = []
+
+        # перше питання запускає хост
+        assert await manager.autoplay.resume("ROOM1") is None
+        state = await manager.get_state("ROOM1")
+        phases.append((state["phase"], state["questionIndex"]))
+
+        # пауза під час питання: розкриття відбувається, наступне питання — ні
+        await manager.autoplay.pause("ROOM1")
+        await asyncio.sleep(0.1)
+        state = await manager.get_state("ROOM1")
+        phases.append((state["phase"], state["questionIndex"]))
+
+        await manager.autoplay.resume("ROOM1")
+        state = await manager.get_state("ROOM1")
+        phases.append((state["phase"], state["questionIndex"]))
+
+        # далі сервер сам розкриває останнє питання і завершує сесію
+        await asyncio.sleep(0.15)
+        return phases, await manager.get_state("ROOM1")
+
+    phases, final = asyncio.run(scenario())
+    assert phases == [("QUESTION_ACTIVE", 0), ("REVEAL", 0), ("QUESTION_ACTIVE", 1)]
+    assert final == {}
+    assert len(submitted) == 1 and submitted[0].startswith("save_session:")
+
+
+def test_autoplay_controls_require_autoplay_session():
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        await manager.create_session("ROOM1", QUESTIONS, "s1", 0)
+        return await manager.autoplay.skip("ROOM1")
+
+    assert asyncio.run(scenario()) == "Автоплей не увімкнено"
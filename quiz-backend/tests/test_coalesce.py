@@ -0,0 +1,64 @@
+import asyncio
+import json
+
+from app.core.config import settings
+from app.ws.coalesce import CoalescingWebSocket
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore
+
+
+def test_frames_within_window_go_out_as_one_array(monkeypatch, make_ws):
+    monkeypatch.setattr(settings, "WS_COALESCE_WINDOW_MS", 5.0)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        raw = make_ws()
+        ws = CoalescingWebSocket(raw)
+        await manager.register("ROOM1", ws)
+
+        await manager.broadcast("ROOM1", {"type": "answer_revealed"})
+        await manager.broadcast("ROOM1", {"type": "scoreboard_update"})
+        assert raw.sent == []
+        await asyncio.sleep(0.02)
+        assert raw.sent == [[{"type": "answer_revealed"}, {"type": "scoreboard_update"}]]
+
+        # одиночний кадр надсилається без масиву
+        await ws.send_text(json.dumps({"type": "ping", "t": 1}))
+        await ws.flush()
+        assert raw.sent[-1] == {"type": "ping", "t": 1}
+
+    asyncio.run(scenario())
+
+
+def test_timer_flushes_are_kept_until_sent_and_awaited_on_close(monkeypatch, make_ws):
+    monkeypatch.setattr(settings, "WS_COALESCE_WINDOW_MS", 1.0)
+
+    async def scenario():
+        raw = make_ws()
+        release = asyncio.Event()
+        send = raw.send_text
+
+        async def slow_send(data):
+            await release.wait()
+            await send(data)
+
+        raw.send_text = slow_send
+        ws = CoalescingWebSocket(raw)
+
+        await ws.send_text(json.dumps({"type": "a"}))
+        await asyncio.sleep(0.01)
+        await ws.send_text(json.dumps({"type": "b"}))
+        await asyncio.sleep(0.01)
+        # перший флаш чекає на send_text, другий — на лок; обидва утримуються
+        assert len(ws._flush_tasks) == 2
+
+        closing = asyncio.create_task(ws.close())
+        await asyncio.sleep(0.01)
+        assert raw.closed_with is None
+        release.set()
+        await closing
+        assert raw.sent == [{"type": "a"}, {"type": "b"}]
+        assert raw.closed_with == 1000
+        assert not ws._flush_tasks
+
+    asyncio.run(scenario())
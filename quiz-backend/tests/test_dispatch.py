@@ -0,0 +1,29 @@
+import asyncio
+
+from app.ws.connection import ConnectionContext
+from app.ws.dispatch import EventRegistry
+from app.ws.schemas import EventAdapter
+
+
+def test_dispatch_checks_role_and_unknown_types(make_ws):
+    registry = EventRegistry(EventAdapter)
+    handled = []
+
+    @registry.on("host:end_session", roles=("host",))
+    async def end_session(ctx, evt):
+        handled.append(evt.type)
+
+    async def scenario():
+        player_ws, host_ws = make_ws(), make_ws()
+        player = ConnectionContext(player_ws, "ROOM1", "player")
+        host = ConnectionContext(host_ws, "ROOM1", "host")
+
+        await registry.dispatch(player, '{"type": "host:end_session"}')
+        await registry.dispatch(player, '{"type": "player:dance"}')
+        await registry.dispatch(host, '{"type": "host:end_session"}')
+        return player_ws.sent
+
+    sent = asyncio.run(scenario())
+    assert handled == ["host:end_session"]
+    assert [m["type"] for m in sent] == ["error", "error"]
+    assert "player:dance" in sent[1]["message"]
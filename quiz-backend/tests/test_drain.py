@@ -0,0 +1,54 @@
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from app.api.v1.routers import ws_router
+from app.core.config import settings
+from app.core.outbox import outbox
+from app.main import app
+from app.ws.affinity import RoomAffinity
+from app.ws.drain import CLOSE_SERVICE_RESTART, DrainController
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore
+
+
+def test_drain_moves_clients_away_and_flushes_outbox(monkeypatch, make_ws):
+    monkeypatch.setattr(settings, "RECONNECT_JITTER_MS", 0)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        drain = DrainController(manager, RoomAffinity(manager))
+        ws = make_ws()
+        await manager.register("ROOM1", ws)
+        manager.lifecycle.touch("ROOM1")
+
+        written = []
+        outbox.submit("archive", lambda: (time.sleep(0.05), written.append("ROOM1")))
+
+        await drain.drain()
+        assert written == ["ROOM1"]
+        assert not outbox.pending
+        assert ws.sent == [{"type": "reconnect", "url": None, "afterMs": 0}]
+        assert ws.closed_with == CLOSE_SERVICE_RESTART
+        assert manager.connections == {} and manager.lifecycle.rooms == {}
+
+        # нове з'єднання під час drain одразу отримує reconnect
+        late = make_ws()
+        await drain.reject(late)
+        assert late.closed_with == CLOSE_SERVICE_RESTART
+
+    asyncio.run(scenario())
+
+
+def test_draining_worker_rejects_new_connections(monkeypatch):
+    monkeypatch.setattr(ws_router.drain, "draining", True)
+    client = TestClient(app)
+    with client.websocket_connect("/ws?role=host&roomCode=ROOM1") as ws:
+        assert ws.receive_json()["type"] == "reconnect"
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+    assert closed.value.code == CLOSE_SERVICE_RESTART
+    assert "ROOM1" not in ws_router.manager.connections
@@ -0,0 +1,76 @@
+import asyncio
+
+from app.core.config import settings
+from app.ws.connection import ConnectionContext
+from app.ws.heartbeat import CLOSE_HEARTBEAT_TIMEOUT, HeartbeatScheduler
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore
+
+
+def test_heartbeat_measures_rtt_and_evicts_silent_connections(make_ws):
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        hb = HeartbeatScheduler(manager)
+        hb.enabled = True
+        hb._ensure_started = lambda: None
+
+        alive_ws, dead_ws = make_ws(), make_ws()
+        alive = ConnectionContext(alive_ws, "ROOM1", "player")
+        dead = ConnectionContext(dead_ws, "ROOM1", "player")
+        for ctx in (alive, dead):
+            await manager.register("ROOM1", ctx.websocket)
+            hb.register(ctx)
+
+        # кілька обертів колеса: живий відповідає, мертвий мовчить
+        for _ in range(3 * len(hb.slots)):
+            await hb.tick()
+            if alive_ws.sent and alive.ping_sent_at is not None:
+                hb.on_pong(alive, alive_ws.sent[-1]["t"])
+        return manager, alive, dead, alive_ws, dead_ws, hb
+
+    manager, alive, dead, alive_ws, dead_ws, hb = asyncio.run(scenario())
+    assert alive_ws.sent[0]["type"] == "ping"
+    assert alive.rtt_ms is not None
+    assert alive_ws.closed_with is None
+    assert dead_ws.closed_with == CLOSE_HEARTBEAT_TIMEOUT
+    assert manager.connections["ROOM1"] == {alive_ws}
+    assert hb.connections() == 1
+
+
+def test_stuck_send_does_not_delay_the_slot_and_is_evicted(monkeypatch, make_ws):
+    monkeypatch.setattr(settings, "HEARTBEAT_SEND_TIMEOUT_SEC", 0.05)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        hb = HeartbeatScheduler(manager)
+        hb.enabled = True
+        hb._ensure_started = lambda: None
+
+        stuck_ws, alive_ws = make_ws(), make_ws()
+        sent_at = {}
+
+        async def never_sends(data):
+            await asyncio.Event().wait()
+
+        async def record(data):
+            sent_at["alive"] = loop.time()
+
+        stuck_ws.send_text = never_sends
+        alive_ws.send_text = record
+        stuck = ConnectionContext(stuck_ws, "ROOM1", "player")
+        alive = ConnectionContext(alive_ws, "ROOM1", "player")
+        for ctx in (stuck, alive):
+            await manager.register("ROOM1", ctx.websocket)
+            # обидва з'єднання в одному слоті
+            ctx.heartbeat_slot = 0
+            hb.slots[0].add(ctx)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        hb.cursor = 0
+        await hb.tick()
+        assert sent_at["alive"] - started < 0.05
+        assert stuck_ws.closed_with == CLOSE_HEARTBEAT_TIMEOUT
+        assert manager.connections["ROOM1"] == {alive_ws}
+
+    asyncio.run(scenario())
@@ -0,0 +1,95 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.routers import ws_router
+from app.core.config import settings
+from app.main import app
+from app.ws import lifecycle
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore
+
+QUESTIONS = [{"question": "?", "answers": ["a", "b"], "correct_answer": 0}]
+
+
+class LeakyRoomStore(MemoryRoomStore):
+    """Сховище, що "забуває" видалити ключ гравців"""
+
+    async def leaked_keys(self, room: str, question_count: int) -> list[str]:
+        return [f"quiz:room:{room}:players"]
+
+
+async def _create(manager: RoomManager, room: str) -> None:
+    await manager.store.set_session(room, {"phase": "LOBBY"})
+    await manager.store.create_room(room, QUESTIONS, {"phase": "LOBBY", "questionIndex": -1})
+    manager.lifecycle.on_room_created(room, len(QUESTIONS))
+
+
+def test_teardown_removes_room_tasks_and_reports_leaks():
+    async def scenario():
+        manager = RoomManager(LeakyRoomStore())
+        await _create(manager, "ROOM1")
+        task = asyncio.create_task(asyncio.sleep(60))
+        manager.lifecycle.track_task("ROOM1", task)
+
+        await manager.lifecycle.teardown("ROOM1", ended=True)
+        await asyncio.sleep(0)
+        assert task.cancelled()
+        assert "ROOM1" not in manager.lifecycle.rooms
+        assert await manager.store.load_questions("ROOM1") == []
+        # завершена сесія лишається, щоб пізні клієнти побачили "завершено"
+        assert await manager.store.get_session("ROOM1") == {"phase": "LOBBY"}
+        assert manager.lifecycle.leaks == {"ROOM1": ["quiz:room:ROOM1:players"]}
+
+    asyncio.run(scenario())
+
+
+def test_sweep_tears_down_only_idle_rooms_without_connections(monkeypatch):
+    monkeypatch.setattr(settings, "ROOM_IDLE_TIMEOUT_SEC", 60)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        for room in ("IDLE", "BUSY", "FRESH"):
+            await _create(manager, room)
+        manager.lifecycle.rooms["IDLE"].last_activity -= 120
+        manager.lifecycle.rooms["BUSY"].last_activity -= 120
+        manager.connections["BUSY"] = {object()}
+
+        assert await manager.lifecycle.sweep() == 1
+        assert set(manager.lifecycle.rooms) == {"BUSY", "FRESH"}
+        assert await manager.store.get_session("IDLE") is None
+
+    asyncio.run(scenario())
+
+
+def test_room_and_memory_budgets(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_ROOMS_PER_WORKER", 2)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        await _create(manager, "ROOM1")
+        assert manager.lifecycle.admit_room("ROOM2") is None
+        await _create(manager, "ROOM2")
+        assert "кімнат" in manager.lifecycle.admit_room("ROOM3")
+        # перезапуск сесії в наявній кімнаті бюджетом не обмежується
+        assert manager.lifecycle.admit_room("ROOM1") is None
+
+        monkeypatch.setattr(settings, "MAX_ROOMS_PER_WORKER", 100)
+        monkeypatch.setattr(settings, "WORKER_MEMORY_BUDGET_MB", 256)
+        monkeypatch.setattr(lifecycle, "_rss_mb", lambda: 512.0)
+        assert "пам'яті" in manager.lifecycle.admit_room("ROOM3")
+
+    asyncio.run(scenario())
+
+
+def test_unknown_room_codes_do_not_take_room_budget(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_ROOMS_PER_WORKER", 2)
+    client = TestClient(app)
+    for i in range(5):
+        with client.websocket_connect(f"/ws?role=player&roomCode=BOGUS{i}&name=x") as ws:
+            assert ws.receive_json()["type"] == "error"
+        with client.websocket_connect(f"/ws?role=host&roomCode=BOGUS{i}") as ws:
+            assert ws.receive_json()["type"] == "state_sync"
+
+    assert not any(room.startswith("BOGUS") for room in ws_router.manager.lifecycle.rooms)
+    assert ws_router.manager.lifecycle.admit_room("REAL1") is None
@@ -0,0 +1,90 @@
+import asyncio
+import json
+
+from app.core.config import settings
+from app.core.near_cache import MISS, NearCache, near_cache
+from app.ws import room_store
+from app.ws.room_store import RedisRoomStore
+
+
+def test_near_cache_drops_values_read_before_invalidation():
+    cache = NearCache()
+    assert cache.get("k") is MISS  # без підписки кеш вимкнений
+
+    cache.ready = True
+    generation = cache.generation("k")
+    cache.put("k", "v1", generation)
+    assert cache.get("k") == "v1"
+
+    # значення прочитане до інвалідації не повинно потрапити в кеш
+    generation = cache.generation("k")
+    cache.invalidate("k")
+    cache.put("k", "stale", generation)
+    assert cache.get("k") is MISS
+
+    cache.put("k", "v2", cache.generation("k"))
+    assert cache.get("k") == "v2"
+
+
+def test_invalidating_one_key_keeps_fills_of_other_keys(monkeypatch):
+    monkeypatch.setattr(settings, "NEAR_CACHE_MAX_KEYS", 2)
+    cache = NearCache()
+    cache.ready = True
+
+    generation = cache.generation("a")
+    cache.invalidate("b")
+    cache.put("a", "v1", generation)
+    assert cache.get("a") == "v1"
+
+    # покоління витісненого ключа не губиться: старе читання все одно відкидається
+    generation = cache.generation("c")
+    cache.invalidate("c")
+    cache.invalidate("d")
+    cache.invalidate("e")
+    assert "c" not in cache.generations
+    cache.put("c", "stale", generation)
+    assert cache.get("c") is MISS
+
+
+def test_write_is_visible_to_the_writer_after_a_concurrent_read(monkeypatch):
+    """Читання, що взяло старе значення під час запису, не лишається в кеші"""
+    monkeypatch.setattr(near_cache, "ready", True)
+    store = RedisRoomStore()
+    data = {store.k_state("ROOM1"): json.dumps({"phase": "LOBBY"}), store.k_version("ROOM1"): "1"}
+
+    class FakeRedis:
+        async def mget(self, *keys):
+            return [data.get(key) for key in keys]
+
+    async def get_redis():
+        return FakeRedis()
+
+    async def scenario():
+        written = asyncio.Event()
+        release = asyncio.Event()
+
+        async def set_state(r, keys, args):
+            await release.wait()
+            data[keys[0]] = args[0]
+            data[keys[1]] = "2"
+            written.set()
+            return 2
+
+        monkeypatch.setattr(room_store, "get_redis", get_redis)
+        monkeypatch.setattr(room_store, "SET_STATE", set_state)
+
+        writer = asyncio.create_task(store.set_state("ROOM1", {"phase": "QUESTION"}, "{}"))
+        await asyncio.sleep(0)
+        # запис ще не дійшов до Redis: читач бачить і кешує старий стан
+        assert (await store.get_state("ROOM1"))["phase"] == "LOBBY"
+        release.set()
+        assert await writer == 2
+        assert written.is_set()
+
+        state = await store.get_state("ROOM1")
+        assert state == {"phase": "QUESTION", "version": 2}
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        near_cache.clear()
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+
+from app.core.config import settings
+from app.core.profiler import Profiler
+
+
+def test_slow_event_has_phase_breakdown(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILER_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILER_SLOW_EVENT_MS", 0.0)
+    profiler = Profiler()
+
+    class Store:
+        async def get_state(self):
+            await asyncio.sleep(0.01)
+            return {}
+
+    profiler.instrument(Store, "store")
+
+    async def scenario():
+        store = Store()
+        await store.get_state()  # поза подією — не враховується
+        with profiler.trace("ws", "ROOM1") as trace:
+            trace.name = "player:answer"
+            await store.get_state()
+            await store.get_state()
+            with profiler.phase("json.dumps"):
+                pass
+
+    asyncio.run(scenario())
+    event = profiler.slow_events[-1]
+    assert event["event"] == "player:answer" and event["room"] == "ROOM1"
+    phases = {p["phase"]: p for p in event["phases"]}
+    assert phases["store.get_state"]["calls"] == 2
+    assert phases["store.get_state"]["ms"] >= 20
+    assert "json.dumps" in phases
+
+
+def test_sampling_profile_captures_thread_stacks(monkeypatch):
+    monkeypatch.setattr(settings, "PROFILER_SAMPLE_INTERVAL_MS", 1.0)
+    profiler = Profiler()
+    stop = threading.Event()
+
+    def busy_loop():
+        while not stop.is_set():
+            sum(range(1000))
+
+    worker = threading.Thread(target=busy_loop)
+    worker.start()
+    try:
+        result = profiler.sample_stacks(worker.ident, 0.05)
+    finally:
+        stop.set()
+        worker.join()
+    assert result["samples"] > 0
+    assert any("busy_loop" in s["stack"] for s in result["stacks"])
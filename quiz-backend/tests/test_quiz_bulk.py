@@ -0,0 +1,70 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.api.v1.routers.quizzes import get_service
+from app.core.config import settings
+from app.main import app
+from app.services.quiz_service import QuizService
+
+QUESTION = {"questionText": "2+2?", "answers": ["1", "2", "3", "4"], "correctAnswer": 3}
+
+
+class FakeQuizRepository:
+    def __init__(self) -> None:
+        self.quizzes: list[dict] = []
+        self.batches = 0
+
+    def bulk_create_quizzes(self, quizzes):
+        self.batches += 1
+        for quiz in quizzes:
+            self.quizzes.append({"id": f"{len(self.quizzes):04d}", **quiz})
+        return [q["id"] for q in self.quizzes[-len(quizzes):]]
+
+    def list_quizzes_after(self, after_id, limit):
+        rows = [q for q in self.quizzes if after_id is None or q["id"] > after_id]
+        return [{"id": q["id"], "title": q["title"]} for q in rows[:limit]]
+
+    def list_questions_for(self, quiz_ids):
+        return [
+            {
+                "quiz_id": q["id"],
+                "question_text": item["questionText"],
+                "answers": item["answers"],
+                "correct_answer": item["correctAnswer"],
+                "position": pos,
+            }
+            for q in self.quizzes
+            if q["id"] in quiz_ids
+            for pos, item in enumerate(q["questions"])
+        ]
+
+
+def test_ndjson_import_reports_bad_records_and_round_trips(monkeypatch):
+    monkeypatch.setattr(settings, "QUIZ_IMPORT_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "QUIZ_EXPORT_PAGE_SIZE", 2)
+    repo = FakeQuizRepository()
+    app.dependency_overrides[get_service] = lambda: QuizService(repo)
+    try:
+        client = TestClient(app)
+        body = "\n".join(
+            [
+                json.dumps({"title": "A", "questions": [QUESTION]}),
+                "",
+                json.dumps({"title": "", "questions": []}),
+                "{not json",
+                json.dumps({"title": "B", "questions": [QUESTION]}),
+                json.dumps({"title": "C", "questions": []}),
+            ]
+        )
+        report = client.post("/api/v1/quizzes/import", content=body.encode()).json()
+        exported = client.get("/api/v1/quizzes/export").text
+    finally:
+        app.dependency_overrides.clear()
+
+    assert report["imported"] == 3
+    assert report["batches"] == 2
+    assert [e["line"] for e in report["errors"]] == [3, 4]
+    records = [json.loads(line) for line in exported.splitlines()]
+    assert [r["title"] for r in records] == ["A", "B", "C"]
+    assert records[0]["questions"] == [QUESTION]
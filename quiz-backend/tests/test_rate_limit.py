@@ -0,0 +1,17 @@
+from app.core.config import settings
+from app.ws.rate_limit import ConnectionLimiter, FRAME_OK, FRAME_THROTTLED, FRAME_TOO_LARGE
+
+
+def test_player_burst_is_throttled():
+    limiter = ConnectionLimiter("player")
+    verdicts = [limiter.check('{"type":"player:answer"}') for _ in range(settings.WS_PLAYER_BURST + 1)]
+    assert verdicts[:-1] == [FRAME_OK] * settings.WS_PLAYER_BURST
+    assert verdicts[-1] == FRAME_THROTTLED
+
+
+def test_oversized_frame_rejected_before_parsing():
+    limiter = ConnectionLimiter("player")
+    assert limiter.check("x" * (settings.WS_PLAYER_MAX_FRAME_BYTES + 1)) == FRAME_TOO_LARGE
+    # багатобайтові символи рахуються в байтах UTF-8
+    assert limiter.check("ї" * (settings.WS_PLAYER_MAX_FRAME_BYTES // 2 + 1)) == FRAME_TOO_LARGE
+    assert ConnectionLimiter("host").check("x" * (settings.WS_PLAYER_MAX_FRAME_BYTES + 1)) == FRAME_OK
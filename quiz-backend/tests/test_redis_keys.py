@@ -0,0 +1,77 @@
+import asyncio
+import json
+
+from redis.crc import key_slot
+
+from app.ws import key_migration, room_store
+from app.ws.keys import KEY_SCHEMA_V1, KEY_SCHEMA_V2, parse_v1_key, room_key
+from app.ws.room_store import RedisRoomStore
+
+NAMES = ["session", "state", "players", "score", "answers:q0", "archives", "owner"]
+
+
+def test_v2_keys_of_a_room_share_one_cluster_slot(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.REDIS_KEY_SCHEMA", KEY_SCHEMA_V2)
+    store = RedisRoomStore()
+    keys = [store.k_session("ROOM1"), *store.room_keys("ROOM1", 3), store.k_room_archives("ROOM1")]
+    assert len({key_slot(key.encode()) for key in keys}) == 1
+    assert store.k_state("ROOM1") == "quiz:{ROOM1}:state"
+
+
+def test_v1_keys_map_to_v2_names():
+    for name in NAMES:
+        old = room_key("ROOM1", name, KEY_SCHEMA_V1)
+        assert parse_v1_key(old) == ("ROOM1", name)
+    assert room_key("ROOM1", "session", KEY_SCHEMA_V1) == "session:ROOM1"
+    assert parse_v1_key("quiz:room:ROOM1") is None
+
+
+def test_room_is_migrated_with_all_its_keys_in_one_script(monkeypatch):
+    calls = []
+
+    class FakeRedis:
+        async def get(self, key):
+            return json.dumps([{}, {}]) if key == "quiz:room:ROOM1:questions" else None
+
+    async def migrate(r, keys, args):
+        calls.append((keys, args))
+        return 3
+
+    monkeypatch.setattr(key_migration, "MIGRATE_ROOM", migrate)
+    assert asyncio.run(key_migration.migrate_room(FakeRedis(), "ROOM1")) == 3
+
+    [(keys, [n])] = calls
+    old, new = keys[:n], keys[n:]
+    assert "session:ROOM1" in old and "quiz:room:ROOM1:answers:q1" in old
+    assert new[old.index("session:ROOM1")] == "quiz:{ROOM1}:session"
+    assert all(parse_v1_key(key)[1] != "owner" for key in old)
+
+
+def test_v1_fallback_migrates_each_room_once_before_use(monkeypatch):
+    monkeypatch.setattr("app.core.config.settings.REDIS_KEY_SCHEMA", KEY_SCHEMA_V2)
+    monkeypatch.setattr("app.core.config.settings.REDIS_KEY_V1_FALLBACK", True)
+    migrated = []
+
+    class FakeRedis:
+        async def hgetall(self, key):
+            # кімната вже перенесена, коли читається її ключ схеми 2
+            assert migrated and key == "quiz:{ROOM1}:players"
+            return {"1": "Alice"}
+
+    async def get_redis():
+        return FakeRedis()
+
+    async def migrate_room(r, room):
+        migrated.append(room)
+        return 5
+
+    monkeypatch.setattr(room_store, "get_redis", get_redis)
+    monkeypatch.setattr(room_store, "migrate_room", migrate_room)
+
+    async def scenario():
+        store = RedisRoomStore()
+        assert await store.get_players("ROOM1") == {1: "Alice"}
+        assert await store.get_players("ROOM1") == {1: "Alice"}
+
+    asyncio.run(scenario())
+    assert migrated == ["ROOM1"]
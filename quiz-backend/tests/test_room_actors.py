@@ -0,0 +1,218 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.profiler import Profiler
+from app.ws import affinity as affinity_module
+from app.ws.actor import RoomActors
+from app.ws.affinity import RoomAffinity
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore, PendingWritesError
+from app.ws.write_behind import WriteBehindRoomStore
+
+
+def test_room_jobs_run_one_at_a_time(monkeypatch):
+    monkeypatch.setattr(settings, "ROOM_ACTORS_ENABLED", True)
+
+    async def scenario():
+        actors = RoomActors()
+        log = []
+
+        async def job(name):
+            log.append(f"{name}:start")
+            await asyncio.sleep(0.01)
+            # виклик з самого актора не чекає черги
+            await actors.run("ROOM1", lambda: asyncio.sleep(0))
+            log.append(f"{name}:end")
+            return name
+
+        results = await asyncio.gather(
+            actors.run("ROOM1", lambda: job("a")),
+            actors.run("ROOM1", lambda: job("b")),
+        )
+        assert results == ["a", "b"]
+        assert log == ["a:start", "a:end", "b:start", "b:end"]
+        assert actors.actors == {}
+
+    asyncio.run(scenario())
+
+
+def test_queued_jobs_keep_their_own_profiler_trace(monkeypatch):
+    monkeypatch.setattr(settings, "ROOM_ACTORS_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILER_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILER_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "PROFILER_SLOW_EVENT_MS", 0.0)
+    profiler = Profiler()
+
+    async def scenario():
+        actors = RoomActors()
+
+        async def work(name):
+            with profiler.phase(f"handler.{name}"):
+                await asyncio.sleep(0.01)
+
+        async def event(name):
+            with profiler.trace("ws", "ROOM1") as trace:
+                trace.name = name
+                await actors.run("ROOM1", lambda: work(name))
+
+        # друга подія стає в чергу актора, запущеного першою
+        await asyncio.gather(event("a"), event("b"))
+
+    asyncio.run(scenario())
+    phases = {
+        event["event"]: [p["phase"] for p in event["phases"]]
+        for event in profiler.slow_events
+    }
+    assert phases == {"a": ["handler.a"], "b": ["handler.b"]}
+
+
+def test_owned_room_is_served_from_memory_and_written_behind():
+    async def scenario():
+        redis_like = MemoryRoomStore()
+        await redis_like.set_session("ROOM1", {"phase": "LOBBY"})
+        await redis_like.create_room("ROOM1", [{"question": "?"}], {"phase": "LOBBY"})
+        owned = {"ROOM1"}
+        store = WriteBehindRoomStore(redis_like, owned.__contains__)
+
+        joined = await store.join_player("ROOM1", None, "Alice", "token-1")
+        assert joined.player_id == 1
+        assert joined.state["version"] == 1
+
+        # читання обслуговує копія в пам'яті
+        redis_like.rooms["ROOM1"].questions = []
+        assert await store.load_questions("ROOM1") == [{"question": "?"}]
+
+        await store.flush()
+        assert await redis_like.get_players("ROOM1") == {1: "Alice"}
+        assert await redis_like.get_player_slot("ROOM1", "token-1") == 1
+        assert (await redis_like.get_state("ROOM1"))["version"] == 1
+
+        # кімната перейшла до іншого воркера: читаємо сховище напряму
+        owned.clear()
+        assert await store.load_questions("ROOM1") == []
+        assert "ROOM1" not in store.hot
+
+    asyncio.run(scenario())
+
+
+def test_handoff_persists_pending_writes_before_redirect(monkeypatch, fake_redis):
+    class SlowStore(MemoryRoomStore):
+        async def add_scores(self, room, player_ids, points):
+            await asyncio.sleep(0.05)
+            return await super().add_scores(room, player_ids, points)
+
+    class RecordingWebSocket:
+        def __init__(self, backing):
+            self.backing = backing
+            self.scores_at_redirect = None
+
+        async def send_text(self, data):
+            self.scores_at_redirect = dict(self.backing.rooms["ROOM1"].scores)
+
+        async def close(self, code=1000, reason=""):
+            pass
+
+    async def get_redis():
+        return fake_redis
+
+    monkeypatch.setattr(affinity_module, "get_redis", get_redis)
+
+    async def scenario():
+        backing = SlowStore()
+        await backing.set_session("ROOM1", {"phase": "LOBBY"})
+        await backing.create_room("ROOM1", [{"question": "?"}], {"phase": "LOBBY"})
+        manager = RoomManager(MemoryRoomStore())
+        manager.store = WriteBehindRoomStore(backing, manager.owns_room)
+        manager.lifecycle.claim("ROOM1")
+
+        # копія в пам'яті не застаріває, поки кімнатою володіє воркер
+        monkeypatch.setattr(settings, "ROOM_TTL_SEC", 0)
+        await manager.store.add_scores("ROOM1", [1], 100)
+        await asyncio.sleep(0.01)
+        assert await manager.store.get_scores("ROOM1") == {1: 100}
+        assert await backing.get_scores("ROOM1") == {}
+
+        ws = RecordingWebSocket(backing)
+        manager.connections["ROOM1"] = {ws}
+        affinity = RoomAffinity(manager)
+        affinity.live = {"w2": "ws://w2/ws"}
+        await affinity.handoff("ROOM1", "w2")
+        assert ws.scores_at_redirect == {1: 100}
+        assert "ROOM1" not in manager.store.hot
+
+    asyncio.run(scenario())
+
+
+def test_failed_write_stays_queued_and_blocks_handoff(monkeypatch, fake_redis, make_ws):
+    monkeypatch.setattr(settings, "WRITE_BEHIND_RETRIES", 2)
+
+    class FlakyStore(MemoryRoomStore):
+        down = True
+
+        async def add_scores(self, room, player_ids, points):
+            if self.down:
+                raise ConnectionError("redis down")
+            return await super().add_scores(room, player_ids, points)
+
+    async def get_redis():
+        return fake_redis
+
+    monkeypatch.setattr(affinity_module, "get_redis", get_redis)
+
+    async def scenario():
+        backing = FlakyStore()
+        await backing.set_session("ROOM1", {"phase": "LOBBY"})
+        await backing.create_room("ROOM1", [{"question": "?"}], {"phase": "LOBBY"})
+        manager = RoomManager(MemoryRoomStore())
+        manager.store = WriteBehindRoomStore(backing, manager.owns_room)
+        manager.lifecycle.claim("ROOM1")
+
+        await manager.store.add_scores("ROOM1", [1], 100)
+        with pytest.raises(PendingWritesError):
+            await manager.store.flush("ROOM1")
+        assert await manager.store.get_scores("ROOM1") == {1: 100}
+
+        # кімната з незбереженими записами не передається
+        ws = make_ws()
+        manager.connections["ROOM1"] = {ws}
+        affinity = RoomAffinity(manager)
+        affinity.live = {"w2": "ws://w2/ws"}
+        await affinity.handoff("ROOM1", "w2")
+        assert ws.sent == [] and "ROOM1" in manager.lifecycle.rooms
+        assert affinity.k_owner("ROOM1") not in fake_redis.data
+
+        # сховище відновилось: черга дописується з невдалого запису
+        backing.down = False
+        await affinity.handoff("ROOM1", "w2")
+        assert await backing.get_scores("ROOM1") == {1: 100}
+        assert ws.sent[0]["type"] == "reconnect"
+
+    asyncio.run(scenario())
+
+
+def test_audience_room_snapshot_is_not_reloaded_on_every_access():
+    class CountingStore(MemoryRoomStore):
+        loads = 0
+
+        async def load_room(self, room):
+            self.loads += 1
+            return await super().load_room(room)
+
+    async def scenario():
+        backing = CountingStore()
+        await backing.set_session("ROOM1", {"phase": "LOBBY"})
+        await backing.create_room("ROOM1", [], {"phase": "LOBBY", "audience": True})
+        store = WriteBehindRoomStore(backing, {"ROOM1"}.__contains__)
+
+        for _ in range(3):
+            assert (await store.get_state("ROOM1"))["audience"] is True
+        assert backing.loads == 1 and "ROOM1" not in store.hot
+
+        # після звільнення кімнати рішення переглядається
+        store.evict("ROOM1")
+        await store.get_state("ROOM1")
+        assert backing.loads == 2
+
+    asyncio.run(scenario())
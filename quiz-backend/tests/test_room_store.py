@@ -0,0 +1,191 @@
+import asyncio
+import json
+
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore, iter_answer_bits, tally_answers
+
+QUESTIONS = [
+    {"id": 1, "question_text": "2+2?", "answers": ["1", "2", "3", "4"], "correct_answer": 3, "position": 0},
+]
+
+
+def test_memory_store_game_flow():
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        await manager.create_session("ROOM1", QUESTIONS, "s1", 0)
+        await manager.store.add_player("ROOM1", 1, "Alice")
+        await manager.store.add_player("ROOM1", 2, "Bob")
+
+        await manager.start_question("ROOM1", 0, 30000)
+        assert await manager.submit_answer("ROOM1", 0, 1, 3)
+        assert not await manager.submit_answer("ROOM1", 0, 1, 2)
+        assert await manager.submit_answer("ROOM1", 0, 2, 1)
+
+        msg = await manager.reveal_answer("ROOM1", 0)
+        assert msg["distribution"] == {0: 0, 1: 1, 2: 0, 3: 1}
+        assert not await manager.submit_answer("ROOM1", 0, 2, 3)
+
+        sb = await manager.scoreboard("ROOM1")
+        assert [(p["name"], p["score"]) for p in sb] == [("Alice", 100), ("Bob", 0)]
+
+        await manager.cleanup_room_data("ROOM1")
+        assert await manager.get_state("ROOM1") == {}
+
+    asyncio.run(scenario())
+
+
+def test_state_versions_and_delta_catch_up(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "DELTA_LOG_SIZE", 3)
+
+    async def scenario():
+        store = MemoryRoomStore()
+        manager = RoomManager(store)
+        await manager.create_session("ROOM1", QUESTIONS, "s1", 0)
+        await manager.add_player("ROOM1", 1, "Alice")
+        await manager.add_player("ROOM1", 1, "Alice")  # повторне підключення — без нової версії
+        await manager.start_question("ROOM1", 0, 30000)
+        await manager.submit_answer("ROOM1", 0, 1, 3)
+        await manager.reveal_answer("ROOM1", 0)
+        await manager.set_state("ROOM1", phase="ENDED")
+
+        state = await manager.get_state("ROOM1")
+        recent = await store.get_deltas("ROOM1", 2)
+        return state, recent, await store.get_deltas("ROOM1", 0), await store.get_deltas("ROOM1", 4)
+
+    state, recent, too_old, up_to_date = asyncio.run(scenario())
+    assert state["version"] == 4
+    frames = [json.loads(f) for f in recent]
+    assert [f["version"] for f in frames] == [3, 4]
+    assert frames[0]["changes"]["scores"] == [{"playerId": 1, "score": 100}]
+    assert frames[1]["changes"] == {"phase": "ENDED"}
+    assert too_old is None
+    assert up_to_date == []
+
+
+def test_question_starts_after_lead(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "QUESTION_START_LEAD_MS", 60_000)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        await manager.create_session("ROOM1", QUESTIONS, "s1", 0)
+        await manager.store.add_player("ROOM1", 1, "Alice")
+        msg = await manager.start_question("ROOM1", 0, 30000)
+        early = await manager.submit_answer("ROOM1", 0, 1, 3)
+        manager.cancel_timers("ROOM1")
+        return msg, early
+
+    msg, early = asyncio.run(scenario())
+    assert msg["startedAt"] - msg["serverTime"] == 60_000
+    assert not early
+
+
+def test_answers_in_one_window_are_committed_together():
+    class CountingStore(MemoryRoomStore):
+        def __init__(self):
+            super().__init__()
+            self.batches = []
+            self.held = []
+            self.batcher = None
+
+        async def submit_answers(self, room, qidx, answers):
+            self.batches.append(len(answers))
+            # задача запису пачки тримається батчером, поки запис триває
+            self.held.append(len(self.batcher._flush_tasks))
+            return await super().submit_answers(room, qidx, answers)
+
+    async def scenario():
+        store = CountingStore()
+        manager = RoomManager(store)
+        store.batcher = manager.answers
+        await manager.create_session("ROOM1", QUESTIONS, "s1", 0)
+        await manager.start_question("ROOM1", 0, 30000)
+        results = await asyncio.gather(
+            manager.submit_answer("ROOM1", 0, 1, 3),
+            manager.submit_answer("ROOM1", 0, 2, 1),
+            manager.submit_answer("ROOM1", 0, 1, 0),
+        )
+        await asyncio.sleep(0)
+        assert store.held == [1] and not manager.answers._flush_tasks
+        return results, store.batches, await store.get_answers("ROOM1", 0)
+
+    results, batches, answers = asyncio.run(scenario())
+    assert results == [True, True, False]
+    assert batches == [3]
+    assert answers == {1: 3, 2: 1}
+
+
+def test_archives_are_compressed_and_trimmed_after_confirmation(monkeypatch):
+    import time
+
+    from app.core.config import settings
+    from app.ws.room_store import ARCHIVE_FORMAT_ZLIB, decode_archive
+
+    monkeypatch.setattr(settings, "ARCHIVE_HOT_TTL_SEC", 60)
+    payload = json.dumps({"sessionId": "s1", "scoreboard": [{"name": "Alice"}] * 50})
+
+    async def scenario():
+        store = MemoryRoomStore()
+        ended_at = int(time.time() * 1000)
+        await store.save_archive("ROOM1", "s1", payload, ended_at)
+        blob = store.archives["s1"]
+        before = store.archive_index["s1"]
+        await store.confirm_archive("ROOM1", "s1")
+        return blob, before, store.archive_index["s1"], await store.get_archive("s1")
+
+    blob, before, after, restored = asyncio.run(scenario())
+    assert blob[0] == ARCHIVE_FORMAT_ZLIB and len(blob) < len(payload)
+    assert restored == payload
+    assert after < before
+    # архіви, збережені до стиснення, читаються як є
+    assert decode_archive(payload.encode()) == payload
+
+
+def test_player_slots_are_compact_and_stable():
+    async def scenario():
+        store = MemoryRoomStore()
+        await store.create_room("ROOM1", [], {"phase": "LOBBY"})
+        first = await store.assign_slot("ROOM1", "token-a")
+        second = await store.assign_slot("ROOM1", "token-b")
+        assert (first, second) == (1, 2)
+        assert await store.get_player_slot("ROOM1", "token-a") == 1
+        assert await store.get_player_slot("ROOM1", "unknown") is None
+        # новий токен для відновленого за ім'ям гравця зберігає його слот
+        assert await store.assign_slot("ROOM1", "token-c", 2) == 2
+        assert await store.get_player_slot("ROOM1", "token-c") == 2
+
+    asyncio.run(scenario())
+
+
+def test_bitfield_answers_are_tallied_in_one_pass():
+    # слоти 1..3 (u4 на слот, значення option + 1): 1 -> 3, 2 -> 0, 3 -> 3
+    blob = bytes([0x04, 0x14])
+    assert list(iter_answer_bits(blob)) == [(1, 3), (2, 0), (3, 3)]
+    assert tally_answers(iter_answer_bits(blob), 3) == ([1, 3], {3: 2, 0: 1})
+
+
+def test_join_player_resumes_by_token_or_name():
+    async def scenario():
+        store = MemoryRoomStore()
+        await store.set_session("ROOM1", {"phase": "LOBBY"})
+        await store.create_room("ROOM1", QUESTIONS, {"phase": "LOBBY", "questionIndex": -1})
+
+        first = await store.join_player("ROOM1", None, "Alice", "token-a")
+        assert (first.player_id, first.token, first.added) == (1, "token-a", True)
+        assert first.state["version"] == 1 and first.question is None
+
+        again = await store.join_player("ROOM1", "token-a", None, "token-b")
+        assert (again.player_id, again.token, again.restored, again.added) == (1, "token-a", True, False)
+
+        # невідомий токен — відновлення за ім'ям з новим токеном
+        by_name = await store.join_player("ROOM1", "stale", "Alice", "token-c")
+        assert (by_name.player_id, by_name.token, by_name.restored) == (1, "token-c", False)
+        assert by_name.scoreboard == [(1, "Alice", 0)]
+
+        await store.set_session("ROOM1", {"phase": "ENDED"})
+        assert (await store.join_player("ROOM1", None, "Bob", "token-d")).status == "ended"
+
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+from app.core.config import settings
+from app.ws.room_manager import RoomManager
+from app.ws.room_store import MemoryRoomStore
+
+QUESTIONS = [
+    {"id": 1, "question_text": "2+2?", "answers": ["1", "2", "3", "4"], "correct_answer": 3, "position": 0},
+]
+
+
+def test_snapshot_is_shared_until_the_state_version_changes():
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        assert await manager.feed.snapshot("ROOM1") is None
+
+        await manager.create_session("ROOM1", QUESTIONS, "s1", 0)
+        await manager.add_player("ROOM1", 1, "Alice")
+        first = await manager.feed.snapshot("ROOM1")
+        assert await manager.feed.snapshot("ROOM1") is first
+        assert first.etag == '"s1.1"'
+
+        await manager.start_question("ROOM1", 0, 30000)
+        second = await manager.feed.snapshot("ROOM1")
+        assert second is not first
+        body = json.loads(second.body)
+        assert body["phase"] == "QUESTION_ACTIVE"
+        assert body["scoreboard"] == [{"playerId": 1, "name": "Alice", "score": 0}]
+
+    asyncio.run(scenario())
+
+
+def test_sse_stream_pushes_changes_and_ends_with_the_room(monkeypatch):
+    monkeypatch.setattr(settings, "SCOREBOARD_FEED_POLL_MS", 10)
+
+    async def scenario():
+        manager = RoomManager(MemoryRoomStore())
+        await manager.create_session("ROOM1", QUESTIONS, "s1", 0)
+        await manager.feed.snapshot("ROOM1")
+        stream = manager.feed.stream("ROOM1")
+
+        assert (await anext(stream)).startswith("id: 0\nevent: scoreboard")
+        await manager.add_player("ROOM1", 1, "Alice")
+        assert (await anext(stream)).startswith("id: 1\nevent: scoreboard")
+        await manager.store.delete_room("ROOM1", len(QUESTIONS))
+        assert await anext(stream) == "event: end\ndata: {}\n\n"
+        await stream.aclose()
+        assert manager.feed.rooms["ROOM1"].viewers == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+import re
+from datetime import datetime
+
+import httpx
+from fastapi.testclient import TestClient
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient
+
+from app.api.v1.routers.sessions import get_session_service
+from app.core.config import settings
+from app.main import app
+from app.repositories.quiz_session_repository import QuizSessionRepository
+from app.services.quiz_session_service import QuizSessionService
+
+
+class FakeSessionRepository:
+    def __init__(self, sessions: list[dict]) -> None:
+        self.sessions = sorted(sessions, key=lambda s: (s["ended_at"], s["id"]))
+        self.pages = 0
+
+    def list_sessions_after(self, after, limit, quiz_id=None, since=None, until=None, session_ids=None):
+        self.pages += 1
+        rows = [
+            s for s in self.sessions
+            if (after is None or (s["ended_at"], s["id"]) > after)
+            and (quiz_id is None or s["quiz_id"] == quiz_id)
+            and (since is None or s["ended_at"] >= since)
+            and (not session_ids or s["id"] in session_ids)
+        ]
+        return rows[:limit]
+
+
+def _session(sid: str, quiz_id: str, ended_at: str, names: list[str]) -> dict:
+    return {
+        "id": sid,
+        "room_code": "ROOM1",
+        "quiz_id": quiz_id,
+        "created_at": ended_at,
+        "ended_at": ended_at,
+        "scoreboard": [
+            {"playerId": f"{sid}-{i}", "name": name, "score": 100 * (len(names) - i)}
+            for i, name in enumerate(names)
+        ],
+    }
+
+
+def test_results_export_streams_pages_as_csv_and_ndjson(monkeypatch):
+    monkeypatch.setattr(settings, "SESSION_EXPORT_PAGE_SIZE", 2)
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    repo = FakeSessionRepository([
+        _session("s1", "q1", "2026-01-01T10:00:00+00:00", ["Олена", "Bob"]),
+        _session("s2", "q2", "2026-01-02T10:00:00+00:00", ["Ann"]),
+        _session("s3", "q1", "2026-01-03T10:00:00+00:00", ["Ivan"]),
+    ])
+    app.dependency_overrides[get_session_service] = lambda: QuizSessionService(repo)
+    try:
+        client = TestClient(app, headers={"X-Admin-Token": "secret"})
+        assert TestClient(app).get("/api/v1/sessions/results/export").status_code == 403
+        text = client.get("/api/v1/sessions/results/export").content.decode("utf-8-sig")
+        ndjson = client.get(
+            "/api/v1/sessions/results/export",
+            params={"format": "ndjson", "quizId": "q1"},
+        ).text
+    finally:
+        app.dependency_overrides.clear()
+
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert [(r["sessionId"], r["rank"], r["name"]) for r in rows] == [
+        ("s1", "1", "Олена"), ("s1", "2", "Bob"), ("s2", "1", "Ann"), ("s3", "1", "Ivan"),
+    ]
+    records = [json.loads(line) for line in ndjson.splitlines()]
+    assert [r["sessionId"] for r in records] == ["s1", "s1", "s3"]
+    assert records[0]["score"] == 200
+
+
+def test_repository_pages_by_ended_at_and_id_cursor():
+    """Запит до PostgREST: keyset-фільтр з часовими мітками, що містять + і :"""
+    rows = sorted(
+        [
+            _session("a1", "q1", "2026-01-01T10:00:00+00:00", ["A"]),
+            _session("a2", "q1", "2026-01-01T10:00:00+00:00", ["B"]),
+            _session("a3", "q1", "2026-01-01T10:00:00+00:00", ["C"]),
+            _session("b1", "q1", "2026-01-01T12:00:00.5+02:00", ["D"]),
+            _session("c1", "q1", "2026-01-02T09:30:00+00:00", ["E"]),
+        ],
+        key=lambda s: (datetime.fromisoformat(s["ended_at"]), s["id"]),
+    )
+    cursor = re.compile(
+        r'^\(ended_at\.gt\."(?P<ended_at>[^"]+)",'
+        r'and\(ended_at\.eq\."(?P=ended_at)",id\.gt\.(?P<id>[^)]+)\)\)$'
+    )
+    filters = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        # мінімальний PostgREST: order=ended_at,id, limit і keyset-фільтр or
+        params = request.url.params
+        assert params["order"] == "ended_at,id"
+        page = rows
+        if "or" in params:
+            filters.append(params["or"])
+            match = cursor.match(params["or"])
+            assert match, params["or"]
+            key = (datetime.fromisoformat(match["ended_at"]), match["id"])
+            page = [r for r in rows if (datetime.fromisoformat(r["ended_at"]), r["id"]) > key]
+        return httpx.Response(200, json=page[: int(params["limit"])])
+
+    postgrest = SyncPostgrestClient("http://supabase.test/rest/v1")
+    postgrest.session = SyncClient(
+        base_url="http://supabase.test/rest/v1",
+        headers=postgrest.session.headers,
+        transport=httpx.MockTransport(handler),
+    )
+
+    class FakeSupabase:
+        def table(self, name):
+            return postgrest.from_(name)
+
+    svc = QuizSessionService(QuizSessionRepository(FakeSupabase()))
+    seen, after = [], None
+    while True:
+        sessions, after = svc.export_page(after, 2)
+        seen += [s["id"] for s in sessions]
+        if after is None:
+            break
+
+    assert seen == ["a1", "a2", "a3", "b1", "c1"]
+    # мітка з + дійшла до сервера без перетворення на пробіл
+    assert filters[0].startswith('(ended_at.gt."2026-01-01T10:00:00+00:00"')
@@ -1,3 +1,4 @@
+from app.core.config import settings
 from app.main import app
 from fastapi.testclient import TestClient
 
@@ -6,4 +7,10 @@ client = TestClient(app)
 def test_health():
     resp = client.get("/api/quizzes/health")
     assert resp.status_code == 200
-    assert resp.json()["status"] == "ok"
\ No newline at end of file
+    assert resp.json()["status"] == "ok"
+
+def test_metrics_require_admin_token(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "secret")
+    assert client.get("/metrics").status_code == 403
+    resp = client.get("/metrics", headers={"X-Admin-Token": "secret"})
+    assert resp.status_code == 200
@@ -5,8 +5,48 @@ let quizSocket = null;
 let quizSocketParams = null;
 let currentOnMessage = null;
 
-function buildUrl({ role, roomCode, name }) {
-  const params = new URLSearchParams({ role: role, roomCode: roomCode });
+// оцінка годинника сервера: serverNow() = Date.now() + clockOffsetMs
+let clockOffsetMs = 0;
+let bestSyncRtt = Infinity;
+let lastSyncRtt = null;
+
+const TIME_SYNC_SAMPLES = 3;
+const TIME_SYNC_SPACING_MS = 300;
+
+// випадкова добавка до afterMs з кадру reconnect, щоб клієнти не
+// перепідключалися одночасно
+const RECONNECT_JITTER_MS = 1000;
+
+export function serverNow() {
+  return Date.now() + clockOffsetMs;
+}
+
+function sendTimeSync(socket) {
+  if (socket.readyState === WebSocket.OPEN) {
+    socket.send(
+      JSON.stringify({ type: "client:time_sync", t0: Date.now(), rtt: lastSyncRtt })
+    );
+  }
+}
+
+function handleTimeSync({ t0, t1, t2 }) {
+  const t3 = Date.now();
+  const rtt = t3 - t0 - (t2 - t1);
+  lastSyncRtt = rtt;
+  // зразок з найменшим RTT найточніший
+  if (rtt <= bestSyncRtt) {
+    bestSyncRtt = rtt;
+    clockOffsetMs = (t1 - t0 + (t2 - t3)) / 2;
+  }
+}
+
+function buildUrl({ role, roomCode, name }, baseUrl = WS_BASE_URL) {
+  // batch: сервер може об'єднувати кадри, що йдуть поспіль, у JSON-масив
+  const params = new URLSearchParams({
+    role: role,
+    roomCode: roomCode,
+    batch: "true",
+  });
 
   if (name) {
     params.append("name", name);
@@ -24,54 +64,84 @@ function buildUrl({ role, roomCode, name }) {
     }
   }
 
-  return `${WS_BASE_URL}?${params.toString()}`;
+  return `${baseUrl}?${params.toString()}`;
 }
 
-export function createQuizSocket({ role, roomCode, name, onMessage }) {
-  currentOnMessage = onMessage || null;
+// обробка одного кадру сервера (у режимі batch кадр може прийти в масиві)
+function handleFrame(handle, socket, data) {
+  // heartbeat сервера: відповідаємо одразу, в застосунок не передаємо
+  if (data.type === "ping") {
+    if (socket.readyState === WebSocket.OPEN) {
+      socket.send(JSON.stringify({ type: "pong", t: data.t }));
+    }
+    return;
+  }
 
-  const url = buildUrl({ role, roomCode, name });
+  if (data.type === "time_sync") {
+    handleTimeSync(data);
+    return;
+  }
 
-  if (
-    quizSocket &&
-    (quizSocket.readyState === WebSocket.OPEN ||
-      quizSocket.readyState === WebSocket.CONNECTING)
-  ) {
-    console.log("Використовуємо існуючий WebSocket:", {
-      url,
-      role,
-      roomCode,
-      name,
-    });
-    return quizSocket;
+  // кімнату обслуговує інший воркер, воркер зупиняється або перевантажений:
+  // сервер закриває з'єднання, після чого перепідключаємось (url: null — та сама адреса)
+  if (data.type === "reconnect") {
+    console.log("Сервер просить перепідключитися:", data);
+    handle.reconnect = { url: data.url || null, afterMs: data.afterMs || 0 };
+    return;
   }
 
+  console.log("Отримано повідомлення:", data);
+
+  // при state_sync для гравця зберігаємо playerId/roomCode у localStorage
   if (
-    quizSocket &&
-    (quizSocket.readyState === WebSocket.CLOSING ||
-      quizSocket.readyState === WebSocket.CLOSED)
+    data.type === "state_sync" &&
+    quizSocketParams &&
+    quizSocketParams.role === "player"
   ) {
     try {
-      quizSocket.close();
+      // зберігаємо токен перепідключення, а не компактний playerId
+      if (
+        typeof data.playerToken === "string" &&
+        data.playerToken.length > 0
+      ) {
+        window.localStorage.setItem("quizPlayerId", data.playerToken);
+      }
+      if (typeof data.roomCode === "string" && data.roomCode.length > 0) {
+        window.localStorage.setItem("quizRoomCode", data.roomCode);
+      }
+      if (
+        typeof quizSocketParams.name === "string" &&
+        quizSocketParams.name.length > 0
+      ) {
+        window.localStorage.setItem("playerName", quizSocketParams.name);
+      }
     } catch (e) {
-      console.warn("Помилка при закритті попереднього WebSocket:", e);
+      console.warn("Не вдалося зберегти дані в localStorage:", e);
     }
-    quizSocket = null;
   }
 
+  if (currentOnMessage) {
+    currentOnMessage(data);
+  }
+}
+
+function openSocket(handle, baseUrl) {
+  const url = buildUrl(quizSocketParams, baseUrl);
   console.log("Створення нового WebSocket-підключення:", {
     url,
-    role,
-    roomCode,
-    name,
+    ...quizSocketParams,
   });
 
   const socket = new WebSocket(url);
-  quizSocket = socket;
-  quizSocketParams = { role, roomCode, name };
+  handle.socket = socket;
+  handle.reconnecting = false;
 
   socket.onopen = () => {
     console.log("WebSocket підключено:", quizSocketParams);
+    bestSyncRtt = Infinity;
+    for (let i = 0; i < TIME_SYNC_SAMPLES; i += 1) {
+      setTimeout(() => sendTimeSync(socket), i * TIME_SYNC_SPACING_MS);
+    }
   };
 
   socket.onclose = (event) => {
@@ -80,7 +150,22 @@ export function createQuizSocket({ role, roomCode, name, onMessage }) {
       reason: event.reason,
       wasClean: event.wasClean,
     });
-    quizSocket = null;
+    if (handle.reconnect && !handle.closed) {
+      const { url: nextUrl, afterMs } = handle.reconnect;
+      handle.reconnect = null;
+      handle.reconnecting = true;
+      const delay = afterMs + Math.floor(Math.random() * RECONNECT_JITTER_MS);
+      console.log(`Перепідключення через ${delay} мс:`, nextUrl || WS_BASE_URL);
+      setTimeout(() => {
+        if (!handle.closed) {
+          openSocket(handle, nextUrl || WS_BASE_URL);
+        }
+      }, delay);
+      return;
+    }
+    if (quizSocket === handle) {
+      quizSocket = null;
+    }
   };
 
   socket.onerror = (err) => {
@@ -88,52 +173,87 @@ export function createQuizSocket({ role, roomCode, name, onMessage }) {
   };
 
   socket.onmessage = (event) => {
+    let parsed;
     try {
-      const data = JSON.parse(event.data);
-      console.log("Отримано повідомлення:", data);
-
-      // при state_sync для гравця зберігаємо playerId/roomCode у localStorage
-      if (
-        data.type === "state_sync" &&
-        quizSocketParams &&
-        quizSocketParams.role === "player"
-      ) {
-        try {
-          if (typeof data.playerId === "string" && data.playerId.length > 0) {
-            window.localStorage.setItem("quizPlayerId", data.playerId);
-          }
-          if (typeof data.roomCode === "string" && data.roomCode.length > 0) {
-            window.localStorage.setItem("quizRoomCode", data.roomCode);
-          }
-          if (
-            typeof quizSocketParams.name === "string" &&
-            quizSocketParams.name.length > 0
-          ) {
-            window.localStorage.setItem("playerName", quizSocketParams.name);
-          }
-        } catch (e) {
-          console.warn("Не вдалося зберегти дані в localStorage:", e);
-        }
-      }
-
-      if (currentOnMessage) {
-        currentOnMessage(data);
-      }
+      parsed = JSON.parse(event.data);
     } catch (err) {
       console.error("JSON parse error:", err, "Data:", event.data);
+      return;
     }
+    const frames = Array.isArray(parsed) ? parsed : [parsed];
+    frames.forEach((data) => {
+      try {
+        handleFrame(handle, socket, data);
+      } catch (err) {
+        console.error("Помилка обробки повідомлення:", err, "Data:", data);
+      }
+    });
   };
+}
 
-  socket.sendJson = (obj) => {
-    if (socket.readyState === WebSocket.OPEN) {
-      console.log("Надсилаємо:", obj);
-      socket.send(JSON.stringify(obj));
-    } else {
-      console.warn("WebSocket не готовий, стан:", socket.readyState);
-    }
+// Сторінки отримують сталий об'єкт з'єднання: після кадру reconnect під ним
+// відкривається новий WebSocket, а readyState/sendJson/close працюють з поточним
+function createHandle() {
+  return {
+    socket: null,
+    reconnect: null,
+    reconnecting: false,
+    closed: false,
+    get readyState() {
+      // між закриттям і перепідключенням з'єднання ще "підключається"
+      if (!this.socket || this.reconnecting) {
+        return WebSocket.CONNECTING;
+      }
+      return this.socket.readyState;
+    },
+    sendJson(obj) {
+      if (this.readyState === WebSocket.OPEN) {
+        console.log("Надсилаємо:", obj);
+        this.socket.send(JSON.stringify(obj));
+      } else {
+        console.warn("WebSocket не готовий, стан:", this.readyState);
+      }
+    },
+    close() {
+      this.closed = true;
+      if (this.socket) {
+        this.socket.close();
+      }
+    },
   };
+}
+
+export function createQuizSocket({ role, roomCode, name, onMessage }) {
+  currentOnMessage = onMessage || null;
+
+  if (
+    quizSocket &&
+    (quizSocket.readyState === WebSocket.OPEN ||
+      quizSocket.readyState === WebSocket.CONNECTING)
+  ) {
+    console.log("Використовуємо існуючий WebSocket:", {
+      role,
+      roomCode,
+      name,
+    });
+    return quizSocket;
+  }
+
+  if (quizSocket) {
+    try {
+      quizSocket.close();
+    } catch (e) {
+      console.warn("Помилка при закритті попереднього WebSocket:", e);
+    }
+    quizSocket = null;
+  }
+
+  const handle = createHandle();
+  quizSocket = handle;
+  quizSocketParams = { role, roomCode, name };
+  openSocket(handle, WS_BASE_URL);
 
-  return socket;
+  return handle;
 }
 
 export function getExistingQuizSocket() {
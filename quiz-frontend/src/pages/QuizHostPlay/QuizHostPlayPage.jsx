@@ -1,7 +1,7 @@
 import React, { useEffect, useState, useRef } from "react";
 import { useNavigate, useParams } from "react-router-dom";
 import { quizApi } from "../../api/quizApi";
-import { createQuizSocket } from "../../api/wsClient";
+import { createQuizSocket, serverNow } from "../../api/wsClient";
 import "./QuizHostPlayPage.css";
 
 function QuizHostPlayPage() {
@@ -42,7 +42,8 @@ function QuizHostPlayPage() {
     questionEndTimeRef.current = endTime;
 
     const computeRemaining = () => {
-      const now = Date.now();
+      // до startedAt таймер стоїть на повній тривалості
+      const now = Math.max(serverNow(), startedAt);
       const diffMs = endTime - now;
       if (diffMs <= 0) return 0;
       return Math.ceil(diffMs / 1000);
@@ -1,6 +1,6 @@
 import React, { useEffect, useState, useRef } from "react";
 import { useNavigate, useParams } from "react-router-dom";
-import { createQuizSocket } from "../../api/wsClient";
+import { createQuizSocket, serverNow } from "../../api/wsClient";
 import "./QuizPlayPage.css";
 
 function mapServerPhase(serverPhase) {
@@ -35,13 +35,13 @@ function PlayerScoreboard({ scoreboard, playerId, title }) {
       <ol className="player-scoreboard-list">
         {sorted.map((player, index) => {
           const isMe =
-            playerId && typeof player.playerId === "string"
+            playerId != null && typeof player.playerId === "number"
               ? player.playerId === playerId
               : false;
 
           return (
             <li
-              key={player.playerId || `${player.name}-${index}`}
+              key={player.playerId ?? `${player.name}-${index}`}
               className={
                 "player-scoreboard-item" + (isMe ? " player-scoreboard-item-me" : "")
               }
@@ -118,7 +118,7 @@ function QuizPlayPage() {
             setQuestionIndex(serverQidx);
             setQuestion(msg.question || null);
 
-            if (typeof msg.playerId === "string" && msg.playerId.length > 0) {
+            if (typeof msg.playerId === "number") {
               setPlayerId(msg.playerId);
             }
 
@@ -158,7 +158,7 @@ function QuizPlayPage() {
               typeof msg.startedAt === "number" &&
               typeof msg.durationMs === "number"
             ) {
-              const now = Date.now();
+              const now = Math.max(serverNow(), msg.startedAt);
               const deadline = msg.startedAt + msg.durationMs;
               const diffMs = deadline - now;
               const initialSeconds = Math.max(
@@ -236,32 +236,40 @@ function QuizPlayPage() {
               );
             }
 
-            setQuestion(msg.question);
-            const qidx =
-              typeof msg.questionIndex === "number"
-                ? msg.questionIndex
+            // питання показується в startedAt за годинником сервера — одночасно для всіх
+            const startDelay =
+              typeof msg.startedAt === "number"
+                ? Math.max(0, msg.startedAt - serverNow())
                 : 0;
-            setQuestionIndex(qidx);
-            setRemaining(Math.floor(msg.durationMs / 1000));
-            setPhase("QUESTION_ACTIVE");
-            setSelected(null);
-            setCorrectAnswer(null);
-            setTimeUp(false);
 
-            if (timerRef.current) {
-              clearInterval(timerRef.current);
-            }
+            setTimeout(() => {
+              setQuestion(msg.question);
+              const qidx =
+                typeof msg.questionIndex === "number"
+                  ? msg.questionIndex
+                  : 0;
+              setQuestionIndex(qidx);
+              setRemaining(Math.floor(msg.durationMs / 1000));
+              setPhase("QUESTION_ACTIVE");
+              setSelected(null);
+              setCorrectAnswer(null);
+              setTimeUp(false);
 
-            timerRef.current = setInterval(() => {
-              setRemaining((prev) => {
-                if (prev <= 1) {
-                  clearInterval(timerRef.current);
-                  setTimeUp(true);
-                  return 0;
-                }
-                return prev - 1;
-              });
-            }, 1000);
+              if (timerRef.current) {
+                clearInterval(timerRef.current);
+              }
+
+              timerRef.current = setInterval(() => {
+                setRemaining((prev) => {
+                  if (prev <= 1) {
+                    clearInterval(timerRef.current);
+                    setTimeUp(true);
+                    return 0;
+                  }
+                  return prev - 1;
+                });
+              }, 1000);
+            }, startDelay);
 
             break;
           }